@@ -0,0 +1,4 @@
+"""Benchmarks that measure the parser offline.
+
+@maintainer: Gilles Vink
+"""
@@ -0,0 +1,270 @@
+"""Benchmark that runs the collector end to end against the fake bucket.
+
+Every combination of pool size and scan strategy collects all families
+from the same fake bucket, after which the requests, wall time and
+throughput of every run are reported. For example:
+
+    python -m benchmarks.crawl --pool-sizes 4 16 --latency 0.02
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from benchmarks.fake_bucket import (
+    BucketBehaviour,
+    FakeBucket,
+    read_bucket_objects,
+)
+from nukeversionparser.parser.bucket_listing import (
+    BUCKET_URL,
+    DiscoveryBackend,
+)
+from nukeversionparser.parser.collector import (
+    collect_families,
+    reprobe_unknown_installers,
+)
+from nukeversionparser.parser.concurrency import (
+    AdaptiveAdapter,
+    AdaptiveConcurrencyController,
+)
+from nukeversionparser.parser.parse_data import ScanOptions, ScanStrategy
+from nukeversionparser.parser.retry import UnknownProbes
+from nukeversionparser.parser.session import create_session
+
+if TYPE_CHECKING:
+    from requests import PreparedRequest
+    from urllib3 import HTTPConnectionPool
+
+__slots__ = ("CrawlResult", "run_crawl")
+
+_DEFAULT_RELEASES_FILE = (
+    Path(__file__).parent.parent / "nuke-all-releases.json"
+)
+
+
+class _LocalBucketAdapter(AdaptiveAdapter):
+    """Adapter that sends requests for the real bucket to the fake one."""
+
+    def __init__(self, bucket_url: str, **kwargs: Any) -> None:
+        """Create instance of the _LocalBucketAdapter object.
+
+        Args:
+            bucket_url: url the fake bucket is served on.
+            kwargs: passed through to the AdaptiveAdapter.
+        """
+        self._bucket_url = bucket_url
+        super().__init__(**kwargs)
+
+    def get_connection_with_tls_context(
+        self, request: PreparedRequest, *_: Any, **__: Any
+    ) -> HTTPConnectionPool:
+        """Return the connection to the fake bucket.
+
+        The url of the request itself stays the same, so the probes are
+        recorded with the url of the real bucket.
+
+        Args:
+            request: the request to send.
+
+        Returns:
+            the pool of connections to the fake bucket.
+        """
+        del request
+        return self.poolmanager.connection_from_url(self._bucket_url)
+
+
+@dataclass
+class CrawlResult:
+    """Data object to store the measurements of a single crawl."""
+
+    strategy: str
+    """Name of the scan strategy, including its options."""
+    pool_size: int
+    """Amount of workers scanning at the same time."""
+    requests: int
+    """Amount of requests the bucket received."""
+    wall_time: float
+    """Seconds it took to collect all families."""
+    throughput: float
+    """Requests per second."""
+    releases: int
+    """Amount of releases found."""
+    missing_releases: int
+    """Amount of releases in the bucket that were not found."""
+    throttled: int
+    """Amount of requests answered with 503."""
+
+
+def _count_releases(objects: dict[str, str]) -> int:
+    """Return the amount of releases stored in the bucket."""
+    return len({key.split("/")[-2] for key in objects})
+
+
+def run_crawl(
+    bucket: FakeBucket,
+    pool_size: int,
+    options: ScanOptions,
+    backend: DiscoveryBackend = DiscoveryBackend.PROBING,
+) -> CrawlResult:
+    """Collect all families from the fake bucket and measure it.
+
+    The session is set up like the exporter does, including the adaptive
+    concurrency and the second pass over unknown probes.
+
+    Args:
+        bucket: bucket to collect from, already serving.
+        pool_size: amount of workers scanning at the same time.
+        options: options defining how to scan.
+        backend: backend to discover the releases with.
+
+    Returns:
+        the measurements of the crawl.
+    """
+    bucket.reset()
+    connections = pool_size * options.probes_in_flight
+    controller = AdaptiveConcurrencyController(connections)
+    unknown_probes = UnknownProbes()
+    start_time = time.perf_counter()
+    with create_session(connections) as session:
+        adapter = _LocalBucketAdapter(
+            bucket.url,
+            controller=controller,
+            unknown_probes=unknown_probes,
+            pool_maxsize=connections,
+            pool_block=True,
+        )
+        session.mount(BUCKET_URL, adapter)
+        families = collect_families(
+            session, pool_size, options=options, backend=backend
+        )
+        families = reprobe_unknown_installers(
+            families, unknown_probes, session, pool_size, options
+        )
+    wall_time = time.perf_counter() - start_time
+
+    releases = sum(len(family.releases) for family in families)
+    strategy = f"{options.strategy.value} lookahead={options.lookahead}"
+    if backend == DiscoveryBackend.LISTING:
+        strategy = backend.value
+    return CrawlResult(
+        strategy=strategy,
+        pool_size=pool_size,
+        requests=bucket.request_count,
+        wall_time=wall_time,
+        throughput=bucket.request_count / wall_time,
+        releases=releases,
+        missing_releases=_count_releases(bucket.objects) - releases,
+        throttled=sum(
+            count
+            for (_, status), count in bucket.requests.items()
+            if status == 503  # noqa: PLR2004
+        ),
+    )
+
+
+def _format_results(results: list[CrawlResult]) -> str:
+    """Return the results as a table."""
+    lines = [
+        (
+            f"{'strategy':<24} {'pool':>4} {'requests':>8} {'wall (s)':>9} "
+            f"{'req/s':>8} {'found':>5} {'missed':>6} {'503':>5}"
+        )
+    ]
+    lines.extend(
+        f"{result.strategy:<24} {result.pool_size:>4} {result.requests:>8} "
+        f"{result.wall_time:>9.2f} {result.throughput:>8.1f} "
+        f"{result.releases:>5} {result.missing_releases:>6} "
+        f"{result.throttled:>5}"
+        for result in results
+    )
+    return "\n".join(lines)
+
+
+def _parse_args(args: list[str]) -> argparse.Namespace:
+    """Parse provided arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.crawl",
+        description="Benchmark the collector against a local fake bucket.",
+    )
+    parser.add_argument(
+        "--releases-file",
+        type=Path,
+        default=_DEFAULT_RELEASES_FILE,
+        help="Exported releases to fill the fake bucket with.",
+    )
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[8])
+    parser.add_argument(
+        "--strategies",
+        nargs="+",
+        choices=[
+            *(strategy.value for strategy in ScanStrategy),
+            DiscoveryBackend.LISTING.value,
+        ],
+        default=[strategy.value for strategy in ScanStrategy],
+    )
+    parser.add_argument("--lookahead", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.01)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", type=Path, help="Path to write the results as JSON to."
+    )
+    return parser.parse_args(args)
+
+
+def main() -> None:
+    """Run the benchmark for every pool size and strategy."""
+    logging.basicConfig(level=logging.WARNING)
+    parsed_arguments = _parse_args(sys.argv[1:])
+    behaviour = BucketBehaviour(
+        latency=parsed_arguments.latency,
+        jitter=parsed_arguments.jitter,
+        throttle_rate=parsed_arguments.throttle_rate,
+        error_rate=parsed_arguments.error_rate,
+        seed=parsed_arguments.seed,
+    )
+    objects = read_bucket_objects(parsed_arguments.releases_file)
+
+    results = []
+    with FakeBucket(objects, behaviour) as bucket:
+        for strategy in parsed_arguments.strategies:
+            backend = DiscoveryBackend.PROBING
+            options = ScanOptions(lookahead=parsed_arguments.lookahead)
+            if strategy == DiscoveryBackend.LISTING.value:
+                backend = DiscoveryBackend.LISTING
+            else:
+                options = ScanOptions(
+                    strategy=ScanStrategy(strategy),
+                    lookahead=parsed_arguments.lookahead,
+                )
+            results.extend(
+                run_crawl(bucket, pool_size, options, backend)
+                for pool_size in parsed_arguments.pool_sizes
+            )
+
+    sys.stdout.write(_format_results(results) + "\n")
+    if parsed_arguments.output is not None:
+        parsed_arguments.output.write_text(
+            json.dumps(
+                {
+                    "behaviour": asdict(behaviour),
+                    "results": [asdict(result) for result in results],
+                },
+                indent=4,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Local HTTP server that mimics the bucket storing the installers.
+
+The server answers HEAD requests for installers and ListObjectsV2
+requests for the releases prefix, like the real bucket does. Latency,
+jitter, throttling and server errors can be configured, so the collector
+can be measured reproducibly without sending a single request to the
+real bucket.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import json
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import TYPE_CHECKING, Self
+from urllib.parse import parse_qs, urlparse
+from xml.sax.saxutils import escape
+
+from nukeversionparser.parser.bucket_listing import BUCKET_URL
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import TracebackType
+
+__slots__ = ("BucketBehaviour", "FakeBucket", "read_bucket_objects")
+
+_S3_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+
+
+@dataclass(frozen=True)
+class BucketBehaviour:
+    """Data object to store how the fake bucket responds."""
+
+    latency: float = 0.0
+    """Seconds every request waits before it is answered."""
+    jitter: float = 0.0
+    """Maximum seconds added to or removed from the latency at random."""
+    throttle_rate: float = 0.0
+    """Fraction of requests answered with 503 SlowDown."""
+    error_rate: float = 0.0
+    """Fraction of requests answered with 500 InternalError."""
+    allow_listing: bool = True
+    """False to refuse listing the bucket, like the real bucket does."""
+    listing_page_size: int = 1000
+    """Maximum amount of keys in a page of a listing."""
+    seed: int = 0
+    """Seed of the random generator, so every run behaves the same."""
+
+
+def read_bucket_objects(releases_file: Path) -> dict[str, str]:
+    """Read the objects of the bucket from an exported releases file.
+
+    Args:
+        releases_file: path to a file like `nuke-all-releases.json`.
+
+    Returns:
+        key of every installer mapped to its last modified header.
+    """
+    data = json.loads(releases_file.read_text())
+    return {
+        url.removeprefix(BUCKET_URL): release["date"]
+        for releases in data.values()
+        for release in releases.values()
+        for url in release["installer"].values()
+        if url
+    }
+
+
+class FakeBucket:
+    """Object that serves the fake bucket in a background thread."""
+
+    def __init__(
+        self, objects: dict[str, str], behaviour: BucketBehaviour
+    ) -> None:
+        """Create instance of the FakeBucket object.
+
+        Args:
+            objects: key of every stored object mapped to its last
+                modified header.
+            behaviour: how the bucket responds.
+        """
+        self.objects = objects
+        self.behaviour = behaviour
+        self.requests: Counter[tuple[str, int]] = Counter()
+        self._random = random.Random(behaviour.seed)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), _create_handler(self)
+        )
+        self._server.daemon_threads = True
+        self._server.request_queue_size = 256
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        """Return the url the bucket is served on."""
+        return f"http://127.0.0.1:{self._server.server_port}/"
+
+    @property
+    def request_count(self) -> int:
+        """Return the amount of requests received."""
+        return self.requests.total()
+
+    def __enter__(self) -> Self:
+        """Start serving when used as context manager."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Stop serving when leaving the context."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def reset(self) -> None:
+        """Forget the received requests and restart the random generator."""
+        with self._lock:
+            self.requests.clear()
+            self._random.seed(self.behaviour.seed)
+
+    def respond(self, method: str, path: str) -> tuple[int, dict, bytes]:
+        """Return the response to a request.
+
+        Args:
+            method: HEAD or GET.
+            path: path of the request, including the query.
+
+        Returns:
+            status, headers and body of the response.
+        """
+        with self._lock:
+            roll = self._random.random()
+            delay = self.behaviour.latency + self._random.uniform(
+                -self.behaviour.jitter, self.behaviour.jitter
+            )
+        time.sleep(max(0.0, delay))
+
+        if roll < self.behaviour.throttle_rate:
+            status, headers, body = _error(
+                HTTPStatus.SERVICE_UNAVAILABLE, "SlowDown"
+            )
+        elif roll < self.behaviour.throttle_rate + self.behaviour.error_rate:
+            status, headers, body = _error(
+                HTTPStatus.INTERNAL_SERVER_ERROR, "InternalError"
+            )
+        elif method == "GET":
+            status, headers, body = self._list(path)
+        else:
+            status, headers, body = self._head(path)
+
+        with self._lock:
+            self.requests[method, status] += 1
+        return status, headers, body
+
+    def _head(self, path: str) -> tuple[int, dict, bytes]:
+        """Return the response to a probe of a single object.
+
+        Args:
+            path: path of the request.
+
+        Returns:
+            status, headers and body of the response.
+        """
+        last_modified = self.objects.get(urlparse(path).path.lstrip("/"))
+        if last_modified is None:
+            return _error(HTTPStatus.FORBIDDEN, "AccessDenied")
+        return HTTPStatus.OK, {"Last-Modified": last_modified}, b""
+
+    def _list(self, path: str) -> tuple[int, dict, bytes]:
+        """Return a page of a ListObjectsV2 request.
+
+        Args:
+            path: path of the request, including the query.
+
+        Returns:
+            status, headers and body of the response.
+        """
+        if not self.behaviour.allow_listing:
+            return _error(HTTPStatus.FORBIDDEN, "AccessDenied")
+        query = parse_qs(urlparse(path).query)
+        if query.get("list-type") != ["2"]:
+            return _error(HTTPStatus.BAD_REQUEST, "InvalidArgument")
+        prefix = query.get("prefix", [""])[0]
+        start_after = query.get("continuation-token", [""])[0]
+        keys = sorted(
+            key
+            for key in self.objects
+            if key.startswith(prefix) and key > start_after
+        )
+        page = keys[: self.behaviour.listing_page_size]
+        contents = "".join(
+            f"<Contents><Key>{escape(key)}</Key><LastModified>"
+            f"{parsedate_to_datetime(self.objects[key]).isoformat()}"
+            "</LastModified></Contents>"
+            for key in page
+        )
+        truncated = len(keys) > len(page)
+        if truncated:
+            contents += (
+                f"<NextContinuationToken>{escape(page[-1])}"
+                "</NextContinuationToken>"
+            )
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            f'<ListBucketResult xmlns="{_S3_NAMESPACE}">'
+            f"<IsTruncated>{str(truncated).lower()}</IsTruncated>"
+            f"{contents}</ListBucketResult>"
+        )
+        headers = {"Content-Type": "application/xml"}
+        return HTTPStatus.OK, headers, body.encode()
+
+
+def _error(status: HTTPStatus, code: str) -> tuple[int, dict, bytes]:
+    """Return an error response formatted like S3 does.
+
+    Args:
+        status: status of the response.
+        code: S3 error code.
+
+    Returns:
+        status, headers and body of the response.
+    """
+    body = f"<Error><Code>{code}</Code></Error>".encode()
+    return status, {"Content-Type": "application/xml"}, body
+
+
+def _create_handler(bucket: FakeBucket) -> type[BaseHTTPRequestHandler]:
+    """Create the request handler that answers from the bucket.
+
+    Args:
+        bucket: bucket to answer the requests from.
+
+    Returns:
+        the request handler class.
+    """
+
+    class _Handler(BaseHTTPRequestHandler):
+        """Handler answering the requests from the fake bucket."""
+
+        protocol_version = "HTTP/1.1"
+
+        def _respond(self, *, include_body: bool) -> None:
+            """Send the response of the bucket to the client."""
+            status, headers, body = bucket.respond(self.command, self.path)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if include_body:
+                self.wfile.write(body)
+
+        def do_HEAD(self) -> None:
+            """Answer a probe of a single object."""
+            self._respond(include_body=False)
+
+        def do_GET(self) -> None:
+            """Answer a listing of the bucket."""
+            self._respond(include_body=True)
+
+        def log_message(self, *_: object) -> None:
+            """Keep the output of the benchmark clean."""
+
+    return _Handler
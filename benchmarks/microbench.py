@@ -0,0 +1,400 @@
+"""Microbenchmarks of the datamodel and the exporter.
+
+A synthetic history of releases is generated for every size, after which
+the comparisons, conversions and the creation of the exported views are
+timed on it. The results are written as JSON, so they can be stored as a
+baseline and later runs can be compared against it. For example:
+
+    python -m benchmarks.microbench --sizes 10000 100000 --output run.json
+    python -m benchmarks.microbench --compare benchmarks/baseline.json
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import UTC, datetime, timedelta
+from email.utils import format_datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from nukeversionparser.datamodel.constants import BASE_URL
+from nukeversionparser.datamodel.nuke_data import (
+    NukeFamily,
+    NukeInstaller,
+    NukeRelease,
+    SemanticVersion,
+)
+from nukeversionparser.exporter.export_data import (
+    _sort_families,
+    _write_views,
+)
+from nukeversionparser.query import ReleaseIndex
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+__slots__ = ("CASES", "BenchmarkResult", "generate_families", "run_case")
+
+BASELINE_FILE: Path = Path(__file__).parent / "baseline.json"
+"""Baseline that is compared against by default."""
+
+_MINORS_PER_FAMILY = 5
+_PATCHES_PER_MINOR = 20
+_HISTORY_DAYS = 365 * 10
+
+
+def _create_release(version: SemanticVersion, date: datetime) -> NukeRelease:
+    """Return a release with installers for every platform.
+
+    Args:
+        version: version of the release.
+        date: date of the release.
+
+    Returns:
+        the created release.
+    """
+    urls = {
+        field_name: BASE_URL.format(
+            major=version.major,
+            version_separator="",
+            minor=version.minor,
+            patch=version.patch,
+            os=system,
+            architecture=architecture,
+            extension=extension,
+        )
+        for field_name, system, architecture, extension in (
+            ("mac_arm", "mac", "arm64", "dmg"),
+            ("mac_x86_64", "mac", "x86_64", "dmg"),
+            ("linux_x86_64", "linux", "x86_64", "tgz"),
+            ("windows_x86_64", "win", "x86_64", "zip"),
+        )
+    }
+    return NukeRelease(
+        version=version,
+        installer=NukeInstaller(**urls),
+        date=format_datetime(date, usegmt=True),
+    )
+
+
+def generate_families(size: int, seed: int = 0) -> list[NukeFamily]:
+    """Generate a synthetic history of releases.
+
+    Every family has the same amount of minor and patch releases. The
+    dates are spread over the last ten years, so part of the releases is
+    still supported.
+
+    Args:
+        size: amount of releases to generate.
+        seed: seed of the random generator, so every run is the same.
+
+    Returns:
+        the generated families, in the order they are collected.
+    """
+    generator = random.Random(seed)
+    now = datetime.now(UTC).replace(microsecond=0)
+    releases_per_family = _MINORS_PER_FAMILY * _PATCHES_PER_MINOR
+    history = timedelta(days=_HISTORY_DAYS)
+    families = []
+    for major in range(1, size // releases_per_family + 2):
+        releases = [
+            _create_release(
+                SemanticVersion(major, minor, patch),
+                now - history * generator.random(),
+            )
+            for minor in range(_MINORS_PER_FAMILY)
+            for patch in range(1, _PATCHES_PER_MINOR + 1)
+        ]
+        families.append(NukeFamily(releases))
+    remaining = size
+    for family in families:
+        family.releases = family.releases[:remaining]
+        remaining -= len(family.releases)
+    return [family for family in families if family.releases]
+
+
+def _copy_families(
+    families: list[NukeFamily], *, shuffle: bool = False
+) -> list[NukeFamily]:
+    """Return families with their own list of releases.
+
+    Args:
+        families: families to copy.
+        shuffle: shuffle the families and their releases.
+
+    Returns:
+        the copied families, sharing the releases themselves.
+    """
+    generator = random.Random(0)
+    copied_families = []
+    for family in families:
+        releases = list(family.releases)
+        if shuffle:
+            generator.shuffle(releases)
+        copied_families.append(NukeFamily(releases))
+    if shuffle:
+        generator.shuffle(copied_families)
+    return copied_families
+
+
+def _get_releases(families: list[NukeFamily]) -> list[NukeRelease]:
+    """Return the releases of all families."""
+    return [release for family in families for release in family.releases]
+
+
+def _get_version_pairs(
+    families: list[NukeFamily],
+) -> list[tuple[SemanticVersion, SemanticVersion]]:
+    """Return every version paired with a version in random order."""
+    versions = [release.version for release in _get_releases(families)]
+    shuffled_versions = list(versions)
+    random.Random(0).shuffle(shuffled_versions)
+    return list(zip(versions, shuffled_versions, strict=True))
+
+
+def _greater_than(pairs: list[tuple[Any, Any]]) -> None:
+    """Compare every pair with greater than."""
+    for version, other in pairs:
+        version > other  # noqa: B015
+
+
+def _lower_than(pairs: list[tuple[Any, Any]]) -> None:
+    """Compare every pair with lower than."""
+    for version, other in pairs:
+        version < other  # noqa: B015
+
+
+def _get_supported(releases: list[NukeRelease]) -> None:
+    """Get the supported state of every release at a single moment."""
+    as_of = datetime.now(UTC)
+    for release in releases:
+        release.get_supported(as_of)
+
+
+def _to_dict(families: list[NukeFamily]) -> None:
+    """Convert every family to a dict at a single moment."""
+    as_of = datetime.now(UTC)
+    for family in families:
+        family.to_dict(as_of)
+
+
+def _to_exported_data(families: list[NukeFamily]) -> dict[str, Any]:
+    """Return the families as they are read from an exported file."""
+    as_of = datetime.now(UTC)
+    data = {}
+    for family in families:
+        data.update(family.to_dict(as_of))
+    return json.loads(json.dumps(data))
+
+
+def _from_dict(data: dict[str, Any]) -> None:
+    """Restore every family of the exported data."""
+    for family_version, releases in data.items():
+        NukeFamily.from_dict({family_version: releases})
+
+
+def _write_views_to_temporary_directory(families: list[NukeFamily]) -> None:
+    """Write every view to a temporary directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        _write_views(families, Path(directory))
+
+
+CASES: dict[str, tuple[Callable, Callable[[list[NukeFamily]], Any]]] = {
+    "SemanticVersion.__gt__": (_greater_than, _get_version_pairs),
+    "SemanticVersion.__lt__": (_lower_than, _get_version_pairs),
+    "NukeRelease.get_supported": (_get_supported, _get_releases),
+    "NukeFamily.to_dict": (_to_dict, _copy_families),
+    "_sort_families": (
+        _sort_families,
+        lambda families: _copy_families(families, shuffle=True),
+    ),
+    "NukeFamily.from_dict": (_from_dict, _to_exported_data),
+    "ReleaseIndex.from_dict": (ReleaseIndex.from_dict, _to_exported_data),
+    "_write_views": (_write_views_to_temporary_directory, _copy_families),
+}
+"""Name of every case mapped to the timed function and its setup.
+
+The setup creates the argument of the timed function from the sorted
+families before every repeat, without being timed itself."""
+
+
+@dataclass
+class BenchmarkResult:
+    """Data object to store the timings of a single case."""
+
+    case: str
+    """Name of the case."""
+    size: int
+    """Amount of releases the case ran on."""
+    best: float
+    """Fastest run in seconds."""
+    median: float
+    """Median run in seconds."""
+    per_release_ns: float
+    """Nanoseconds per release of the fastest run."""
+
+
+def run_case(
+    name: str, families: list[NukeFamily], repeat: int = 3
+) -> BenchmarkResult:
+    """Time a case on the provided families.
+
+    Args:
+        name: name of the case in CASES.
+        families: sorted families to run the case on.
+        repeat: amount of times to run the case.
+
+    Returns:
+        the timings of the case.
+    """
+    function, setup = CASES[name]
+    size = len(_get_releases(families))
+    timings = []
+    for _ in range(repeat):
+        argument = setup(families)
+        start_time = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start_time)
+    best = min(timings)
+    return BenchmarkResult(
+        case=name,
+        size=size,
+        best=best,
+        median=statistics.median(timings),
+        per_release_ns=best / size * 1e9,
+    )
+
+
+def _compare(
+    results: list[BenchmarkResult], baseline: dict[str, Any], tolerance: float
+) -> tuple[str, bool]:
+    """Compare the results against a baseline.
+
+    Args:
+        results: results of this run.
+        baseline: previously written results.
+        tolerance: fraction a case may be slower before it is a
+            regression.
+
+    Returns:
+        the report and True if any case regressed.
+    """
+    baseline_results = {
+        (result["case"], result["size"]): result["best"]
+        for result in baseline["results"]
+    }
+    lines = [f"{'case':<32} {'size':>8} {'ratio':>7}"]
+    regressed = False
+    for result in results:
+        baseline_best = baseline_results.get((result.case, result.size))
+        if baseline_best is None:
+            continue
+        ratio = result.best / baseline_best
+        marker = ""
+        if ratio > 1 + tolerance:
+            regressed = True
+            marker = " regression"
+        lines.append(
+            f"{result.case:<32} {result.size:>8} {ratio:>7.2f}{marker}"
+        )
+    return "\n".join(lines), regressed
+
+
+def _format_results(results: list[BenchmarkResult]) -> str:
+    """Return the results as a table."""
+    lines = [
+        (
+            f"{'case':<32} {'size':>8} {'best (s)':>9} {'median (s)':>10} "
+            f"{'ns/release':>10}"
+        )
+    ]
+    lines.extend(
+        f"{result.case:<32} {result.size:>8} {result.best:>9.4f} "
+        f"{result.median:>10.4f} {result.per_release_ns:>10.1f}"
+        for result in results
+    )
+    return "\n".join(lines)
+
+
+def _parse_args(args: list[str]) -> argparse.Namespace:
+    """Parse provided arguments."""
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.microbench",
+        description="Time the datamodel and exporter on synthetic data.",
+    )
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000]
+    )
+    parser.add_argument(
+        "--cases",
+        nargs="+",
+        choices=list(CASES),
+        default=list(CASES),
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--output", type=Path, help="Path to write the results as JSON to."
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="?",
+        const=BASELINE_FILE,
+        help="Baseline to compare against, defaults to the stored one.",
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Fraction a case may be slower than the baseline.",
+    )
+    return parser.parse_args(args)
+
+
+def main() -> None:
+    """Run the benchmarks and compare them if requested."""
+    parsed_arguments = _parse_args(sys.argv[1:])
+    results = []
+    for size in parsed_arguments.sizes:
+        families = generate_families(size)
+        _sort_families(families)
+        results.extend(
+            run_case(case, families, parsed_arguments.repeat)
+            for case in parsed_arguments.cases
+        )
+
+    sys.stdout.write(_format_results(results) + "\n")
+    if parsed_arguments.output is not None:
+        parsed_arguments.output.write_text(
+            json.dumps(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": [asdict(result) for result in results],
+                },
+                indent=4,
+            )
+            + "\n"
+        )
+    if parsed_arguments.compare is not None:
+        report, regressed = _compare(
+            results,
+            json.loads(parsed_arguments.compare.read_text()),
+            parsed_arguments.tolerance,
+        )
+        sys.stdout.write(report + "\n")
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -28,3 +28,17 @@ BASE_URL: str = (
     "{architecture}.{extension}"
 )
 """Structure of a base url where the executables are stored."""
+
+PLATFORMS: tuple[tuple[str, OperatingSystem, Architecture], ...] = (
+    ("linux_x86_64", OperatingSystem.LINUX, Architecture.X86_64),
+    ("windows_x86_64", OperatingSystem.WINDOWS, Architecture.X86_64),
+    ("mac_x86_64", OperatingSystem.MAC, Architecture.X86_64),
+    ("mac_arm", OperatingSystem.MAC, Architecture.ARM),
+)
+"""Installer fields mapped to their platform.
+
+The order defines which platform provides the date of a release.
+"""
+
+SUPPORTED_DAYS: int = 548
+"""Days a release is supported, which is roughly 18 months."""
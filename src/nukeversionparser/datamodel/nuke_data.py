@@ -5,14 +5,35 @@
 
 from __future__ import annotations
 
+import re
 from dataclasses import asdict, dataclass
-from datetime import datetime, timezone
-from typing import Any
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from functools import cache
+from typing import Any, ClassVar
 
+from nukeversionparser.datamodel.constants import SUPPORTED_DAYS
 
-@dataclass
+_VERSION_PATTERN = re.compile(r"(\d+)\.(\d+)v(\d+)")
+"""Pattern matching the string format of a version, for example 15.0v2."""
+
+
+def _create_comparison_error() -> TypeError:
+    """Return the error of comparing a version to another object."""
+    msg = "Comparison only allowed to SemanticVersion object."
+    return TypeError(msg)
+
+
+@dataclass(frozen=True, eq=False)
 class SemanticVersion:
-    """Data object to store a semantic version."""
+    """Data object to store a semantic version.
+
+    Versions are immutable and hashable, so they can be shared between
+    scans and used as dict keys or set members. Deriving another version
+    is done with the `with_patch` and `next_*` methods.
+    """
+
+    __slots__ = ("_key", "major", "minor", "patch")
 
     major: int
     """The big release of software."""
@@ -21,10 +42,72 @@ class SemanticVersion:
     patch: int
     """Bugfix release."""
 
+    def __post_init__(self) -> None:
+        """Store the key the version is compared and hashed with.
+
+        The key is a slot instead of a field, so it is not part of
+        `asdict`, `astuple` or `replace`.
+        """
+        object.__setattr__(self, "_key", (self.major, self.minor, self.patch))
+
     def __str__(self) -> str:
         """Return object in string format."""
         return f"{self.major}.{self.minor}v{self.patch}"
 
+    @classmethod
+    @cache
+    def parse(cls, version: str) -> SemanticVersion:
+        """Create a SemanticVersion from its string format.
+
+        Parsed versions are cached, as every exported file repeats the
+        same versions.
+
+        Args:
+            version: version in string format, for example 15.0v2.
+
+        Raises:
+            ValueError: if the string is not a valid version.
+
+        Returns:
+            the parsed SemanticVersion.
+        """
+        match = _VERSION_PATTERN.fullmatch(version)
+        if not match:
+            msg = f"Invalid version string: {version}"
+            raise ValueError(msg)
+        major, minor, patch = match.groups()
+        return cls(int(major), int(minor), int(patch))
+
+    def with_patch(self, patch: int) -> SemanticVersion:
+        """Return the version of the same minor release with another patch.
+
+        Args:
+            patch: patch of the returned version.
+        """
+        return SemanticVersion(self.major, self.minor, patch)
+
+    def next_patch(self) -> SemanticVersion:
+        """Return the version of the next patch release."""
+        return SemanticVersion(self.major, self.minor, self.patch + 1)
+
+    def next_minor(self) -> SemanticVersion:
+        """Return the first patch of the next minor release."""
+        return SemanticVersion(self.major, self.minor + 1, 1)
+
+    def next_major(self) -> SemanticVersion:
+        """Return the first patch of the next major release."""
+        return SemanticVersion(self.major + 1, 0, 1)
+
+    def __eq__(self, other: object) -> bool:
+        """Return True if both versions are the same."""
+        if not isinstance(other, SemanticVersion):
+            return NotImplemented
+        return self._key == other._key
+
+    def __hash__(self) -> int:
+        """Return the hash of the version."""
+        return hash(self._key)
+
     def __gt__(self, other: SemanticVersion) -> bool:
         """Greater than implementation.
 
@@ -37,16 +120,25 @@ class SemanticVersion:
         Returns:
             True if greater than, False if not.
         """
-        if not isinstance(other, self.__class__):
-            msg = "Comparison only allowed to SemanticVersion object."
-            raise TypeError(msg)
-        if self == other:
-            return False
-        if self.major != other.major:
-            return self.major > other.major
-        if self.minor != other.minor:
-            return self.minor > other.minor
-        return self.patch > other.patch
+        if isinstance(other, SemanticVersion):
+            return self._key > other._key
+        raise _create_comparison_error()
+
+    def __ge__(self, other: SemanticVersion) -> bool:
+        """Greater than or equal implementation.
+
+        Args:
+            other: other object to compare to.
+
+        Raises:
+            TypeError: if provided object is not a SemanticVersion.
+
+        Returns:
+            True if greater than or equal, False if not.
+        """
+        if isinstance(other, SemanticVersion):
+            return self._key >= other._key
+        raise _create_comparison_error()
 
     def __lt__(self, other: SemanticVersion) -> bool:
         """Lower than implementation.
@@ -54,12 +146,43 @@ class SemanticVersion:
         Args:
             other: other object to compare to.
 
+        Raises:
+            TypeError: if provided object is not a SemanticVersion.
+
         Returns:
             True if smaller than, False if not.
         """
-        if self == other:
-            return False
-        return not self.__gt__(other)
+        if isinstance(other, SemanticVersion):
+            return self._key < other._key
+        raise _create_comparison_error()
+
+    def __le__(self, other: SemanticVersion) -> bool:
+        """Lower than or equal implementation.
+
+        Args:
+            other: other object to compare to.
+
+        Raises:
+            TypeError: if provided object is not a SemanticVersion.
+
+        Returns:
+            True if smaller than or equal, False if not.
+        """
+        if isinstance(other, SemanticVersion):
+            return self._key <= other._key
+        raise _create_comparison_error()
+
+    def __reduce__(self) -> tuple[type[SemanticVersion], tuple[int, ...]]:
+        """Return how to recreate the version, used by pickle."""
+        return SemanticVersion, self._key
+
+    def __copy__(self) -> SemanticVersion:
+        """Return the version itself, as it is immutable."""
+        return self
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> SemanticVersion:
+        """Return the version itself, as it is immutable."""
+        return self
 
 
 @dataclass
@@ -87,36 +210,94 @@ class NukeRelease:
     """Installer data."""
     date: str
     """Date of release."""
+    _parsed_date: ClassVar[tuple[str, datetime] | None] = None
+    """Date of release mapped to its parsed datetime, set per instance."""
+
+    @property
+    def released(self) -> datetime:
+        """Return the date of release as a timezone aware datetime.
 
-    def get_supported(self) -> bool:
+        The date is parsed once and parsed again only if it has changed.
+
+        Raises:
+            ValueError: if no date is set.
+        """
+        if self._parsed_date is None or self._parsed_date[0] != self.date:
+            if not self.date:
+                msg = "No date is set, can't get supported state."
+                raise ValueError(msg)
+            released = parsedate_to_datetime(self.date)
+            if released.tzinfo is None:
+                released = released.replace(tzinfo=UTC)
+            self._parsed_date = (self.date, released)
+        return self._parsed_date[1]
+
+    def get_supported(self, as_of: datetime | None = None) -> bool:
         """Return True if supported, False if not.
 
         This returns False if the release date is older than 18 months.
-        """
-        if not self.date:
-            msg = "No date is set, can't get supported state."
-            raise ValueError(msg)
 
-        collected_date = datetime.strptime(
-            self.date, "%a, %d %b %Y %H:%M:%S %Z"
-        ).replace(tzinfo=timezone.utc)
-        current_date = datetime.now(timezone.utc)
+        Args:
+            as_of: moment to evaluate the supported state at, defaults to
+                now. Pass the same moment for every release of a run, so
+                they are all evaluated alike.
+        """
+        as_of = as_of or datetime.now(UTC)
+        days_between: int = (as_of - self.released).days
+        return days_between <= SUPPORTED_DAYS
 
-        days_between: int = (current_date - collected_date).days
-        if days_between <= 548:  # this is roughly 18 months  # noqa: PLR2004
-            return True
-        return False
+    def to_dict(
+        self, as_of: datetime | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Return a dict with all data.
 
-    def to_dict(self) -> dict[str, dict[str, Any]]:
-        """Return a dict with all data."""
+        Args:
+            as_of: moment to evaluate the supported state at, defaults to
+                now.
+        """
         return {
             str(self.version): {
                 "installer": asdict(self.installer),
                 "date": self.date,
-                "supported": self.get_supported(),
+                "supported": self.get_supported(as_of),
             }
         }
 
+    @classmethod
+    def from_dict(cls, data: dict[str, dict[str, Any]]) -> NukeRelease:
+        """Create a NukeRelease from the format returned by `to_dict`.
+
+        Note:
+            the supported state is not stored, as it is derived from the date.
+
+        Args:
+            data: dict containing the version mapped to its data.
+
+        Returns:
+            the restored NukeRelease.
+        """
+        ((version, release_data),) = data.items()
+        return cls._from_release_data(version, release_data)
+
+    @classmethod
+    def _from_release_data(
+        cls, version: str, release_data: dict[str, Any]
+    ) -> NukeRelease:
+        """Create a NukeRelease from its version and its data.
+
+        Args:
+            version: version in string format, for example 15.0v2.
+            release_data: data of the release, as stored by `to_dict`.
+
+        Returns:
+            the restored NukeRelease.
+        """
+        return cls(
+            SemanticVersion.parse(version),
+            NukeInstaller(**release_data["installer"]),
+            release_data["date"],
+        )
+
 
 @dataclass
 class NukeFamily:
@@ -144,19 +325,50 @@ class NukeFamily:
         semantic_version: SemanticVersion = self.releases[0].version
         return semantic_version.major
 
-    def get_supported(self) -> bool:
-        """Return bool containing supported status."""
-        return any(version.get_supported() for version in self.releases)
+    def get_supported(self, as_of: datetime | None = None) -> bool:
+        """Return bool containing supported status.
 
-    def to_dict(self) -> dict:
-        """Convert the NukeFamily to a dictionary containing all releases."""
+        Args:
+            as_of: moment to evaluate the supported state at, defaults to
+                now.
+        """
+        as_of = as_of or datetime.now(UTC)
+        return any(version.get_supported(as_of) for version in self.releases)
+
+    def to_dict(self, as_of: datetime | None = None) -> dict:
+        """Convert the NukeFamily to a dictionary containing all releases.
+
+        Args:
+            as_of: moment to evaluate the supported state at, defaults to
+                now.
+        """
+        as_of = as_of or datetime.now(UTC)
         combined_data = {}
         for release in self.releases:
-            release_dict = release.to_dict()
+            release_dict = release.to_dict(as_of)
             combined_data.update(release_dict)
 
         return {self.version: combined_data}
 
+    @classmethod
+    def from_dict(cls, data: dict[Any, dict[str, Any]]) -> NukeFamily:
+        """Create a NukeFamily from the format returned by `to_dict`.
+
+        Args:
+            data: dict containing the family version mapped to its releases.
+
+        Returns:
+            the restored NukeFamily.
+        """
+        ((_, releases_data),) = data.items()
+        from_release_data = NukeRelease._from_release_data  # noqa: SLF001
+        return cls(
+            [
+                from_release_data(version, release_data)
+                for version, release_data in releases_data.items()
+            ]
+        )
+
 
 class IncompatibleFamilyError(Exception):
     """Exception that is raised when a Nuke Family is incompatible."""
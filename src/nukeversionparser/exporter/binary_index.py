@@ -0,0 +1,423 @@
+"""Script that writes and reads the binary index of all releases.
+
+The index answers lookups like the latest release of a family for a
+platform without parsing the exported JSON. The reader maps the file into
+memory and only unpacks the records a lookup visits, so opening the index
+and looking up a release takes microseconds, and the memory used does not
+grow with the amount of releases.
+
+All numbers are little endian. The file consists of:
+
+* a header, see `_HEADER`.
+* the family table, a record per family sorted by major version, with
+  the index of its first release and the amount of releases.
+* the release table, a fixed width record per release sorted by version,
+  with the index of its date and of the installer of every platform in the
+  string table.
+* the string table, the offset of every string followed by the UTF-8
+  encoded strings. Every string is stored once, no matter how many
+  releases refer to it.
+
+@maintainer: Gilles Vink
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+from operator import attrgetter
+from typing import TYPE_CHECKING, Self
+
+from nukeversionparser.datamodel.nuke_data import (
+    NukeInstaller,
+    NukeRelease,
+    SemanticVersion,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import TracebackType
+
+    from nukeversionparser.datamodel.nuke_data import NukeFamily
+
+__slots__ = (
+    "BINARY_INDEX_FILE",
+    "FORMAT_VERSION",
+    "BinaryIndexError",
+    "BinaryIndexReader",
+    "create_binary_index",
+)
+
+BINARY_INDEX_FILE: str = "nuke-releases.idx"
+"""Name of the binary index file."""
+FORMAT_VERSION: int = 1
+"""Version of the format, increased on every incompatible change."""
+
+_MAGIC = b"NVPI"
+"""Bytes every index starts with."""
+_HEADER = struct.Struct("<4sHxxIIIIII")
+"""Magic, format version, amount of families, releases and strings, and
+the offset of the family, release and string table."""
+_FAMILY = struct.Struct("<III")
+"""Major version, index of the first release and amount of releases."""
+_RELEASE = struct.Struct("<HHHxxIIIII")
+"""Major, minor and patch version, date and installer of every platform
+in `_INSTALLER_FIELDS` order."""
+_VERSION = struct.Struct("<HHH")
+"""Version at the start of every release record."""
+_STRING_OFFSET = struct.Struct("<I")
+"""Offset of a string, relative to the start of the strings."""
+_NO_STRING = 0xFFFFFFFF
+"""Index of a string that is not set."""
+_INSTALLER_FIELDS: tuple[str, ...] = (
+    "mac_arm",
+    "mac_x86_64",
+    "linux_x86_64",
+    "windows_x86_64",
+)
+"""Platforms stored in every release record, in order."""
+_INSTALLER_OFFSET = _RELEASE.size - _STRING_OFFSET.size * len(
+    _INSTALLER_FIELDS
+)
+"""Offset of the first installer within a release record."""
+
+
+class BinaryIndexError(Exception):
+    """Exception that is raised when a file is not a valid binary index."""
+
+
+def create_binary_index(families: list[NukeFamily]) -> bytes:
+    """Create the binary index of the releases of all families.
+
+    The same releases always result in the same bytes, regardless of the
+    order of the families.
+
+    Args:
+        families: families to index.
+
+    Returns:
+        the content of the index.
+    """
+    releases = sorted(
+        (release for family in families for release in family.releases),
+        key=attrgetter("version"),
+    )
+    strings: dict[str, int] = {}
+
+    def intern(value: str | None) -> int:
+        """Return the index of the string, adding it if it is new."""
+        if not value:
+            return _NO_STRING
+        return strings.setdefault(value, len(strings))
+
+    family_records: list[list[int]] = []
+    release_records = []
+    for index, release in enumerate(releases):
+        version = release.version
+        if not family_records or family_records[-1][0] != version.major:
+            family_records.append([version.major, index, 0])
+        family_records[-1][2] += 1
+        release_records.append(
+            _RELEASE.pack(
+                version.major,
+                version.minor,
+                version.patch,
+                intern(release.date),
+                *(
+                    intern(getattr(release.installer, field_name))
+                    for field_name in _INSTALLER_FIELDS
+                ),
+            )
+        )
+
+    encoded_strings = [string.encode() for string in strings]
+    string_offsets = [0]
+    for encoded_string in encoded_strings:
+        string_offsets.append(string_offsets[-1] + len(encoded_string))
+
+    family_offset = _HEADER.size
+    release_offset = family_offset + _FAMILY.size * len(family_records)
+    string_offset = release_offset + _RELEASE.size * len(release_records)
+    header = _HEADER.pack(
+        _MAGIC,
+        FORMAT_VERSION,
+        len(family_records),
+        len(release_records),
+        len(encoded_strings),
+        family_offset,
+        release_offset,
+        string_offset,
+    )
+    return b"".join(
+        [
+            header,
+            *(_FAMILY.pack(*record) for record in family_records),
+            *release_records,
+            *(_STRING_OFFSET.pack(offset) for offset in string_offsets),
+            *encoded_strings,
+        ]
+    )
+
+
+class BinaryIndexReader:
+    """Object that looks up releases in a binary index.
+
+    The index is mapped into memory, and lookups binary search the sorted
+    tables. Only the records that are visited are unpacked.
+    """
+
+    def __init__(self, file_path: Path) -> None:
+        """Create instance of the BinaryIndexReader object.
+
+        Args:
+            file_path: path of the binary index.
+
+        Raises:
+            BinaryIndexError: if the file is not a binary index, is
+                written in an unsupported version of the format, or is
+                truncated or corrupt.
+        """
+        with file_path.open("rb") as file:
+            try:
+                self._buffer = mmap.mmap(
+                    file.fileno(), 0, access=mmap.ACCESS_READ
+                )
+            except ValueError:
+                msg = f"{file_path} is empty, not a binary index."
+                raise BinaryIndexError(msg) from None
+        if len(self._buffer) < _HEADER.size:
+            self.close()
+            msg = f"{file_path} is too small to be a binary index."
+            raise BinaryIndexError(msg)
+        (
+            magic,
+            version,
+            self._family_count,
+            self._release_count,
+            self._string_count,
+            self._family_offset,
+            self._release_offset,
+            self._string_offset,
+        ) = _HEADER.unpack_from(self._buffer)
+        if magic != _MAGIC:
+            self.close()
+            msg = f"{file_path} is not a binary index."
+            raise BinaryIndexError(msg)
+        if version != FORMAT_VERSION:
+            self.close()
+            msg = (
+                f"{file_path} is written in version {version} of the "
+                f"format, only version {FORMAT_VERSION} is supported."
+            )
+            raise BinaryIndexError(msg)
+        self._strings_start = (
+            self._string_offset
+            + _STRING_OFFSET.size * (self._string_count + 1)
+        )
+        error = self._find_layout_error()
+        if error is not None:
+            self.close()
+            msg = f"{file_path} is truncated or corrupt, {error}."
+            raise BinaryIndexError(msg)
+
+    def _find_layout_error(self) -> str | None:
+        """Return why the tables do not fit the file, None if they do.
+
+        Only the header, the family table and the end of the string table
+        are checked, so opening the index stays independent of the amount
+        of releases.
+        """
+        size = len(self._buffer)
+        for name, offset, table_size in (
+            ("family", self._family_offset, _FAMILY.size * self._family_count),
+            (
+                "release",
+                self._release_offset,
+                _RELEASE.size * self._release_count,
+            ),
+            (
+                "string",
+                self._string_offset,
+                _STRING_OFFSET.size * (self._string_count + 1),
+            ),
+        ):
+            if offset < _HEADER.size or offset + table_size > size:
+                return f"the {name} table does not fit in {size} bytes"
+        (strings_size,) = _STRING_OFFSET.unpack_from(
+            self._buffer, self._strings_start - _STRING_OFFSET.size
+        )
+        if self._strings_start + strings_size > size:
+            return f"the strings do not fit in {size} bytes"
+        for index in range(self._family_count):
+            _, first_release, releases = _FAMILY.unpack_from(
+                self._buffer, self._family_offset + _FAMILY.size * index
+            )
+            if first_release + releases > self._release_count:
+                return f"family {index} refers to missing releases"
+        return None
+
+    def __enter__(self) -> Self:
+        """Return the reader when used as context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Close the reader when leaving the context."""
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the index."""
+        self._buffer.close()
+
+    def __len__(self) -> int:
+        """Return the amount of releases in the index."""
+        return self._release_count
+
+    @property
+    def family_versions(self) -> list[int]:
+        """Return the major version of every family, in ascending order."""
+        return [
+            _FAMILY.unpack_from(
+                self._buffer, self._family_offset + _FAMILY.size * index
+            )[0]
+            for index in range(self._family_count)
+        ]
+
+    def _get_string(self, index: int) -> str | None:
+        """Return a string of the string table, None if it is not set."""
+        if index == _NO_STRING:
+            return None
+        offset = self._string_offset + _STRING_OFFSET.size * index
+        (start,) = _STRING_OFFSET.unpack_from(self._buffer, offset)
+        (end,) = _STRING_OFFSET.unpack_from(
+            self._buffer, offset + _STRING_OFFSET.size
+        )
+        return self._buffer[
+            self._strings_start + start : self._strings_start + end
+        ].decode()
+
+    def _get_version(self, index: int) -> tuple[int, int, int]:
+        """Return the version of a release as a tuple."""
+        return _VERSION.unpack_from(
+            self._buffer, self._release_offset + _RELEASE.size * index
+        )
+
+    def _get_release(self, index: int) -> NukeRelease:
+        """Return a release of the release table."""
+        major, minor, patch, date, *installers = _RELEASE.unpack_from(
+            self._buffer, self._release_offset + _RELEASE.size * index
+        )
+        return NukeRelease(
+            version=SemanticVersion(major, minor, patch),
+            installer=NukeInstaller(
+                **{
+                    field_name: self._get_string(installer)
+                    for field_name, installer in zip(
+                        _INSTALLER_FIELDS, installers, strict=True
+                    )
+                }
+            ),
+            date=self._get_string(date),
+        )
+
+    def _has_installer(self, index: int, field_index: int) -> bool:
+        """Return True if the release has an installer for the platform."""
+        (installer,) = _STRING_OFFSET.unpack_from(
+            self._buffer,
+            self._release_offset
+            + _RELEASE.size * index
+            + _INSTALLER_OFFSET
+            + _STRING_OFFSET.size * field_index,
+        )
+        return installer != _NO_STRING
+
+    def _bisect(
+        self, version: tuple[int, int, int], start: int, end: int
+    ) -> int:
+        """Return the index of the first release not before the version."""
+        while start < end:
+            middle = (start + end) // 2
+            if self._get_version(middle) < version:
+                start = middle + 1
+            else:
+                end = middle
+        return start
+
+    def _get_family_range(self, major: int) -> tuple[int, int]:
+        """Return the first and after last release index of a family."""
+        start, end = 0, self._family_count
+        while start < end:
+            middle = (start + end) // 2
+            family_major, first_release, releases = _FAMILY.unpack_from(
+                self._buffer, self._family_offset + _FAMILY.size * middle
+            )
+            if family_major == major:
+                return first_release, first_release + releases
+            if family_major < major:
+                start = middle + 1
+            else:
+                end = middle
+        return 0, 0
+
+    def find(self, version: SemanticVersion) -> NukeRelease | None:
+        """Return the release of a version.
+
+        Args:
+            version: version of the release.
+
+        Returns:
+            the release, None if it is not in the index.
+        """
+        key = (version.major, version.minor, version.patch)
+        index = self._bisect(key, 0, self._release_count)
+        if index < self._release_count and self._get_version(index) == key:
+            return self._get_release(index)
+        return None
+
+    def latest(
+        self,
+        major: int | None = None,
+        minor: int | None = None,
+        platform: str | None = None,
+    ) -> NukeRelease | None:
+        """Return the latest release matching the provided filters.
+
+        Args:
+            major: only consider releases of this family.
+            minor: only consider releases of this minor version, requires
+                the major version.
+            platform: only consider releases with an installer for this
+                platform, which is a field of `NukeInstaller`.
+
+        Returns:
+            the latest matching release, None if no release matches.
+
+        Raises:
+            ValueError: if a minor version is provided without a major
+                version, or the platform does not exist.
+        """
+        if minor is not None and major is None:
+            msg = "A minor version can only be provided with a major version."
+            raise ValueError(msg)
+        field_index = None
+        if platform is not None:
+            if platform not in _INSTALLER_FIELDS:
+                msg = f"Unknown platform {platform}."
+                raise ValueError(msg)
+            field_index = _INSTALLER_FIELDS.index(platform)
+
+        start, end = 0, self._release_count
+        if major is not None:
+            start, end = self._get_family_range(major)
+        if minor is not None:
+            start = self._bisect((major, minor, 0), start, end)
+            end = self._bisect((major, minor + 1, 0), start, end)
+
+        for index in range(end - 1, start - 1, -1):
+            if field_index is None or self._has_installer(index, field_index):
+                return self._get_release(index)
+        return None
@@ -0,0 +1,243 @@
+"""Script that records the changes between successive runs.
+
+The releases of a run are compared against the previously exported
+releases, and every difference is appended to a change feed as a single
+line of JSON. Every change has a sequence number, which starts at 1 and
+increases by one for every change. Consumers remember the last sequence
+they have seen and only read the changes after it, instead of the
+complete releases file.
+
+@maintainer: Gilles Vink
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict
+from enum import StrEnum
+from itertools import islice
+from typing import TYPE_CHECKING, Any, BinaryIO
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from pathlib import Path
+
+    from nukeversionparser.datamodel.nuke_data import NukeFamily
+
+__slots__ = (
+    "CHANGES_FILE",
+    "ChangeType",
+    "append_changes",
+    "create_snapshot",
+    "find_changes",
+    "read_changes",
+    "read_last_sequence",
+)
+
+CHANGES_FILE: str = "nuke-changes.jsonl"
+"""Name of the change feed file."""
+
+_TAIL_CHUNK_SIZE = 4096
+"""Bytes read at once while searching the last change from the end."""
+
+
+class ChangeType(StrEnum):
+    """Available types of changes in the feed."""
+
+    RELEASE_ADDED = "release_added"
+    """A release that was not exported before."""
+    INSTALLER_ADDED = "installer_added"
+    """An installer for a platform that was not available before."""
+    SUPPORT_CHANGED = "support_changed"
+    """The supported state of a release flipped."""
+
+
+def create_snapshot(
+    data: dict[str, dict[str, dict[str, Any]]],
+) -> dict[str, dict[str, Any]]:
+    """Create a snapshot from the data of an exported releases file.
+
+    Args:
+        data: family versions mapped to their releases, as exported.
+
+    Returns:
+        every version mapped to its installers and supported state.
+    """
+    return {
+        version: release_data
+        for releases in data.values()
+        for version, release_data in releases.items()
+    }
+
+
+def find_changes(
+    snapshot: dict[str, dict[str, Any]],
+    families: list[NukeFamily],
+    as_of: datetime,
+) -> list[dict[str, Any]]:
+    """Return the changes of the families compared to the snapshot.
+
+    The changes do not have a sequence yet, as it is assigned when they
+    are appended to the feed.
+
+    Args:
+        snapshot: previously exported releases, see `create_snapshot`.
+        families: sorted families of this run.
+        as_of: moment the supported state is evaluated at.
+
+    Returns:
+        the changes, in the order of the families.
+    """
+    time = as_of.isoformat()
+    changes = []
+    for family in families:
+        for release in family.releases:
+            version = str(release.version)
+            supported = release.get_supported(as_of)
+            previous_data = snapshot.get(version)
+            if previous_data is None:
+                ((_, release_data),) = release.to_dict(as_of).items()
+                changes.append(
+                    {
+                        "time": time,
+                        "type": ChangeType.RELEASE_ADDED.value,
+                        "version": version,
+                        **release_data,
+                    }
+                )
+                continue
+            previous_installer = previous_data.get("installer", {})
+            changes.extend(
+                {
+                    "time": time,
+                    "type": ChangeType.INSTALLER_ADDED.value,
+                    "version": version,
+                    "platform": platform,
+                    "url": url,
+                }
+                for platform, url in asdict(release.installer).items()
+                if url and not previous_installer.get(platform)
+            )
+            if previous_data.get("supported") != supported:
+                changes.append(
+                    {
+                        "time": time,
+                        "type": ChangeType.SUPPORT_CHANGED.value,
+                        "version": version,
+                        "supported": supported,
+                    }
+                )
+    return changes
+
+
+def _find_last_line(file: BinaryIO) -> tuple[bytes, int]:
+    """Find the last complete line of the feed, searching from the end.
+
+    A line is complete when it ends with a newline. A run that is killed
+    while appending may leave an incomplete line behind.
+
+    Args:
+        file: change feed opened in binary mode.
+
+    Returns:
+        the last complete line without its newline, empty if there is none,
+        and the offset right after it, where an incomplete line starts.
+    """
+    end = file.seek(0, os.SEEK_END)
+    tail = b""
+    position = end
+    while position > 0:
+        position = max(0, position - _TAIL_CHUNK_SIZE)
+        file.seek(position)
+        tail = file.read(end - position)
+        line_end = tail.rfind(b"\n")
+        if line_end != -1 and tail.rfind(b"\n", 0, line_end) != -1:
+            break
+    line_end = tail.rfind(b"\n")
+    if line_end == -1:
+        return b"", 0
+    line_start = tail.rfind(b"\n", 0, line_end) + 1
+    return tail[line_start:line_end], position + line_end + 1
+
+
+def read_last_sequence(file_path: Path) -> int:
+    """Return the sequence of the last change in the feed.
+
+    Only the end of the file is read, as the feed keeps growing. A last
+    line that is not complete is ignored.
+
+    Args:
+        file_path: path of the change feed.
+
+    Returns:
+        the last sequence, 0 if there are no changes.
+    """
+    if not file_path.is_file():
+        return 0
+    with file_path.open("rb") as file:
+        last_line, _ = _find_last_line(file)
+    if not last_line:
+        return 0
+    return json.loads(last_line)["sequence"]
+
+
+def append_changes(file_path: Path, changes: list[dict[str, Any]]) -> int:
+    """Number the changes and append them to the feed.
+
+    All changes are appended with a single write, which is synced to disk
+    before returning. A run that is killed while appending may leave only
+    part of its changes behind, ending with an incomplete line. Readers
+    ignore that line and the next append removes it first, so the numbering
+    continues after the last complete change.
+
+    Args:
+        file_path: path of the change feed.
+        changes: changes to append, see `find_changes`.
+
+    Returns:
+        the sequence of the last change in the feed.
+    """
+    sequence = read_last_sequence(file_path)
+    if not changes:
+        return sequence
+    lines = []
+    for change in changes:
+        sequence += 1
+        lines.append(
+            json.dumps(
+                {"sequence": sequence, **change}, separators=(",", ":")
+            )
+            + "\n"
+        )
+    with file_path.open("a+b") as file:
+        _, complete_end = _find_last_line(file)
+        file.truncate(complete_end)
+        file.write("".join(lines).encode())
+        file.flush()
+        os.fsync(file.fileno())
+    return sequence
+
+
+def read_changes(file_path: Path, since: int = 0) -> list[dict[str, Any]]:
+    """Read the changes after the provided sequence.
+
+    As every change is a line and the sequences start at 1 without gaps,
+    the lines before the requested sequence are skipped without parsing
+    them. A last line that is not complete yet is ignored.
+
+    Args:
+        file_path: path of the change feed.
+        since: last sequence that is already known.
+
+    Returns:
+        the changes after the sequence, oldest first.
+    """
+    if not file_path.is_file():
+        return []
+    with file_path.open() as file:
+        return [
+            json.loads(line)
+            for line in islice(file, max(since, 0), None)
+            if line.endswith("\n")
+        ]
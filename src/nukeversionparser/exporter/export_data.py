@@ -5,24 +5,111 @@
 
 from __future__ import annotations
 
-import copy
+import gzip
 import json
 import logging
-from collections import defaultdict
-from dataclasses import astuple
+from contextlib import ExitStack
+from dataclasses import dataclass
+from datetime import UTC, datetime
 from operator import attrgetter
-from typing import TYPE_CHECKING
-
-from nukeversionparser.parser.collector import collect_families
+from typing import TYPE_CHECKING, Any, BinaryIO, Self
+
+from nukeversionparser.datamodel.nuke_data import NukeFamily
+from nukeversionparser.exporter.binary_index import (
+    BINARY_INDEX_FILE,
+    create_binary_index,
+)
+from nukeversionparser.exporter.change_feed import (
+    CHANGES_FILE,
+    append_changes,
+    create_snapshot,
+    find_changes,
+)
+from nukeversionparser.exporter.manifest import (
+    FileDigest,
+    read_manifest,
+    write_manifest,
+)
+from nukeversionparser.files import ExportedFile
+from nukeversionparser.metrics import BYTES_WRITTEN, RELEASES
+from nukeversionparser.parser.bucket_listing import DiscoveryBackend
+from nukeversionparser.parser.collector import (
+    DEFAULT_MAX_WORKERS,
+    collect_families,
+    reprobe_unknown_installers,
+)
+from nukeversionparser.parser.concurrency import (
+    AdaptiveConcurrencyController,
+)
+from nukeversionparser.parser.parse_data import ScanOptions
+from nukeversionparser.parser.probe_cache import (
+    DEFAULT_NEGATIVE_TTL,
+    ProbeCache,
+)
+from nukeversionparser.parser.retry import UnknownProbes
+from nukeversionparser.parser.session import create_session
+from nukeversionparser.profiling import PROFILER
 
 if TYPE_CHECKING:
     from pathlib import Path
-
-    from nukeversionparser.datamodel.nuke_data import NukeFamily
+    from types import TracebackType
 
 logger = logging.getLogger(__name__)
 
-__slots__ = ("collect_and_write_json_files",)
+__slots__ = (
+    "ALL_RELEASES_FILE",
+    "ALL_SUPPORTED_RELEASES_FILE",
+    "GZIP_SUFFIX",
+    "MINIFIED_SUFFIX",
+    "MINOR_RELEASES_FILE",
+    "MINOR_SUPPORTED_RELEASES_FILE",
+    "VIEW_FILES",
+    "ExportOptions",
+    "collect_and_write_json_files",
+)
+
+MINOR_RELEASES_FILE: str = "nuke-minor-releases.json"
+"""Name of the file containing the latest patch of every minor release."""
+ALL_RELEASES_FILE: str = "nuke-all-releases.json"
+"""Name of the file containing all releases."""
+MINOR_SUPPORTED_RELEASES_FILE: str = "nuke-minor-supported-releases.json"
+"""Name of the file containing the supported minor releases."""
+ALL_SUPPORTED_RELEASES_FILE: str = "nuke-all-supported-releases.json"
+"""Name of the file containing all supported releases."""
+
+MINIFIED_SUFFIX: str = ".min.json"
+"""Suffix of the minified variant of every view, replacing `.json`."""
+GZIP_SUFFIX: str = ".gz"
+"""Suffix added to the gzip compressed variant of every view."""
+
+VIEW_FILES: tuple[str, ...] = (
+    MINOR_RELEASES_FILE,
+    ALL_RELEASES_FILE,
+    MINOR_SUPPORTED_RELEASES_FILE,
+    ALL_SUPPORTED_RELEASES_FILE,
+)
+"""Name of the formatted file of every view."""
+
+_GZIP_LEVEL = 9
+"""Compression level of the gzip compressed variants."""
+
+
+@dataclass(frozen=True)
+class ExportOptions:
+    """Options that define how the releases are collected and exported."""
+
+    incremental: bool = False
+    """Trust the releases of the previously written all releases file and
+    only probe for newer versions."""
+    cache_dir: Path | None = None
+    """Directory to store probes in between runs, None to not store them."""
+    cache_negative_ttl: float = DEFAULT_NEGATIVE_TTL
+    """Seconds before a cached missing installer is probed again."""
+    backend: DiscoveryBackend = DiscoveryBackend.PROBING
+    """Backend to discover the releases with."""
+    as_of: datetime | None = None
+    """Moment to evaluate the supported state of every file at, defaults
+    to the moment the files are created."""
 
 
 def _sort_families(families: list[NukeFamily]) -> None:
@@ -35,161 +122,529 @@ def _sort_families(families: list[NukeFamily]) -> None:
     """
     families.sort(key=attrgetter("version"), reverse=True)
     for family in families:
-        family.releases.sort(key=astuple, reverse=True)
+        family.releases.sort(key=attrgetter("version"), reverse=True)
+
+
+def _get_supported_releases(
+    releases: dict[str, dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    """Return only the supported releases of the converted releases."""
+    return {
+        version: release_data
+        for version, release_data in releases.items()
+        if release_data["supported"]
+    }
 
 
-def _reduce_to_only_minor_releases(families: list[NukeFamily]) -> None:
-    """Reduce families to only contain minor releases
+def _create_family_views(
+    family: NukeFamily, as_of: datetime
+) -> dict[str, dict[str, dict[str, Any]]]:
+    """Create the releases of a family in every view.
 
-    Note: this function respects the original order of the list.
+    Every release is converted once, and the converted release is shared
+    by all views it is part of. The minor views contain the latest patch
+    of every minor release, the supported views only the supported
+    releases.
 
     Args:
-        families: list of families to reduce into only minor releases.
+        family: sorted family to create the views of.
+        as_of: moment to evaluate the supported state at.
+
+    Returns:
+        file name of every view mapped to the converted releases of the
+        family in it, empty if the family is not part of the view.
     """
-    for family in families:
-        minor_versions = defaultdict(list)
+    releases = {}
+    latest_patches: dict[int, tuple[int, str]] = {}
+    for release in family.releases:
+        ((version, release_data),) = release.to_dict(as_of).items()
+        releases[version] = release_data
+        latest_patch = latest_patches.get(release.version.minor)
+        if latest_patch is None or release.version.patch > latest_patch[0]:
+            latest_patches[release.version.minor] = (
+                release.version.patch,
+                version,
+            )
+
+    minor_releases = {
+        version: releases[version] for _, version in latest_patches.values()
+    }
+    return {
+        MINOR_RELEASES_FILE: minor_releases,
+        ALL_RELEASES_FILE: releases,
+        MINOR_SUPPORTED_RELEASES_FILE: _get_supported_releases(
+            minor_releases
+        ),
+        ALL_SUPPORTED_RELEASES_FILE: _get_supported_releases(releases),
+    }
+
+
+def _get_variant_paths(file_path: Path) -> tuple[Path, Path, Path, Path]:
+    """Return the paths of every variant of an exported JSON file.
 
-        for release in family.releases:
-            minor_versions[release.version.minor].append(release)
+    Args:
+        file_path: path of the formatted JSON file.
 
-        collected_releases = [
-            max(minor_releases, key=attrgetter("version.patch"))
-            for minor_releases in minor_versions.values()
-        ]
+    Returns:
+        the formatted, formatted compressed, minified and minified
+        compressed paths.
+    """
+    minified_path = file_path.with_suffix(MINIFIED_SUFFIX)
+    return (
+        file_path,
+        file_path.with_name(file_path.name + GZIP_SUFFIX),
+        minified_path,
+        minified_path.with_name(minified_path.name + GZIP_SUFFIX),
+    )
 
-        family.releases = collected_releases
 
+def _open_gzip_file(exported_file: ExportedFile) -> gzip.GzipFile:
+    """Return a gzip file compressing into the exported file.
 
-def _convert_data_to_json(families: list[NukeFamily]) -> str:
-    """Convert provided families to a JSON.
+    The header contains neither a file name nor a modification time, so
+    the same content always compresses to the same bytes.
 
     Args:
-        families: list of NukeFamily objects to convert to JSON.
+        exported_file: file to write the compressed content to.
 
     Returns:
-        the converted JSON string.
+        the opened gzip file.
     """
-    collected_data = {}
-    for family in families:
-        collected_data.update(family.to_dict())
-    return json.dumps(collected_data, indent=4)
+    return gzip.GzipFile(
+        filename="",
+        mode="wb",
+        compresslevel=_GZIP_LEVEL,
+        fileobj=exported_file,
+        mtime=0,
+    )
 
 
-def _write_json_to_file(json_data: str, file_path: Path) -> None:
-    """Write provided JSON to provided file path.
+class _JsonObjectWriter:
+    """Object that streams a JSON object to a file, member by member.
 
-    Args:
-        json_data: data to write in file.
-        file_path: path where to store the json file.
+    The formatted output is identical to `json.dumps` with an indent of 4,
+    the minified output to `json.dumps` without any whitespace. Both are
+    also written compressed with gzip, all in the same pass. See
+    `_get_variant_paths` for the names of the variants.
     """
-    if file_path.suffix != ".json":
-        msg = "Provided path does not end with .json"
-        raise ValueError(msg)
-    file_path.write_text(json_data)
 
+    def __init__(
+        self,
+        file_path: Path,
+        manifest: dict[str, FileDigest] | None = None,
+    ) -> None:
+        """Create instance of the _JsonObjectWriter object.
+
+        Args:
+            file_path: path of the formatted JSON file to write.
+            manifest: digests of the previously exported files.
+
+        Raises:
+            ValueError: if the path does not end with .json.
+        """
+        if file_path.suffix != ".json":
+            msg = "Provided path does not end with .json"
+            raise ValueError(msg)
+        manifest = manifest or {}
+        self.files = [
+            ExportedFile(path, manifest.get(path.name))
+            for path in _get_variant_paths(file_path)
+        ]
+        """Every variant that is written."""
+        self._formatted_outputs: tuple[BinaryIO, ...] = ()
+        self._minified_outputs: tuple[BinaryIO, ...] = ()
+        self._stack: ExitStack | None = None
+        self._members = 0
+
+    def __enter__(self) -> Self:
+        """Open every variant when used as context manager."""
+        with ExitStack() as stack:
+            formatted, formatted_gzip, minified, minified_gzip = (
+                stack.enter_context(exported_file)
+                for exported_file in self.files
+            )
+            self._formatted_outputs = (
+                formatted,
+                stack.enter_context(_open_gzip_file(formatted_gzip)),
+            )
+            self._minified_outputs = (
+                minified,
+                stack.enter_context(_open_gzip_file(minified_gzip)),
+            )
+            self._stack = stack.pop_all()
+        return self
+
+    def _write(self, formatted: str, minified: str) -> None:
+        """Write the formatted and minified text to their variants."""
+        for outputs, text in (
+            (self._formatted_outputs, formatted),
+            (self._minified_outputs, minified),
+        ):
+            data = text.encode()
+            for output in outputs:
+                output.write(data)
+
+    def write_member(self, key: str | int, value: Any) -> None:
+        """Write a member of the object.
+
+        Args:
+            key: key of the member.
+            value: JSON serializable value of the member.
+        """
+        formatted = json.dumps({key: value}, indent=4)[2:-2]
+        minified = json.dumps({key: value}, separators=(",", ":"))[1:-1]
+        if self._members:
+            self._write(",\n" + formatted, "," + minified)
+        else:
+            self._write("{\n" + formatted, "{" + minified)
+        self._members += 1
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Finish every variant, replacing the targets that changed.
+
+        The targets are kept on errors.
+        """
+        if exc_type is None:
+            if self._members:
+                self._write("\n}", "}")
+            else:
+                self._write("{}", "{}")
+        self._stack.__exit__(exc_type, exc_value, traceback)
+
+
+def _record_sizes(exported_files: list[ExportedFile]) -> None:
+    """Record the size of every replaced file in the metrics.
+
+    Files of which the content did not change are left untouched, so no
+    bytes have been written for them.
+    """
+    for exported_file in exported_files:
+        if not exported_file.changed:
+            continue
+        BYTES_WRITTEN.set(
+            exported_file.size, file=exported_file.file_path.name
+        )
+
+
+def _write_views(
+    families: list[NukeFamily],
+    directory: Path,
+    as_of: datetime | None = None,
+    manifest: dict[str, FileDigest] | None = None,
+) -> dict[str, ExportedFile]:
+    """Write every view in a single pass over the families.
+
+    Every family is written to all views before the next family is
+    converted, so only a single family is kept in memory. Every view is
+    written in all its variants, and files of which the content did not
+    change are left untouched.
+
+    Args:
+        families: sorted families to write the views of.
+        directory: directory to write the views to.
+        as_of: moment to evaluate the supported state at, defaults to now.
+        manifest: digests of the previously exported files.
 
-def _reduce_to_only_supported(families: list[NukeFamily]) -> None:
-    """Reduce provided families to only return supported."""
-    supported_families = [
-        family for family in families if family.get_supported()
+    Returns:
+        file name of every written file mapped to the finished file.
+    """
+    as_of = as_of or datetime.now(UTC)
+    manifest = manifest or {}
+    with ExitStack() as stack:
+        writers = {
+            file_name: stack.enter_context(
+                _JsonObjectWriter(directory / file_name, manifest)
+            )
+            for file_name in VIEW_FILES
+        }
+        for family in families:
+            family_views = _create_family_views(family, as_of)
+            for file_name, releases in family_views.items():
+                if releases:
+                    writers[file_name].write_member(family.version, releases)
+    exported_files = [
+        exported_file
+        for writer in writers.values()
+        for exported_file in writer.files
     ]
-    for family in supported_families:
-        family.releases = [
-            release for release in family.releases if release.get_supported()
-        ]
-    families[:] = supported_families
+    _record_sizes(exported_files)
+    return {
+        exported_file.file_path.name: exported_file
+        for exported_file in exported_files
+    }
 
 
-def _create_all_json(families: list[NukeFamily]) -> str:
-    """Create all releases JSON.
+def _write_binary_index(
+    families: list[NukeFamily],
+    directory: Path,
+    manifest: dict[str, FileDigest] | None = None,
+) -> ExportedFile:
+    """Write the binary index of all releases.
 
     Args:
-        families: family data to convert to supported releases
+        families: families to index.
+        directory: directory to write the index to.
+        manifest: digests of the previously exported files.
 
     Returns:
-        str: collected data as JSON.
+        the finished file.
     """
-    data = copy.deepcopy(families)
-    return _convert_data_to_json(data)
+    manifest = manifest or {}
+    with ExportedFile(
+        directory / BINARY_INDEX_FILE, manifest.get(BINARY_INDEX_FILE)
+    ) as exported_file:
+        exported_file.write(create_binary_index(families))
+    _record_sizes([exported_file])
+    return exported_file
+
+
+def _update_manifest(
+    directory: Path,
+    manifest: dict[str, FileDigest],
+    exported_files: dict[str, ExportedFile],
+    generated: datetime,
+) -> None:
+    """Write the manifest if any of the exported files changed.
 
-
-def _create_all_supported_json(families: list[NukeFamily]) -> str:
-    """Create all supported JSON.
+    Args:
+        directory: directory the files are exported to.
+        manifest: digests of the previously exported files.
+        exported_files: file name of every written file mapped to the
+            finished file.
+        generated: moment the exported files were generated.
+    """
+    files = dict(manifest)
+    for file_name, exported_file in exported_files.items():
+        previous_digest = manifest.get(file_name)
+        sha256 = exported_file.sha256
+        if previous_digest is None or previous_digest.sha256 != sha256:
+            files[file_name] = FileDigest(
+                sha256=sha256,
+                size=exported_file.size,
+                modified=generated.isoformat(),
+            )
+    if files != manifest:
+        write_manifest(directory, files, generated)
+
+
+def _create_families(data: dict[str, dict[str, Any]]) -> list[NukeFamily]:
+    """Create families from the data of a previously exported JSON file.
 
     Args:
-        families: family data to convert to minor supported releases
+        data: family versions mapped to their releases, as exported.
 
     Returns:
-        str: collected data as JSON.
+        list of NukeFamily objects stored in the data.
     """
-    data = copy.deepcopy(families)
-    _reduce_to_only_supported(data)
-    return _convert_data_to_json(data)
+    return [
+        NukeFamily.from_dict({family_version: releases})
+        for family_version, releases in data.items()
+    ]
 
 
-def _create_minor_json(families: list[NukeFamily]) -> str:
-    """Create minor releases JSON.
+def _read_families_from_file(file_path: Path) -> list[NukeFamily]:
+    """Read families from a previously exported JSON file.
 
     Args:
-        families: family data to convert to supported releases
+        file_path: path of the JSON file to read.
 
     Returns:
-        str: collected data as JSON.
+        list of NukeFamily objects stored in the file.
+    """
+    return _create_families(json.loads(file_path.read_text()))
+
+
+def _update_change_feed(
+    directory: Path,
+    previous_data: dict[str, dict[str, Any]] | None,
+    families: list[NukeFamily],
+    as_of: datetime,
+) -> None:
+    """Append the changes compared to the previous releases to the feed.
+
+    Note:
+        this is called before the views are replaced. A run that fails
+        in between records its changes again on the next run, instead of
+        never recording them.
+
+    Args:
+        directory: directory the files are exported to.
+        previous_data: data of the previously exported all releases file,
+            None if there is none.
+        families: sorted families of this run.
+        as_of: moment the supported state is evaluated at.
     """
-    data = copy.deepcopy(families)
-    _reduce_to_only_minor_releases(data)
-    return _convert_data_to_json(data)
+    if previous_data is None:
+        logging.info("No previous releases, nothing to compare against.")
+        return
+    changes = find_changes(create_snapshot(previous_data), families, as_of)
+    sequence = append_changes(directory / CHANGES_FILE, changes)
+    logging.info(
+        "Recorded %s changes, the feed is at sequence %s.",
+        len(changes),
+        sequence,
+    )
 
 
-def _create_minor_supported_json(families: list[NukeFamily]) -> str:
-    """Create minor supported JSON.
+def _read_previous_data(directory: Path) -> dict[str, dict[str, Any]] | None:
+    """Read the data of the previously exported all releases file.
 
     Args:
-        families: family data to convert to minor supported releases
+        directory: directory the files are exported to.
 
     Returns:
-        str: collected data as JSON.
+        family versions mapped to their releases, None if there is none.
     """
-    data = copy.deepcopy(families)
-    _reduce_to_only_minor_releases(data)
-    _reduce_to_only_supported(data)
-    return _convert_data_to_json(data)
-
+    previous_file = directory / ALL_RELEASES_FILE
+    if not previous_file.is_file():
+        return None
+    return json.loads(previous_file.read_text())
 
-def collect_and_write_json_files(directory: Path) -> None:
-    """Call the collector and write these files to specified path.
 
-    This will write out two files. One for all releases, the
-    second for only the latest minor releases.
+def _collect(
+    known_families: list[NukeFamily] | None,
+    options: ScanOptions,
+    export_options: ExportOptions,
+) -> list[NukeFamily] | None:
+    """Collect all families, probing unknown probes a second time.
 
     Args:
-        directory: path to write files to.
+        known_families: families of which the releases are trusted.
+        options: options defining how to scan.
+        export_options: options defining how to collect and export.
+
+    Returns:
+        the collected families, None if they should not be written.
     """
+    cache = None
+    if export_options.cache_dir is not None:
+        cache = ProbeCache(
+            export_options.cache_dir,
+            negative_ttl=export_options.cache_negative_ttl,
+        )
+        logging.info("Loaded %s cached probes.", len(cache))
+
     try:
-        all_data = collect_families()
+        pool_size = DEFAULT_MAX_WORKERS * options.probes_in_flight
+        controller = AdaptiveConcurrencyController(pool_size)
+        unknown_probes = UnknownProbes()
+        with create_session(
+            pool_size, cache, controller, unknown_probes
+        ) as session:
+            families = collect_families(
+                session=session,
+                known_families=known_families,
+                options=options,
+                backend=export_options.backend,
+            )
+            with PROFILER.phase("reprobe"):
+                families = reprobe_unknown_installers(
+                    families, unknown_probes, session, options=options
+                )
         logging.info("Done collecting all families data.")
+        logging.info(
+            "Ended with a concurrency limit of %s after %s throttled probes.",
+            controller.limit,
+            controller.throttle_count,
+        )
     except TimeoutError:
         msg = "No active internet connection, could not fetch data."
         logging.warning(msg)
-        return
+        return None
+    finally:
+        if cache is not None:
+            cache.save()
+
+    if unknown_probes:
+        logging.warning(
+            "%s probes are still unknown, nothing is written to not "
+            "replace the previous files with incomplete results.",
+            len(unknown_probes),
+        )
+        return None
+    return families
+
+
+def _write_files(
+    directory: Path,
+    families: list[NukeFamily],
+    previous_data: dict[str, dict[str, Any]] | None,
+    as_of: datetime,
+) -> None:
+    """Write the change feed, every view, the index and the manifest.
 
-    _sort_families(all_data)
+    Args:
+        directory: directory to write the files to.
+        families: sorted families to write.
+        previous_data: data of the previously exported all releases file,
+            None if there is none.
+        as_of: moment to evaluate the supported state at.
+    """
+    with PROFILER.phase("change feed"):
+        _update_change_feed(directory, previous_data, families, as_of)
+
+    manifest = read_manifest(directory)
+    with PROFILER.phase("write views"):
+        exported_files = _write_views(families, directory, as_of, manifest)
+    with PROFILER.phase("binary index"):
+        exported_files[BINARY_INDEX_FILE] = _write_binary_index(
+            families, directory, manifest
+        )
+    _update_manifest(directory, manifest, exported_files, as_of)
+    unchanged_files = [
+        file_name
+        for file_name, exported_file in exported_files.items()
+        if not exported_file.changed
+    ]
+    if unchanged_files:
+        logging.info("Left unchanged files untouched: %s", unchanged_files)
 
-    _write_json_to_file(
-        json_data=_create_minor_json(all_data),
-        file_path=directory / "nuke-minor-releases.json",
-    )
-    _write_json_to_file(
-        json_data=_create_all_json(all_data),
-        file_path=directory / "nuke-all-releases.json",
-    )
-    _write_json_to_file(
-        json_data=_create_minor_supported_json(all_data),
-        file_path=directory / "nuke-minor-supported-releases.json",
-    )
-    _write_json_to_file(
-        json_data=_create_all_supported_json(all_data),
-        file_path=directory / "nuke-all-supported-releases.json",
+
+def collect_and_write_json_files(
+    directory: Path,
+    options: ScanOptions | None = None,
+    export_options: ExportOptions | None = None,
+) -> None:
+    """Call the collector and write these files to specified path.
+
+    Every view is written in all its variants, next to the binary index,
+    the manifest and the change feed. See `_write_files`.
+
+    Args:
+        directory: path to write files to.
+        options: options defining how to scan.
+        export_options: options defining how to collect and export.
+    """
+    options = options or ScanOptions()
+    export_options = export_options or ExportOptions()
+    known_families = None
+    previous_data = _read_previous_data(directory)
+    if export_options.incremental and previous_data is not None:
+        known_families = _create_families(previous_data)
+        logging.info("Loaded %s known families.", len(known_families))
+    elif export_options.incremental:
+        logging.warning("No previous data found, collecting everything.")
+
+    known_releases = sum(
+        len(family.releases) for family in known_families or []
     )
+    all_data = _collect(known_families, options, export_options)
+    if all_data is None:
+        return
+
+    total_releases = sum(len(family.releases) for family in all_data)
+    RELEASES.set(known_releases, source="known")
+    RELEASES.set(total_releases - known_releases, source="discovered")
+
+    with PROFILER.phase("sort"):
+        _sort_families(all_data)
+
+    as_of = export_options.as_of or datetime.now(UTC)
+    _write_files(directory, all_data, previous_data, as_of)
 
     logging.info("Done writing JSON files.")
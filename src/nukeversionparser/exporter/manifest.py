@@ -0,0 +1,94 @@
+"""Script that keeps track of the content of the exported files.
+
+The manifest stores the hash and size of every exported file, next to the
+moment its content last changed. Mirrors are able to check if anything
+changed by downloading only the manifest, and the exporter uses it to
+leave files that did not change untouched.
+
+@maintainer: Gilles Vink
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
+
+from nukeversionparser.files import ExportedFile
+
+if TYPE_CHECKING:
+    from datetime import datetime
+    from pathlib import Path
+
+__slots__ = (
+    "MANIFEST_FILE",
+    "FileDigest",
+    "read_manifest",
+    "write_manifest",
+)
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE: str = "manifest.json"
+"""Name of the manifest file."""
+
+
+@dataclass(frozen=True)
+class FileDigest:
+    """Data object to store the content of an exported file."""
+
+    sha256: str
+    """Hexadecimal SHA-256 hash of the content."""
+    size: int
+    """Size of the content in bytes."""
+    modified: str
+    """Moment the content last changed, in ISO 8601 format."""
+
+
+def read_manifest(directory: Path) -> dict[str, FileDigest]:
+    """Read the manifest of the exported files.
+
+    Args:
+        directory: directory the files are exported to.
+
+    Returns:
+        name of every exported file mapped to its digest, empty if there
+        is no valid manifest.
+    """
+    manifest_path = directory / MANIFEST_FILE
+    if not manifest_path.is_file():
+        return {}
+    try:
+        data = json.loads(manifest_path.read_text())
+        return {
+            file_name: FileDigest(**digest)
+            for file_name, digest in data["files"].items()
+        }
+    except (ValueError, KeyError, TypeError):
+        logger.warning("Ignoring invalid manifest %s.", manifest_path)
+        return {}
+
+
+def write_manifest(
+    directory: Path, files: dict[str, FileDigest], generated: datetime
+) -> None:
+    """Write the manifest of the exported files.
+
+    The manifest is replaced at once, so a reader never reads a partially
+    written file, and left untouched when its content is the same.
+
+    Args:
+        directory: directory the files are exported to.
+        files: name of every exported file mapped to its digest.
+        generated: moment the exported files were generated.
+    """
+    data = {
+        "generated": generated.isoformat(),
+        "files": {
+            file_name: asdict(digest)
+            for file_name, digest in sorted(files.items())
+        },
+    }
+    with ExportedFile(directory / MANIFEST_FILE) as exported_file:
+        exported_file.write(json.dumps(data, indent=4).encode())
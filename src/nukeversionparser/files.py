@@ -0,0 +1,129 @@
+"""Script that writes files atomically.
+
+Every file the exporter writes goes through this, including the manifest,
+so files of which the content did not change are never touched. The probe
+cache and the metrics are written the same way.
+
+@maintainer: Gilles Vink
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import TYPE_CHECKING, BinaryIO, Self
+
+if TYPE_CHECKING:
+    from pathlib import Path
+    from types import TracebackType
+
+    from nukeversionparser.exporter.manifest import FileDigest
+
+__slots__ = (
+    "ExportedFile",
+    "get_file_sha256",
+)
+
+
+def get_file_sha256(file_path: Path) -> str | None:
+    """Return the SHA-256 hash of a file.
+
+    Args:
+        file_path: path of the file to hash.
+
+    Returns:
+        the hexadecimal hash, None if the file does not exist.
+    """
+    if not file_path.is_file():
+        return None
+    with file_path.open("rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+class ExportedFile:
+    """Object that writes an exported file through a temporary file.
+
+    The content is written to a temporary file next to the target, which
+    replaces the target at once when it is complete. Readers of the target
+    therefore never see a partially written file.
+
+    The content is hashed while it is written. When the target already
+    has the same content, it is left untouched.
+    """
+
+    def __init__(
+        self, file_path: Path, previous_digest: FileDigest | None = None
+    ) -> None:
+        """Create instance of the ExportedFile object.
+
+        Args:
+            file_path: path of the file to write.
+            previous_digest: digest of the target in the manifest. When
+                not provided, the target itself is hashed to find out
+                whether it changed.
+        """
+        self.file_path = file_path
+        self._previous_digest = previous_digest
+        self._temporary_path = file_path.with_name(f".{file_path.name}.tmp")
+        self._file: BinaryIO | None = None
+        self._hash = hashlib.sha256()
+        self.size = 0
+        """Size of the written content in bytes."""
+        self.changed = False
+        """True if the content differs from the previous target."""
+
+    @property
+    def sha256(self) -> str:
+        """Return the hexadecimal SHA-256 hash of the written content."""
+        return self._hash.hexdigest()
+
+    def __enter__(self) -> Self:
+        """Open the temporary file when used as context manager."""
+        self._file = self._temporary_path.open("wb")
+        return self
+
+    def write(self, data: bytes) -> int:
+        """Write data to the temporary file and add it to the hash.
+
+        Args:
+            data: content to write.
+
+        Returns:
+            the amount of bytes written.
+        """
+        self._file.write(data)
+        self._hash.update(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        """Flush the temporary file."""
+        self._file.flush()
+
+    def _has_same_content(self) -> bool:
+        """Return True if the target already has the written content."""
+        if not self.file_path.is_file():
+            return False
+        previous_digest = self._previous_digest
+        if (
+            previous_digest is not None
+            and previous_digest.size == self.file_path.stat().st_size
+        ):
+            return previous_digest.sha256 == self.sha256
+        return get_file_sha256(self.file_path) == self.sha256
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Replace the target if it changed, else remove the temporary file.
+
+        The temporary file is also removed on errors, keeping the target.
+        """
+        self._file.close()
+        if exc_type is None and not self._has_same_content():
+            self._temporary_path.replace(self.file_path)
+            self.changed = True
+        else:
+            self._temporary_path.unlink(missing_ok=True)
@@ -4,13 +4,45 @@
 """
 
 import argparse
+import json
 import logging
 import sys
+import time
+from datetime import UTC, datetime
 from pathlib import Path
 
+from nukeversionparser.datamodel.constants import (
+    PLATFORMS,
+    Architecture,
+    OperatingSystem,
+)
+from nukeversionparser.datamodel.nuke_data import SemanticVersion
 from nukeversionparser.exporter.export_data import (
+    ALL_RELEASES_FILE,
+    ExportOptions,
     collect_and_write_json_files,
 )
+from nukeversionparser.metrics import record_run_end, write_metrics
+from nukeversionparser.parser.bucket_listing import DiscoveryBackend
+from nukeversionparser.parser.parse_data import (
+    PLATFORM_EXCLUSIVE_VERSIONS,
+    ScanOptions,
+    ScanStrategy,
+)
+from nukeversionparser.parser.probe_cache import DEFAULT_NEGATIVE_TTL
+from nukeversionparser.profiling import PROFILER
+from nukeversionparser.query import (
+    ReleaseIndex,
+    create_releases_dict,
+    parse_datetime,
+)
+from nukeversionparser.server import (
+    DEFAULT_HOST,
+    DEFAULT_PORT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_RELOAD_INTERVAL,
+    serve,
+)
 
 FORMAT = "[%(asctime)s] %(message)s"
 logging.basicConfig(level=logging.INFO, format=FORMAT)
@@ -21,13 +53,241 @@ def _parse_args(args: list[str]) -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         prog="NukeVersionParser",
         description=("CLI to fetch all Nuke versions and write result to JSON."),
+        epilog=(
+            "Use `nuke-versionparser query --help` to look up releases in "
+            "an exported file, and `nuke-versionparser serve --help` to "
+            "serve the exported files over HTTP."
+        ),
     )
     parser.add_argument("--write_dir", required=True)
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only probe for versions newer than the existing JSON files.",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="Directory to store probe results in between runs.",
+    )
+    parser.add_argument(
+        "--cache-negative-ttl",
+        type=float,
+        default=DEFAULT_NEGATIVE_TTL,
+        help="Seconds before a cached missing installer is probed again.",
+    )
+    parser.add_argument(
+        "--discovery",
+        choices=[backend.value for backend in DiscoveryBackend],
+        default=DiscoveryBackend.PROBING.value,
+        help=(
+            "Backend to discover releases with. Listing the bucket falls "
+            "back to probing when it is refused."
+        ),
+    )
+    parser.add_argument(
+        "--lookahead",
+        type=int,
+        default=1,
+        help="Amount of versions to probe at the same time in every scan.",
+    )
+    parser.add_argument(
+        "--strategy",
+        choices=[strategy.value for strategy in ScanStrategy],
+        default=ScanStrategy.LINEAR.value,
+        help="Strategy to find the last version of every scan.",
+    )
+    parser.add_argument(
+        "--gap-tolerance",
+        type=int,
+        default=0,
+        help="Amount of missing versions in a row that do not end a scan.",
+    )
+    parser.add_argument(
+        "--primary-platform",
+        choices=[*(field_name for field_name, _, _ in PLATFORMS), "none"],
+        default="linux_x86_64",
+        help=(
+            "Platform to probe before the others, a version is missing "
+            "when it is not found. Use none to probe all at once."
+        ),
+    )
+    parser.add_argument(
+        "--platform-exclusive",
+        action="append",
+        default=[],
+        help=(
+            "Version that is missing the primary platform and always "
+            "probes all platforms, for example 16.0v9. Can be repeated."
+        ),
+    )
+    parser.add_argument(
+        "--metrics-dir",
+        help=(
+            "Directory to write a Prometheus textfile and a JSON summary "
+            "of the run metrics to."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Log the wall and CPU time spent in every phase of the run.",
+    )
+    parser.add_argument(
+        "--profile-stats",
+        help=(
+            "Path to dump cProfile statistics of all threads to, "
+            "readable with pstats. Implies --profile."
+        ),
+    )
+    parser.add_argument(
+        "--profile-allocations",
+        type=int,
+        default=0,
+        help=(
+            "Amount of allocation sites to report using tracemalloc. "
+            "Implies --profile."
+        ),
+    )
+    return parser.parse_args(args)
+
+
+def _parse_query_args(args: list[str]) -> argparse.Namespace:
+    """Parse provided arguments of the query subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="nuke-versionparser query",
+        description="Look up releases in an exported JSON file.",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=ALL_RELEASES_FILE,
+        help="Exported file to query, defaults to the all releases file.",
+    )
+    lookups = parser.add_subparsers(dest="lookup", required=True)
+    find_parser = lookups.add_parser(
+        "find", help="Show the release of a version."
+    )
+    find_parser.add_argument(
+        "version",
+        type=SemanticVersion.parse,
+        help="Version of the release, for example 15.0v2.",
+    )
+    latest_parser = lookups.add_parser(
+        "latest", help="Show the latest release matching the filters."
+    )
+    latest_parser.add_argument("--major", type=int)
+    latest_parser.add_argument(
+        "--minor", type=int, help="Requires --major to be set."
+    )
+    latest_parser.add_argument(
+        "--os",
+        choices=[system.value for system in OperatingSystem],
+        help="Only releases with an installer for this operating system.",
+    )
+    latest_parser.add_argument(
+        "--architecture",
+        choices=[architecture.value for architecture in Architecture],
+        help="Only releases with an installer for this architecture.",
+    )
+    supported_parser = lookups.add_parser(
+        "supported", help="Show the releases that are supported."
+    )
+    supported_parser.add_argument(
+        "--as-of",
+        type=parse_datetime,
+        help="ISO 8601 date to evaluate the supported state at.",
+    )
+    parsed_arguments = parser.parse_args(args)
+    if parsed_arguments.lookup == "latest" and (
+        parsed_arguments.minor is not None and parsed_arguments.major is None
+    ):
+        parser.error("--minor requires --major to be set.")
+    return parsed_arguments
+
+
+def query(args: list[str]) -> int:
+    """Look up releases in an exported file and print them as JSON.
+
+    Args:
+        args: arguments of the query subcommand.
+
+    Returns:
+        exit code, 1 if no release was found.
+    """
+    parsed_arguments = _parse_query_args(args)
+    index = ReleaseIndex.from_file(Path(parsed_arguments.snapshot))
+    as_of = datetime.now(UTC)
+    if parsed_arguments.lookup == "find":
+        releases = [index.find(parsed_arguments.version)]
+    elif parsed_arguments.lookup == "latest":
+        operating_system = None
+        if parsed_arguments.os is not None:
+            operating_system = OperatingSystem(parsed_arguments.os)
+        architecture = None
+        if parsed_arguments.architecture is not None:
+            architecture = Architecture(parsed_arguments.architecture)
+        releases = [
+            index.latest(
+                major=parsed_arguments.major,
+                minor=parsed_arguments.minor,
+                operating_system=operating_system,
+                architecture=architecture,
+            )
+        ]
+    else:
+        as_of = parsed_arguments.as_of or as_of
+        releases = index.get_supported(as_of)
+
+    result = create_releases_dict(releases, as_of)
+    sys.stdout.write(json.dumps(result, indent=4) + "\n")
+    return 0 if result else 1
+
+
+def _parse_serve_args(args: list[str]) -> argparse.Namespace:
+    """Parse provided arguments of the serve subcommand."""
+    parser = argparse.ArgumentParser(
+        prog="nuke-versionparser serve",
+        description=(
+            "Serve the exported files and the query lookups over HTTP, "
+            "reloading them when new files are written."
+        ),
+    )
+    parser.add_argument(
+        "--dir",
+        default=".",
+        help="Directory the files are exported to.",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--reload-interval",
+        type=float,
+        default=DEFAULT_RELOAD_INTERVAL,
+        help="Seconds between checks for newly exported files.",
+    )
+    parser.add_argument(
+        "--read-timeout",
+        type=float,
+        default=DEFAULT_READ_TIMEOUT,
+        help="Seconds before an idle connection is closed.",
+    )
     return parser.parse_args(args)
 
 
 def main() -> None:
     """Main pytest bootstrap entrypoint"""
+    if sys.argv[1:2] == ["query"]:
+        sys.exit(query(sys.argv[2:]))
+    if sys.argv[1:2] == ["serve"]:
+        parsed_arguments = _parse_serve_args(sys.argv[2:])
+        serve(
+            Path(parsed_arguments.dir),
+            parsed_arguments.host,
+            parsed_arguments.port,
+            parsed_arguments.reload_interval,
+            parsed_arguments.read_timeout,
+        )
+        return
+    start_time = time.monotonic()
     parsed_arguments = _parse_args(sys.argv[1:])
     if parsed_arguments.write_dir is None:
         msg = (
@@ -36,7 +296,48 @@ def main() -> None:
         )
         raise ValueError(msg)
     json_directory = Path(parsed_arguments.write_dir)
-    collect_and_write_json_files(json_directory)
+    profile = (
+        parsed_arguments.profile
+        or parsed_arguments.profile_stats is not None
+        or parsed_arguments.profile_allocations > 0
+    )
+    if profile:
+        PROFILER.start(
+            use_cprofile=parsed_arguments.profile_stats is not None,
+            tracemalloc_top=parsed_arguments.profile_allocations,
+        )
+    cache_directory = None
+    if parsed_arguments.cache_dir is not None:
+        cache_directory = Path(parsed_arguments.cache_dir)
+    primary_platform = parsed_arguments.primary_platform
+    if primary_platform == "none":
+        primary_platform = None
+    collect_and_write_json_files(
+        json_directory,
+        options=ScanOptions(
+            strategy=ScanStrategy(parsed_arguments.strategy),
+            lookahead=parsed_arguments.lookahead,
+            gap_tolerance=parsed_arguments.gap_tolerance,
+            primary_platform=primary_platform,
+            platform_exclusive_versions=PLATFORM_EXCLUSIVE_VERSIONS.union(
+                parsed_arguments.platform_exclusive
+            ),
+        ),
+        export_options=ExportOptions(
+            incremental=parsed_arguments.incremental,
+            cache_dir=cache_directory,
+            cache_negative_ttl=parsed_arguments.cache_negative_ttl,
+            backend=DiscoveryBackend(parsed_arguments.discovery),
+        ),
+    )
+    if profile:
+        stats_path = None
+        if parsed_arguments.profile_stats is not None:
+            stats_path = Path(parsed_arguments.profile_stats)
+        logging.info("Profile of the run:\n%s", PROFILER.stop(stats_path))
+    if parsed_arguments.metrics_dir is not None:
+        record_run_end(start_time)
+        write_metrics(Path(parsed_arguments.metrics_dir))
 
 
 if __name__ == "__main__":
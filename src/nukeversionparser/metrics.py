@@ -0,0 +1,409 @@
+"""Script that collects metrics about a run of the parser.
+
+The metrics are gathered in a registry shared by the whole process, so the
+parser, collector and exporter are able to record them without passing
+the registry around. At the end of a run, the registry is written as a
+Prometheus textfile and as a JSON summary.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from typing import TYPE_CHECKING, Any
+
+from nukeversionparser.files import ExportedFile
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__slots__ = (
+    "BYTES_WRITTEN",
+    "FAMILY_SCAN_SECONDS",
+    "JSON_FILE_NAME",
+    "LAST_RUN_TIMESTAMP",
+    "PROBES",
+    "PROBE_LATENCY_SECONDS",
+    "PROMETHEUS_FILE_NAME",
+    "REGISTRY",
+    "RELEASES",
+    "RUN_SECONDS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "record_run_end",
+    "write_metrics",
+)
+
+PROMETHEUS_FILE_NAME: str = "nukeversionparser.prom"
+"""Name of the Prometheus textfile."""
+
+JSON_FILE_NAME: str = "nukeversionparser-metrics.json"
+"""Name of the JSON summary."""
+
+_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_value(value: float) -> str:
+    """Format a value the way Prometheus expects it.
+
+    Args:
+        value: value of a sample.
+
+    Returns:
+        the formatted value.
+    """
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    """Format labels the way Prometheus expects them.
+
+    Args:
+        labels: names of the labels mapped to their values.
+
+    Returns:
+        the formatted labels, empty if there are none.
+    """
+    if not labels:
+        return ""
+    formatted_labels = ",".join(
+        '{}="{}"'.format(
+            name,
+            value.replace("\\", "\\\\")
+            .replace('"', '\\"')
+            .replace("\n", "\\n"),
+        )
+        for name, value in labels.items()
+    )
+    return f"{{{formatted_labels}}}"
+
+
+class _Metric:
+    """Base of all metrics, storing a value per combination of labels."""
+
+    metric_type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+    ) -> None:
+        """Create instance of the metric.
+
+        Args:
+            name: name of the metric.
+            documentation: description of what is measured.
+            label_names: names of the labels every sample is recorded with.
+        """
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_key(self, labels: dict[str, str]) -> tuple[str, ...]:
+        """Return the key of the provided labels.
+
+        Args:
+            labels: names of the labels mapped to their values.
+
+        Raises:
+            ValueError: if the labels do not match the label names.
+
+        Returns:
+            the values of the labels in order of the label names.
+        """
+        if set(labels) != set(self.label_names):
+            msg = (
+                f"Metric {self.name} expects labels {self.label_names}, "
+                f"received {tuple(labels)}."
+            )
+            raise ValueError(msg)
+        return tuple(str(labels[name]) for name in self.label_names)
+
+    def reset(self) -> None:
+        """Forget all recorded values."""
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        """Return all samples of the metric.
+
+        Returns:
+            list of the sample name, its labels and its value.
+        """
+        with self._lock:
+            return [
+                (
+                    self.name,
+                    dict(zip(self.label_names, key, strict=True)),
+                    value,
+                )
+                for key, value in sorted(self._values.items())
+            ]
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the metric as a JSON serializable dictionary."""
+        return {
+            "type": self.metric_type,
+            "help": self.documentation,
+            "samples": [
+                {"labels": labels, "value": value}
+                for _, labels, value in self.samples()
+            ],
+        }
+
+
+class Counter(_Metric):
+    """Metric of which the value only goes up."""
+
+    metric_type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Increase the counter.
+
+        Args:
+            amount: amount to increase the counter with.
+            labels: values of the labels of the metric.
+        """
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Metric of which the value is set to the latest measurement."""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels: str) -> None:
+        """Set the value of the gauge.
+
+        Args:
+            value: the new value.
+            labels: values of the labels of the metric.
+        """
+        key = self._get_key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Metric counting the observations that fall within every bucket."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = _LATENCY_BUCKETS,
+    ) -> None:
+        """Create instance of the Histogram object.
+
+        Args:
+            name: name of the metric.
+            documentation: description of what is measured.
+            label_names: names of the labels every sample is recorded with.
+            buckets: upper bounds of the buckets, in ascending order.
+        """
+        super().__init__(name, documentation, label_names)
+        self.buckets = (*buckets, math.inf)
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record an observation.
+
+        Args:
+            value: the observed value.
+            labels: values of the labels of the metric.
+        """
+        key = self._get_key(labels)
+        with self._lock:
+            counts, total = self._values.get(
+                key, ([0] * len(self.buckets), 0.0)
+            )
+            for index, upper_bound in enumerate(self.buckets):
+                if value <= upper_bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def samples(self) -> list[tuple[str, dict[str, str], float]]:
+        """Return the cumulative buckets, sum and count of every label."""
+        collected_samples = []
+        for name, labels, (counts, total) in super().samples():
+            for upper_bound, count in zip(
+                self.buckets, counts, strict=True
+            ):
+                bucket_labels = {**labels, "le": _format_value(upper_bound)}
+                collected_samples.append(
+                    (f"{name}_bucket", bucket_labels, count)
+                )
+            collected_samples.append((f"{name}_sum", labels, total))
+            collected_samples.append((f"{name}_count", labels, counts[-1]))
+        return collected_samples
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return the histogram as a JSON serializable dictionary."""
+        return {
+            "type": self.metric_type,
+            "help": self.documentation,
+            "samples": [
+                {
+                    "labels": labels,
+                    "count": counts[-1],
+                    "sum": total,
+                    "buckets": {
+                        _format_value(upper_bound): count
+                        for upper_bound, count in zip(
+                            self.buckets, counts, strict=True
+                        )
+                    },
+                }
+                for _, labels, (counts, total) in super().samples()
+            ],
+        }
+
+
+class MetricsRegistry:
+    """Object that holds all metrics of a run."""
+
+    def __init__(self) -> None:
+        """Create instance of the MetricsRegistry object."""
+        self._metrics: dict[str, _Metric] = {}
+
+    def register[MetricType: _Metric](self, metric: MetricType) -> MetricType:
+        """Add a metric to the registry.
+
+        Args:
+            metric: the metric to add.
+
+        Raises:
+            ValueError: if a metric with the same name already exists.
+
+        Returns:
+            the added metric.
+        """
+        if metric.name in self._metrics:
+            msg = f"Metric {metric.name} is already registered."
+            raise ValueError(msg)
+        self._metrics[metric.name] = metric
+        return metric
+
+    def reset(self) -> None:
+        """Forget the recorded values of all metrics."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def to_prometheus(self) -> str:
+        """Return all metrics in the Prometheus text format."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            lines.extend(
+                f"{name}{_format_labels(labels)} {_format_value(value)}"
+                for name, labels, value in metric.samples()
+            )
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict[str, Any]:
+        """Return all metrics as a JSON serializable dictionary."""
+        return {
+            name: metric.to_dict() for name, metric in self._metrics.items()
+        }
+
+
+REGISTRY = MetricsRegistry()
+"""Registry shared by the whole process."""
+
+PROBES = REGISTRY.register(
+    Counter(
+        "nukeversionparser_probes_total",
+        "Probes per platform, by outcome (hit, miss or error) and source "
+        "(network or cache).",
+        ("platform", "outcome", "source"),
+    )
+)
+PROBE_LATENCY_SECONDS = REGISTRY.register(
+    Histogram(
+        "nukeversionparser_probe_latency_seconds",
+        "Duration of the HEAD requests sent per platform, including "
+        "retries. Probes answered from the cache are left out.",
+        ("platform",),
+    )
+)
+FAMILY_SCAN_SECONDS = REGISTRY.register(
+    Gauge(
+        "nukeversionparser_family_scan_seconds",
+        "Duration of scanning the minor or patch versions of a family.",
+        ("family", "phase"),
+    )
+)
+RELEASES = REGISTRY.register(
+    Gauge(
+        "nukeversionparser_releases",
+        "Releases collected, known from a previous run or discovered.",
+        ("source",),
+    )
+)
+BYTES_WRITTEN = REGISTRY.register(
+    Gauge(
+        "nukeversionparser_bytes_written",
+        "Size of every exported file that has been replaced.",
+        ("file",),
+    )
+)
+RUN_SECONDS = REGISTRY.register(
+    Gauge(
+        "nukeversionparser_run_seconds",
+        "Duration of the last run.",
+    )
+)
+LAST_RUN_TIMESTAMP = REGISTRY.register(
+    Gauge(
+        "nukeversionparser_last_run_timestamp_seconds",
+        "Unix timestamp of the end of the last run.",
+    )
+)
+
+
+def write_metrics(
+    directory: Path, registry: MetricsRegistry = REGISTRY
+) -> None:
+    """Write the Prometheus textfile and the JSON summary.
+
+    Both files are replaced at once, so a scraper never reads a partially
+    written file.
+
+    Args:
+        directory: directory to write the files to.
+        registry: registry containing the metrics to write.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for file_name, content in (
+        (PROMETHEUS_FILE_NAME, registry.to_prometheus()),
+        (JSON_FILE_NAME, json.dumps(registry.to_dict(), indent=4)),
+    ):
+        with ExportedFile(directory / file_name) as exported_file:
+            exported_file.write(content.encode())
+
+
+def record_run_end(start_time: float) -> None:
+    """Record the duration and the end of a run.
+
+    Args:
+        start_time: value of `time.monotonic` at the start of the run.
+    """
+    RUN_SECONDS.set(time.monotonic() - start_time)
+    LAST_RUN_TIMESTAMP.set(time.time())
@@ -0,0 +1,230 @@
+"""Script that scans for all possible data using asyncio.
+
+Probes are executed concurrently, up to a configurable limit, while the
+scanning logic stays identical to the one in `parse_data`. The probes
+themselves still use the blocking `requests` session, see
+`AsyncProbingEngine`.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import TYPE_CHECKING, Self
+
+from nukeversionparser.datamodel.constants import PLATFORMS
+from nukeversionparser.parser.parse_data import (
+    ScanOptions,
+    ScanStrategy,
+    VersionParser,
+    combine_installers,
+    gallop,
+    iterate_versions,
+)
+from nukeversionparser.parser.session import create_session
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from types import TracebackType
+
+    import requests
+
+    from nukeversionparser.datamodel.constants import (
+        Architecture,
+        OperatingSystem,
+    )
+    from nukeversionparser.datamodel.nuke_data import (
+        NukeRelease,
+        SemanticVersion,
+    )
+
+__slots__ = ("DEFAULT_MAX_CONCURRENCY", "AsyncProbingEngine")
+
+DEFAULT_MAX_CONCURRENCY: int = 64
+"""Default amount of probes that are allowed to run at the same time."""
+
+
+class AsyncProbingEngine:
+    """Object that is responsible for probing versions concurrently.
+
+    This is an asyncio facade over the blocking `requests` session, not
+    non-blocking HTTP. Every probe runs in a dedicated thread pool that is
+    sized to the concurrency limit, so no more than that amount of probes
+    are in flight at any time, each of them occupying a thread. It lets
+    asyncio code await a scan without blocking its event loop, but the
+    amount of concurrent probes is still bound by the amount of threads.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        session: requests.Session | None = None,
+        options: ScanOptions | None = None,
+    ) -> None:
+        """Create instance of the AsyncProbingEngine object.
+
+        Args:
+            max_concurrency: maximum amount of probes running at once.
+            session: session to send probes with. When not provided, a
+                session with a pool sized to the limit is created and
+                closed together with the engine.
+            options: options defining how to scan.
+
+        Raises:
+            ValueError: if max_concurrency is lower than 1.
+        """
+        if max_concurrency < 1:
+            msg = "Concurrency limit should be at least 1."
+            raise ValueError(msg)
+        self._options = options or ScanOptions()
+        self._owns_session = session is None
+        self._session = session or create_session(max_concurrency)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency, thread_name_prefix="probe"
+        )
+
+    def __enter__(self) -> Self:
+        """Return the engine itself when used as context manager."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        """Shut down the thread pool when leaving the context."""
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the thread pool and the session if owned."""
+        self._executor.shutdown(wait=True)
+        if self._owns_session:
+            self._session.close()
+
+    async def _fetch_installer(
+        self,
+        version: SemanticVersion,
+        system: OperatingSystem,
+        architecture: Architecture,
+    ) -> tuple[str, str | None] | None:
+        """Fetch a single installer in the thread pool.
+
+        Args:
+            version: version to fetch the installer for.
+            system: operating system to find executable for.
+            architecture: architecture to find release for.
+
+        Returns:
+            tuple of url and last modified date if found, None if not found.
+        """
+        loop = asyncio.get_running_loop()
+        version_parser = VersionParser(version, self._session)
+        return await loop.run_in_executor(
+            self._executor,
+            version_parser.fetch_installer,
+            system,
+            architecture,
+        )
+
+    async def to_nuke_release(
+        self, version: SemanticVersion
+    ) -> NukeRelease | None:
+        """Probe all platforms of a version concurrently.
+
+        The platforms of every stage defined by the options are probed at
+        the same time.
+
+        Args:
+            version: version to parse data for.
+
+        Returns:
+            NukeRelease if data found else None
+        """
+        installers = {}
+        for stage in self._options.get_platform_stages(version):
+            stage_installers = await asyncio.gather(
+                *(
+                    self._fetch_installer(version, system, architecture)
+                    for _, system, architecture in stage
+                )
+            )
+            field_names = [field_name for field_name, _, _ in stage]
+            installers.update(
+                zip(field_names, stage_installers, strict=True)
+            )
+            if not any(installers.values()):
+                return None
+
+        return combine_installers(
+            version,
+            [installers[field_name] for field_name, _, _ in PLATFORMS],
+        )
+
+    async def _parse_with_galloping(
+        self, versions: Iterator[SemanticVersion]
+    ) -> list[NukeRelease]:
+        """Parse versions using the galloping search.
+
+        Args:
+            versions: versions to probe, in order.
+
+        Returns:
+            list of NukeRelease up to the last release.
+        """
+        search = gallop(versions, self._options.gap_tolerance)
+        try:
+            batch = next(search)
+            while True:
+                releases = await asyncio.gather(
+                    *(self.to_nuke_release(version) for version in batch)
+                )
+                batch = search.send(releases)
+        except StopIteration as stop:
+            return stop.value
+
+    async def parse_release_data_by_attribute(
+        self, start_version: SemanticVersion, attribute_name: str
+    ) -> list[NukeRelease]:
+        """Parse data by start version and iterate over provided attribute.
+
+        With the linear strategy, the amount of versions set by the
+        lookahead option are probed at the same time. Outstanding probes
+        are cancelled once the scan has ended.
+
+        Args:
+            start_version: version to start iteration with
+            attribute_name: attribute name to use for iterating
+
+        Returns:
+            list of NukeRelease if found, else empty list.
+        """
+        versions = iterate_versions(start_version, attribute_name)
+        if self._options.strategy == ScanStrategy.GALLOPING:
+            return await self._parse_with_galloping(versions)
+
+        pending = deque(
+            asyncio.ensure_future(self.to_nuke_release(version))
+            for version in islice(versions, self._options.lookahead)
+        )
+        nuke_releases = []
+        missing_versions = 0
+        try:
+            while True:
+                release = await pending.popleft()
+                missing_versions = 0 if release else missing_versions + 1
+                if missing_versions > self._options.gap_tolerance:
+                    break
+                if release:
+                    nuke_releases.append(release)
+                pending.append(
+                    asyncio.ensure_future(self.to_nuke_release(next(versions)))
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+
+        return nuke_releases
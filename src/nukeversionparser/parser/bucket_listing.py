@@ -0,0 +1,225 @@
+"""Script that discovers all installers by listing the bucket.
+
+All installers are stored in a single S3 bucket. Listing its contents
+finds every installer in a handful of requests, where probing sends a
+request for every possible installer.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import logging
+import re
+from collections import defaultdict
+from datetime import datetime
+from email.utils import format_datetime
+from enum import StrEnum
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from xml.etree import ElementTree as ET
+
+import requests
+
+from nukeversionparser.datamodel.constants import BASE_URL, PLATFORMS
+from nukeversionparser.datamodel.nuke_data import NukeFamily, SemanticVersion
+from nukeversionparser.parser.parse_data import combine_installers
+from nukeversionparser.parser.url_calculator import calculate_url
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+__slots__ = (
+    "BUCKET_URL",
+    "RELEASES_PREFIX",
+    "DiscoveryBackend",
+    "ListingUnavailableError",
+    "list_families",
+    "parse_installer_key",
+)
+
+logger = logging.getLogger(__name__)
+
+RELEASES_PREFIX: str = "products/nuke/releases/"
+"""Prefix of the keys that contain the installers."""
+
+BUCKET_URL: str = BASE_URL[: BASE_URL.index(RELEASES_PREFIX)]
+"""Url of the bucket that stores the installers."""
+
+_S3_NAMESPACE = {"s3": "http://s3.amazonaws.com/doc/2006-03-01/"}
+_KEY_VERSION_PATTERN = re.compile(
+    rf"{re.escape(RELEASES_PREFIX)}(\d+)\.(\d+)v(\d+)/[^/]+"
+)
+
+
+class DiscoveryBackend(StrEnum):
+    """Available backends to discover all releases."""
+
+    PROBING = "probing"
+    """Send a request for every possible installer."""
+    LISTING = "listing"
+    """List the contents of the bucket, probing if that is not allowed."""
+
+
+class ListingUnavailableError(Exception):
+    """Exception that is raised when the bucket can not be listed."""
+
+
+def _parse_listing(
+    listing: str,
+) -> tuple[list[tuple[str, str]], str | None]:
+    """Parse a single page of a ListObjectsV2 response.
+
+    Args:
+        listing: XML body of the response.
+
+    Raises:
+        ListingUnavailableError: if the body is not a valid listing.
+
+    Returns:
+        tuple of all keys with their last modified timestamp and the
+        token of the next page, None if this is the last page.
+    """
+    try:
+        root = ET.fromstring(listing)
+    except ET.ParseError as error:
+        msg = f"Received an invalid bucket listing: {error}"
+        raise ListingUnavailableError(msg) from error
+
+    objects = [
+        (
+            content.findtext("s3:Key", "", _S3_NAMESPACE),
+            content.findtext("s3:LastModified", "", _S3_NAMESPACE),
+        )
+        for content in root.iterfind("s3:Contents", _S3_NAMESPACE)
+    ]
+    next_token = None
+    if root.findtext("s3:IsTruncated", "", _S3_NAMESPACE) == "true":
+        next_token = root.findtext(
+            "s3:NextContinuationToken", None, _S3_NAMESPACE
+        )
+    return objects, next_token
+
+
+def _list_objects(
+    session: requests.Session | None, bucket_url: str
+) -> Iterator[tuple[str, str]]:
+    """Iterate over all objects stored under the releases prefix.
+
+    Args:
+        session: session to send the requests with.
+        bucket_url: url of the bucket to list.
+
+    Raises:
+        ListingUnavailableError: if any page of the listing is refused.
+
+    Yields:
+        key and last modified timestamp of every object.
+    """
+    http = session if session is not None else requests
+    parameters = {"list-type": "2", "prefix": RELEASES_PREFIX}
+    while True:
+        try:
+            response = http.get(bucket_url, params=parameters, timeout=10)
+        except requests.RequestException as error:
+            msg = f"Listing {bucket_url} failed: {error}."
+            raise ListingUnavailableError(msg) from error
+        if response.status_code != HTTPStatus.OK:
+            msg = (
+                f"Listing {bucket_url} failed with status "
+                f"{response.status_code}."
+            )
+            raise ListingUnavailableError(msg)
+        objects, next_token = _parse_listing(response.text)
+        yield from objects
+        if next_token is None:
+            return
+        parameters["continuation-token"] = next_token
+
+
+def parse_installer_key(key: str) -> tuple[SemanticVersion, str] | None:
+    """Map a key back to the version and platform of its installer.
+
+    The url of every platform is calculated for the version in the key,
+    so only keys that the probing would find are accepted.
+
+    Args:
+        key: key of the object in the bucket.
+
+    Returns:
+        version and installer field name, None if the key is no installer.
+    """
+    match = _KEY_VERSION_PATTERN.fullmatch(key)
+    if not match:
+        return None
+    version = SemanticVersion(*map(int, match.groups()))
+    for field_name, system, architecture in PLATFORMS:
+        if calculate_url(version, system, architecture) == BUCKET_URL + key:
+            return version, field_name
+    return None
+
+
+def _to_header_date(timestamp: str) -> str:
+    """Convert a listing timestamp to the format of a last-modified header.
+
+    Args:
+        timestamp: ISO 8601 timestamp, for example 2023-11-15T15:08:31.000Z.
+
+    Returns:
+        the timestamp formatted as HTTP date.
+    """
+    date = datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+    return format_datetime(date.replace(microsecond=0), usegmt=True)
+
+
+def list_families(
+    session: requests.Session | None = None, bucket_url: str = BUCKET_URL
+) -> list[NukeFamily]:
+    """Collect all releases into families by listing the bucket.
+
+    Every installer key in the listing that matches the naming scheme of
+    `url_calculator` becomes a release. The rules that probing follows,
+    such as the jump from 10.0 to 10.5 and the primary platform, are not
+    applied, so the listing may find releases that probing misses. The
+    listing is always complete, so every run is a full rebuild and the
+    known families of an incremental run are not used.
+
+    Installers are reported with their official url, regardless of the
+    bucket that has been listed.
+
+    Args:
+        session: session to send the requests with.
+        bucket_url: url of the bucket to list.
+
+    Raises:
+        ListingUnavailableError: if the bucket can not be listed.
+
+    Returns:
+        the families of every release in the listing.
+    """
+    installers: dict[str, dict[str, tuple[str, str]]] = defaultdict(dict)
+    versions: dict[str, SemanticVersion] = {}
+    for key, last_modified in _list_objects(session, bucket_url):
+        installer = parse_installer_key(key)
+        if installer is None:
+            continue
+        version, field_name = installer
+        versions[str(version)] = version
+        installers[str(version)][field_name] = (
+            BUCKET_URL + key,
+            _to_header_date(last_modified),
+        )
+
+    releases_per_family = defaultdict(list)
+    for name, version in versions.items():
+        release = combine_installers(
+            version,
+            [
+                installers[name].get(field_name)
+                for field_name, _, _ in PLATFORMS
+            ],
+        )
+        releases_per_family[version.major].append(release)
+
+    msg = f"Listed {len(versions)} releases in {bucket_url}"
+    logger.info(msg)
+    return [NukeFamily(releases) for releases in releases_per_family.values()]
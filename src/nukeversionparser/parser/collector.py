@@ -6,76 +6,446 @@ This object is responsible for fetching family data.
 """
 from __future__ import annotations
 
+import asyncio
 import concurrent.futures
-from copy import deepcopy
+import logging
+import os
+import time
+from collections import defaultdict
+from operator import attrgetter
+from typing import TYPE_CHECKING
 
+from nukeversionparser.datamodel.constants import PLATFORMS
 from nukeversionparser.datamodel.nuke_data import (
     NukeFamily,
-    NukeRelease,
     SemanticVersion,
 )
+from nukeversionparser.metrics import FAMILY_SCAN_SECONDS
+from nukeversionparser.parser.async_parse_data import (
+    DEFAULT_MAX_CONCURRENCY,
+    AsyncProbingEngine,
+)
+from nukeversionparser.parser.bucket_listing import (
+    BUCKET_URL,
+    DiscoveryBackend,
+    ListingUnavailableError,
+    list_families,
+    parse_installer_key,
+)
 from nukeversionparser.parser.parse_data import (
+    PROBES_PER_VERSION,
+    ScanOptions,
+    VersionParser,
     parse_release_data_by_attribute,
 )
+from nukeversionparser.parser.session import create_session
+from nukeversionparser.profiling import PROFILER
+
+if TYPE_CHECKING:
+    import requests
+
+    from nukeversionparser.datamodel.nuke_data import NukeRelease
+    from nukeversionparser.parser.retry import UnknownProbes
+
+__slots__ = (
+    "async_collect_families",
+    "collect_families",
+    "reprobe_unknown_installers",
+)
+
+logger = logging.getLogger(__name__)
+
+_FIRST_VERSION = SemanticVersion(9, 0, 1)
+"""Oldest version that is available on the server."""
+
+DEFAULT_MAX_WORKERS: int = min(32, (os.cpu_count() or 1) + 4)
+"""Default amount of workers, identical to the ThreadPoolExecutor default."""
+
+
+def _get_next_family_version(
+    known_families: list[NukeFamily] | None = None,
+) -> SemanticVersion:
+    """Return the first version to probe for new families.
+
+    Args:
+        known_families: families that are already known.
+
+    Returns:
+        the first release of the family after the latest known one.
+    """
+    if not known_families:
+        return _FIRST_VERSION
+    latest_family = max(family.version for family in known_families)
+    return SemanticVersion(latest_family + 1, 0, 1)
+
+
+def _get_next_minor_version(family: NukeFamily) -> SemanticVersion:
+    """Return the first version to probe for new minor releases.
+
+    Args:
+        family: family to find the next minor version for.
+
+    Returns:
+        the first release of the minor after the latest known minor.
+    """
+    latest_release = max(family.releases, key=attrgetter("version"))
+    return latest_release.version.next_minor()
 
-__slots__ = ("collect_families",)
 
+def _get_next_patch_versions(family: NukeFamily) -> list[SemanticVersion]:
+    """Return the first versions to probe for new patch releases.
 
-def _get_all_families() -> list[NukeFamily]:
+    Args:
+        family: family to find the next patch versions for.
+
+    Returns:
+        the version after the latest known patch of every minor.
+    """
+    latest_patches: dict[int, SemanticVersion] = {}
+    for release in family.releases:
+        latest_patch = latest_patches.get(release.version.minor)
+        if latest_patch is None or release.version > latest_patch:
+            latest_patches[release.version.minor] = release.version
+    return [version.next_patch() for version in latest_patches.values()]
+
+
+def _add_releases(family: NukeFamily, releases: list[NukeRelease]) -> None:
+    """Add the releases of which the version is not in the family yet.
+
+    Args:
+        family: family to add the releases to.
+        releases: releases found by a scan of the family.
+    """
+    known_versions = {release.version for release in family.releases}
+    for release in releases:
+        if release.version not in known_versions:
+            known_versions.add(release.version)
+            family.releases.append(release)
+
+
+def _get_all_families(
+    session: requests.Session | None = None,
+    known_families: list[NukeFamily] | None = None,
+    options: ScanOptions | None = None,
+) -> list[NukeFamily]:
     """Return a list of NukeFamilies.
 
     Note:
         this is only major versions.
+
+    Args:
+        session: session to send probes with.
+        known_families: families that are already known, these are
+            returned as they are, followed by any newer family.
+        options: options defining how to scan.
     """
     releases = parse_release_data_by_attribute(
-        SemanticVersion(9, 0, 1), "major"
+        _get_next_family_version(known_families), "major", session, options
     )
-    return [NukeFamily([release]) for release in releases]
+    new_families = [NukeFamily([release]) for release in releases]
+    return [*(known_families or []), *new_families]
 
 
 def _find_all_minor_versions(
     family: NukeFamily,
+    session: requests.Session | None = None,
+    options: ScanOptions | None = None,
 ) -> None:
-    """Find all minor versions and add them to the family.
+    """Find all minor versions newer than the known ones and add them.
 
     Args:
         family: to find minor versions from.
+        session: session to send probes with.
+        options: options defining how to scan.
     """
-    found_release: NukeRelease = family.releases[0]
-    version = deepcopy(found_release.version)
-    version.minor += 1
-    minor_versions = parse_release_data_by_attribute(version, "minor")
-    family.releases.extend(minor_versions)
+    start_time = time.monotonic()
+    minor_versions = parse_release_data_by_attribute(
+        _get_next_minor_version(family), "minor", session, options
+    )
+    _add_releases(family, minor_versions)
+    FAMILY_SCAN_SECONDS.set(
+        time.monotonic() - start_time, family=family.version, phase="minor"
+    )
 
 
 def _find_all_patch_versions(
     family: NukeFamily,
-) -> list[NukeRelease]:
-    """Find all minor versions and add them to the family.
+    session: requests.Session | None = None,
+    options: ScanOptions | None = None,
+) -> None:
+    """Find all patch versions newer than the known ones and add them.
 
     Args:
-        family: to find minor versions from.
+        family: to find patch versions from.
+        session: session to send probes with.
+        options: options defining how to scan.
     """
+    start_time = time.monotonic()
     patch_versions = []
-    for release in family.releases:
-        version = deepcopy(release.version)
-        version.patch += 1
+    for version in _get_next_patch_versions(family):
         patch_versions.extend(
-            parse_release_data_by_attribute(version, "patch")
+            parse_release_data_by_attribute(
+                version, "patch", session, options
+            )
         )
-    family.releases.extend(patch_versions)
+    _add_releases(family, patch_versions)
+    FAMILY_SCAN_SECONDS.set(
+        time.monotonic() - start_time, family=family.version, phase="patch"
+    )
 
 
-def collect_families() -> list[NukeFamily]:
-    """Fetch and collect all releases into families."""
-    families = _get_all_families()
+def collect_families(
+    session: requests.Session | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    known_families: list[NukeFamily] | None = None,
+    options: ScanOptions | None = None,
+    backend: DiscoveryBackend = DiscoveryBackend.PROBING,
+) -> list[NukeFamily]:
+    """Fetch and collect all releases into families.
 
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        futures = []
-        for family in families:
-            futures.append(executor.submit(_find_all_minor_versions, family))
-            futures.append(executor.submit(_find_all_patch_versions, family))
+    Minor versions of all families are scanned first, after which the
+    patch versions of every minor are scanned. When listing the bucket is
+    requested, all families are listed instead and probing is only used
+    if the listing is refused.
+
+    Args:
+        session: session shared by all workers. When not provided, a
+            session with a pool sized to the amount of probes that the
+            workers send at the same time is created.
+        max_workers: amount of workers probing at the same time.
+        known_families: families collected in a previous run. Their
+            releases are trusted and only newer versions are probed.
+            Listing the bucket does not use them.
+        options: options defining how to scan.
+        backend: backend to discover the releases with.
+    """
+    options = options or ScanOptions()
+    if session is None:
+        pool_size = max_workers * options.probes_in_flight
+        with create_session(pool_size) as created_session:
+            return collect_families(
+                created_session, max_workers, known_families, options, backend
+            )
+
+    if backend == DiscoveryBackend.LISTING:
+        try:
+            with PROFILER.phase("bucket listing"):
+                return list_families(session)
+        except ListingUnavailableError as error:
+            msg = f"{error} Falling back to probing."
+            logger.warning(msg)
+
+    with PROFILER.phase("family discovery"):
+        families = _get_all_families(session, known_families, options)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+        for phase, find_versions in (
+            ("minor scan", _find_all_minor_versions),
+            ("patch scan", _find_all_patch_versions),
+        ):
+            with PROFILER.phase(phase):
+                futures = [
+                    executor.submit(find_versions, family, session, options)
+                    for family in families
+                ]
+                concurrent.futures.wait(futures)
 
+    return families
+
+
+def _reprobe_installer(
+    release: NukeRelease, field_name: str, session: requests.Session
+) -> None:
+    """Probe a single installer of a known release again.
+
+    Args:
+        release: release to add the installer to when found.
+        field_name: installer field of the platform to probe.
+        session: session to send the probe with.
+    """
+    _, system, architecture = next(
+        platform for platform in PLATFORMS if platform[0] == field_name
+    )
+    installer = VersionParser(release.version, session).fetch_installer(
+        system, architecture
+    )
+    if installer is None:
+        return
+    url, date = installer
+    setattr(release.installer, field_name, url)
+    release.date = release.date or date
+
+
+def reprobe_unknown_installers(
+    families: list[NukeFamily],
+    unknown_probes: UnknownProbes,
+    session: requests.Session,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    options: ScanOptions | None = None,
+) -> list[NukeFamily]:
+    """Probe the installers of which the outcome was unknown again.
+
+    Installers found for known releases are added to them. Versions that
+    turn out to exist are probed on every platform, after which the scans
+    that stopped at these versions are continued.
+
+    Args:
+        families: families collected in the first pass.
+        unknown_probes: probes of which the outcome is unknown.
+        session: session that stores unknown probes in unknown_probes.
+        max_workers: amount of workers probing at the same time.
+        options: options defining how to scan.
+
+    Returns:
+        the families including every installer found in this pass.
+    """
+    urls = unknown_probes.drain()
+    if not urls:
+        return families
+    msg = f"Probing {len(urls)} installers with an unknown outcome again."
+    logger.info(msg)
+
+    releases = {
+        str(release.version): release
+        for family in families
+        for release in family.releases
+    }
+    unknown_installers = defaultdict(list)
+    for url in urls:
+        installer = parse_installer_key(url.removeprefix(BUCKET_URL))
+        if installer is not None:
+            version, field_name = installer
+            unknown_installers[str(version)].append((version, field_name))
+
+    new_versions = []
+    with (
+        concurrent.futures.ThreadPoolExecutor(max_workers) as executor,
+        concurrent.futures.ThreadPoolExecutor(
+            max_workers * PROBES_PER_VERSION
+        ) as platform_executor,
+    ):
+        futures = []
+        for name, installers in unknown_installers.items():
+            release = releases.get(name)
+            if release is None:
+                new_versions.append(installers[0][0])
+                continue
+            futures.extend(
+                executor.submit(
+                    _reprobe_installer, release, field_name, session
+                )
+                for _, field_name in installers
+            )
+        new_releases = executor.map(
+            VersionParser.to_nuke_release,
+            new_versions,
+            [session] * len(new_versions),
+            [options] * len(new_versions),
+            [platform_executor] * len(new_versions),
+        )
         concurrent.futures.wait(futures)
+        new_releases = [release for release in new_releases if release]
+
+    if not new_releases:
+        return families
+
+    families_by_version = {family.version: family for family in families}
+    for release in new_releases:
+        family = families_by_version.get(release.version.major)
+        if family is None:
+            family = NukeFamily([release])
+            families_by_version[family.version] = family
+            families.append(family)
+        else:
+            _add_releases(family, [release])
+    return collect_families(session, max_workers, families, options)
+
+
+async def _async_find_all_minor_versions(
+    family: NukeFamily, engine: AsyncProbingEngine
+) -> None:
+    """Find all minor versions newer than the known ones and add them.
+
+    Args:
+        family: to find minor versions from.
+        engine: engine to use for probing.
+    """
+    start_time = time.monotonic()
+    minor_versions = await engine.parse_release_data_by_attribute(
+        _get_next_minor_version(family), "minor"
+    )
+    _add_releases(family, minor_versions)
+    FAMILY_SCAN_SECONDS.set(
+        time.monotonic() - start_time, family=family.version, phase="minor"
+    )
+
+
+async def _async_find_all_patch_versions(
+    family: NukeFamily, engine: AsyncProbingEngine
+) -> None:
+    """Find all patch versions newer than the known ones and add them.
+
+    Every minor is scanned concurrently.
+
+    Args:
+        family: to find patch versions from.
+        engine: engine to use for probing.
+    """
+    start_time = time.monotonic()
+    scans = [
+        engine.parse_release_data_by_attribute(version, "patch")
+        for version in _get_next_patch_versions(family)
+    ]
+    for patch_versions in await asyncio.gather(*scans):
+        _add_releases(family, patch_versions)
+    FAMILY_SCAN_SECONDS.set(
+        time.monotonic() - start_time, family=family.version, phase="patch"
+    )
+
+
+async def async_collect_families(
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    session: requests.Session | None = None,
+    known_families: list[NukeFamily] | None = None,
+    options: ScanOptions | None = None,
+) -> list[NukeFamily]:
+    """Fetch and collect all releases into families using asyncio.
+
+    Minor versions of all families are scanned first, after which the
+    patch versions of every minor are scanned concurrently.
+
+    Args:
+        max_concurrency: maximum amount of probes running at once.
+        session: session shared by all probes.
+        known_families: families collected in a previous run. Their
+            releases are trusted and only newer versions are probed.
+        options: options defining how to scan.
+
+    Returns:
+        the same families as `collect_families` would return.
+    """
+    with AsyncProbingEngine(max_concurrency, session, options) as engine:
+        with PROFILER.phase("family discovery"):
+            releases = await engine.parse_release_data_by_attribute(
+                _get_next_family_version(known_families), "major"
+            )
+        families = [
+            *(known_families or []),
+            *(NukeFamily([release]) for release in releases),
+        ]
+        with PROFILER.phase("minor scan"):
+            await asyncio.gather(
+                *(
+                    _async_find_all_minor_versions(family, engine)
+                    for family in families
+                )
+            )
+        with PROFILER.phase("patch scan"):
+            await asyncio.gather(
+                *(
+                    _async_find_all_patch_versions(family, engine)
+                    for family in families
+                )
+            )
 
     return families
@@ -0,0 +1,274 @@
+"""Script that adapts the amount of probes in flight to the server.
+
+S3 answers with 503 SlowDown or resets connections when too many
+requests are sent at once. The controller in this script lowers the
+amount of probes in flight when that happens and slowly raises it again
+while the responses are healthy (additive increase, multiplicative
+decrease).
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import Timeout
+
+from nukeversionparser.parser.retry import (
+    DEFAULT_RETRIES,
+    get_backoff_delay,
+    is_unknown_status,
+)
+
+if TYPE_CHECKING:
+    from requests import PreparedRequest, Response
+
+    from nukeversionparser.parser.retry import UnknownProbes
+
+__slots__ = ("AdaptiveAdapter", "AdaptiveConcurrencyController")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LATENCY_THRESHOLD: float = 2.0
+"""Seconds a response may take before the server is considered busy."""
+
+_THROTTLE_STATUSES = frozenset(
+    {HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE}
+)
+_UNKNOWN_ERRORS = (RequestsConnectionError, Timeout)
+_DECREASE_INTERVAL = 1.0
+
+
+class AdaptiveConcurrencyController:
+    """Object that limits the amount of requests in flight.
+
+    The limit grows by one after a full limit of healthy responses, and
+    is multiplied by the decrease factor on throttling or slow responses.
+    A burst of throttled responses only lowers the limit once, as these
+    are all caused by the same overload.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        decrease_factor: float = 0.5,
+        latency_threshold: float = DEFAULT_LATENCY_THRESHOLD,
+    ) -> None:
+        """Create instance of the AdaptiveConcurrencyController object.
+
+        The limit starts at the maximum, as most runs are never throttled.
+
+        Args:
+            max_limit: highest amount of requests in flight.
+            min_limit: lowest amount of requests in flight.
+            decrease_factor: factor to multiply the limit with on
+                throttling.
+            latency_threshold: seconds a response may take before the
+                limit is lowered.
+
+        Raises:
+            ValueError: if the limits or the decrease factor are invalid.
+        """
+        if not 1 <= min_limit <= max_limit:
+            msg = "Limits should be at least 1 and min should not exceed max."
+            raise ValueError(msg)
+        if not 0 < decrease_factor < 1:
+            msg = "Decrease factor should be between 0 and 1."
+            raise ValueError(msg)
+        self._max_limit = max_limit
+        self._min_limit = min_limit
+        self._decrease_factor = decrease_factor
+        self._latency_threshold = latency_threshold
+        self._limit = float(max_limit)
+        self._in_flight = 0
+        self._throttle_count = 0
+        self._slow_count = 0
+        self._last_decrease = float("-inf")
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        """Return the current amount of requests allowed in flight."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        """Return the amount of requests currently in flight."""
+        return self._in_flight
+
+    @property
+    def throttle_count(self) -> int:
+        """Return the amount of throttled or reset requests."""
+        return self._throttle_count
+
+    @property
+    def slow_count(self) -> int:
+        """Return the amount of responses slower than the threshold."""
+        return self._slow_count
+
+    def acquire(self) -> None:
+        """Wait until another request is allowed to be sent."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+
+    def release(self) -> None:
+        """Mark a request as finished."""
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def record_response(self, latency: float) -> None:
+        """Update the limit with a response that was not throttled.
+
+        Args:
+            latency: seconds it took to receive the response.
+        """
+        with self._condition:
+            if latency > self._latency_threshold:
+                self._slow_count += 1
+                self._decrease()
+                return
+            self._limit = min(self._max_limit, self._limit + 1 / self._limit)
+            self._condition.notify_all()
+
+    def record_throttle(self) -> None:
+        """Update the limit with a throttled or reset request."""
+        with self._condition:
+            self._throttle_count += 1
+            self._decrease()
+
+    def _decrease(self) -> None:
+        """Lower the limit, unless it has been lowered very recently."""
+        now = time.monotonic()
+        if now - self._last_decrease < _DECREASE_INTERVAL:
+            return
+        self._last_decrease = now
+        self._limit = max(
+            self._min_limit, self._limit * self._decrease_factor
+        )
+        msg = f"Server is busy, lowered concurrency limit to {self.limit}"
+        logger.info(msg)
+
+
+class AdaptiveAdapter(HTTPAdapter):
+    """Adapter that sends requests within the limit of a controller.
+
+    Requests with an unknown outcome, like throttled requests, server
+    errors, timeouts and reset connections, are sent again with a growing
+    delay, so these are never mistaken for a missing installer.
+    """
+
+    def __init__(
+        self,
+        controller: AdaptiveConcurrencyController | None = None,
+        retries: int = DEFAULT_RETRIES,
+        unknown_probes: UnknownProbes | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """Create instance of the AdaptiveAdapter object.
+
+        Args:
+            controller: controller limiting the requests in flight. When
+                not provided, only the connection pool limits requests.
+            retries: amount of times a request with an unknown outcome is
+                sent again before its response or error is returned.
+            unknown_probes: stores the probes that are still unknown after
+                all retries.
+            kwargs: passed through to the HTTPAdapter.
+        """
+        self._controller = controller
+        self._retries = retries
+        self._unknown_probes = unknown_probes
+        super().__init__(**kwargs)
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        """Send the request, retrying it while its outcome is unknown.
+
+        Responses that are retried are closed, so their connection returns
+        to the pool instead of blocking it.
+
+        Args:
+            request: the request to send.
+            kwargs: passed through to the HTTPAdapter.
+
+        Raises:
+            ConnectionError: if the connection is still reset after all
+                retries.
+            Timeout: if the request still times out after all retries.
+
+        Returns:
+            the received response.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self._send_within_limit(request, **kwargs)
+            except _UNKNOWN_ERRORS:
+                if attempt >= self._retries:
+                    self._store_outcome(request, known=False)
+                    raise
+            else:
+                known = not is_unknown_status(response.status_code)
+                if known or attempt >= self._retries:
+                    self._store_outcome(request, known=known)
+                    return response
+                response.close()
+            delay = get_backoff_delay(attempt)
+            attempt += 1
+            msg = f"Unknown outcome of {request.url}, retry {attempt}"
+            logger.info(msg)
+            time.sleep(delay)
+
+    def _store_outcome(self, request: PreparedRequest, *, known: bool) -> None:
+        """Store whether the outcome of a probe is known.
+
+        Args:
+            request: the request that has been sent.
+            known: False if the outcome is still unknown after all retries.
+        """
+        if self._unknown_probes is None or request.method != "HEAD":
+            return
+        if known:
+            self._unknown_probes.discard(request.url)
+        else:
+            self._unknown_probes.add(request.url)
+
+    def _send_within_limit(
+        self, request: PreparedRequest, **kwargs: Any
+    ) -> Response:
+        """Send the request once, waiting for the controller if needed.
+
+        Args:
+            request: the request to send.
+            kwargs: passed through to the HTTPAdapter.
+
+        Returns:
+            the received response.
+        """
+        if self._controller is None:
+            return super().send(request, **kwargs)
+
+        self._controller.acquire()
+        start_time = time.monotonic()
+        try:
+            response = super().send(request, **kwargs)
+        except _UNKNOWN_ERRORS:
+            self._controller.record_throttle()
+            raise
+        finally:
+            self._controller.release()
+
+        if response.status_code in _THROTTLE_STATUSES:
+            self._controller.record_throttle()
+        else:
+            self._controller.record_response(time.monotonic() - start_time)
+        return response
@@ -5,11 +5,18 @@
 from __future__ import annotations
 
 import logging
-from copy import deepcopy
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from enum import StrEnum
+from itertools import islice, repeat
+from typing import TYPE_CHECKING
 
 import requests
 
 from nukeversionparser.datamodel.constants import (
+    PLATFORMS,
     Architecture,
     OperatingSystem,
 )
@@ -18,61 +25,306 @@ from nukeversionparser.datamodel.nuke_data import (
     NukeRelease,
     SemanticVersion,
 )
+from nukeversionparser.metrics import PROBE_LATENCY_SECONDS, PROBES
+from nukeversionparser.parser.retry import is_unknown_status
 from nukeversionparser.parser.url_calculator import calculate_url
 
-__slots__ = ("parse_release_data_by_attribute",)
+if TYPE_CHECKING:
+    from collections.abc import Generator, Iterable, Iterator
+    from concurrent.futures import Executor
+
+__slots__ = (
+    "PLATFORM_EXCLUSIVE_VERSIONS",
+    "PROBES_PER_VERSION",
+    "ScanOptions",
+    "ScanStrategy",
+    "VersionParser",
+    "combine_installers",
+    "gallop",
+    "iterate_versions",
+    "parse_release_data_by_attribute",
+)
 
 logger = logging.getLogger(__name__)
 
+_PLATFORM_NAMES = {
+    (system, architecture): field_name
+    for field_name, system, architecture in PLATFORMS
+}
+
+PROBES_PER_VERSION: int = len(PLATFORMS)
+"""Amount of probes that are sent at the same time for a single version."""
+
+PLATFORM_EXCLUSIVE_VERSIONS: frozenset[str] = frozenset({"16.0v9"})
+"""Releases that are known to have been published without a Linux installer.
+
+These are always probed on every platform, as probing Linux first would
+report them as missing.
+"""
+
+_LAST_VERSION_10_0 = SemanticVersion(10, 0, 6)
+_FIRST_VERSION_10_5 = SemanticVersion(10, 5, 1)
+
+
+class ScanStrategy(StrEnum):
+    """Available strategies to find all versions of a scan."""
+
+    LINEAR: str = "linear"
+    """Probe one version after the other until one is missing."""
+    GALLOPING: str = "galloping"
+    """Locate the last version with an exponential and binary search."""
+
+
+@dataclass(frozen=True)
+class ScanOptions:
+    """Options that define how versions are scanned."""
+
+    strategy: ScanStrategy = ScanStrategy.LINEAR
+    """Strategy to use to find all versions."""
+    lookahead: int = 1
+    """Amount of versions that are probed at the same time.
+
+    With a lookahead of 4, versions v3 to v6 are probed together when v2
+    has been found. Results are collected in order, so the outcome is the
+    same as probing one by one, at the cost of up to `lookahead - 1`
+    wasted probes at the end of every scan.
+    """
+    gap_tolerance: int = 0
+    """Amount of missing versions in a row that do not end a scan.
+
+    Nuke numbering has holes, such as the jump from 10.0 to 10.5 that is
+    handled by `_get_version_to_process`. With a tolerance of 1, a scan
+    over 1, 2, 4 continues past the missing 3. Every scan costs this many
+    additional probes at its end.
+    """
+    primary_platform: str | None = "linux_x86_64"
+    """Installer that is probed before the other platforms.
+
+    When it is missing, the version is reported as missing without probing
+    the other platforms. Most probes are for versions that do not exist,
+    so this saves three out of four of those. None probes all platforms
+    at the same time.
+    """
+    platform_exclusive_versions: frozenset[str] = PLATFORM_EXCLUSIVE_VERSIONS
+    """Versions that always probe all platforms, as they are known to miss
+    the primary platform."""
+
+    def __post_init__(self) -> None:
+        """Check if the provided options are valid.
+
+        Raises:
+            ValueError: if lookahead is lower than 1, the gap tolerance
+                is negative or the primary platform is unknown.
+        """
+        if self.lookahead < 1:
+            msg = "Lookahead should be at least 1."
+            raise ValueError(msg)
+        if self.gap_tolerance < 0:
+            msg = "Gap tolerance should not be negative."
+            raise ValueError(msg)
+        platform_names = [field_name for field_name, _, _ in PLATFORMS]
+        if (
+            self.primary_platform is not None
+            and self.primary_platform not in platform_names
+        ):
+            msg = f"Primary platform should be one of {platform_names}."
+            raise ValueError(msg)
+
+    def get_platform_stages(
+        self, version: SemanticVersion
+    ) -> list[list[tuple[str, OperatingSystem, Architecture]]]:
+        """Return the platforms to probe for a version, grouped per stage.
+
+        Every stage is probed at the same time. When no installer has been
+        found after a stage, the version is missing and the remaining
+        stages are skipped.
+
+        Args:
+            version: version that will be probed.
+
+        Returns:
+            list of stages, each containing the platforms to probe.
+        """
+        if (
+            self.primary_platform is None
+            or str(version) in self.platform_exclusive_versions
+        ):
+            return [list(PLATFORMS)]
+        primary = [
+            platform
+            for platform in PLATFORMS
+            if platform[0] == self.primary_platform
+        ]
+        others = [
+            platform
+            for platform in PLATFORMS
+            if platform[0] != self.primary_platform
+        ]
+        return [primary, others]
+
+    @property
+    def probes_in_flight(self) -> int:
+        """Return the maximum amount of probes a single scan sends at once."""
+        return self.lookahead * PROBES_PER_VERSION
+
+
+def combine_installers(
+    version: SemanticVersion,
+    installers: Iterable[tuple[str, str | None] | None],
+) -> NukeRelease | None:
+    """Combine the fetched installers of all platforms into a release.
+
+    The date is taken from the first platform in `PLATFORMS` that reports
+    one, so the result does not depend on which response arrives first.
 
-class _VersionParser:
+    Args:
+        version: version the installers belong to.
+        installers: fetched installer per platform, in `PLATFORMS` order.
+
+    Returns:
+        NukeRelease if any installer has a date, else None.
+    """
+    installer_urls = {}
+    date = None
+    for (field_name, _, _), installer in zip(
+        PLATFORMS, installers, strict=True
+    ):
+        if not installer:
+            continue
+        installer_urls[field_name], installer_date = installer
+        date = date or installer_date
+
+    if not date:
+        return None
+
+    return NukeRelease(
+        version=version,
+        installer=NukeInstaller(**installer_urls),
+        date=date,
+    )
+
+
+class VersionParser:
     """Object that is responsible for fetching data by version."""
 
-    def __init__(self, version: SemanticVersion) -> None:
+    def __init__(
+        self,
+        version: SemanticVersion,
+        session: requests.Session | None = None,
+    ) -> None:
         """Create instance of the VersionParser object.
 
         Args:
             version: version to use for collecting data.
+            session: session to send probes with. When not provided, every
+                probe opens a new connection.
         """
         self._version = version
+        self._session = session if session is not None else requests
         self._date: str | None = None
 
     @classmethod
-    def to_nuke_release(cls, version: SemanticVersion) -> NukeRelease | None:
+    def to_nuke_release(
+        cls,
+        version: SemanticVersion,
+        session: requests.Session | None = None,
+        options: ScanOptions | None = None,
+        executor: Executor | None = None,
+    ) -> NukeRelease | None:
         """Parse data from version to NukeRelease.
 
+        The platforms of every stage defined by the options are probed at
+        the same time in the executor.
+
         Args:
             version: version to parse data for.
+            session: session to send probes with.
+            options: options defining which platforms to probe first.
+            executor: executor shared by the probes of all versions of a
+                scan. When not provided, the platforms are probed one
+                after the other.
 
         Returns:
             NukeRelease if data found else None
         """
-        version_parser = cls(version)
-        linux_x86_64 = version_parser.retrieve_data(
-            system=OperatingSystem.LINUX, architecture=Architecture.X86_64
-        )
-        windows_x86_64 = version_parser.retrieve_data(
-            system=OperatingSystem.WINDOWS, architecture=Architecture.X86_64
-        )
-        mac_x86_64 = version_parser.retrieve_data(
-            system=OperatingSystem.MAC, architecture=Architecture.X86_64
-        )
-        mac_arm = version_parser.retrieve_data(
-            system=OperatingSystem.MAC, architecture=Architecture.ARM
+        options = options or ScanOptions()
+        version_parser = cls(version, session)
+        probe = executor.map if executor is not None else map
+        installers = {}
+        for stage in options.get_platform_stages(version):
+            stage_installers = probe(
+                version_parser.fetch_installer,
+                [system for _, system, _ in stage],
+                [architecture for _, _, architecture in stage],
+            )
+            field_names = [field_name for field_name, _, _ in stage]
+            installers.update(
+                zip(field_names, stage_installers, strict=True)
+            )
+            if not any(installers.values()):
+                return None
+
+        return combine_installers(
+            version,
+            [installers[field_name] for field_name, _, _ in PLATFORMS],
         )
 
-        if not version_parser.date:
-            return None
+    def fetch_installer(
+        self, system: OperatingSystem, architecture: Architecture
+    ) -> tuple[str, str | None] | None:
+        """Fetch the installer of this version without storing any data.
 
-        installer_data = NukeInstaller(
-            linux_x86_64=linux_x86_64,
-            windows_x86_64=windows_x86_64,
-            mac_x86_64=mac_x86_64,
-            mac_arm=mac_arm,
-        )
-        return NukeRelease(
-            version=version, installer=installer_data, date=version_parser.date
+        Probes that fail or of which the outcome is unknown are reported as
+        missing. The session stores these, so they can be probed again.
+        Probes answered from the probe cache are counted by their source
+        and left out of the latency, as no request has been sent.
+
+        Args:
+            system: operating system to find executable for
+            architecture: architecture to find release for
+
+        Returns:
+            tuple of url and last modified date if found, None if not found.
+        """
+        calculated_url = calculate_url(
+            version=self._version, system=system, architecture=architecture
         )
+        platform = _PLATFORM_NAMES[system, architecture]
+        source = "network"
+        start_time = time.monotonic()
+        try:
+            response = self._session.head(calculated_url, timeout=10)
+            if getattr(response, "from_cache", False) is True:
+                source = "cache"
+        except requests.RequestException as error:
+            PROBES.inc(platform=platform, outcome="error", source=source)
+            msg = f"Could not probe {calculated_url}: {error}"
+            logger.warning(msg)
+            return None
+        finally:
+            if source == "network":
+                PROBE_LATENCY_SECONDS.observe(
+                    time.monotonic() - start_time, platform=platform
+                )
+        if is_unknown_status(response.status_code):
+            PROBES.inc(platform=platform, outcome="error", source=source)
+            msg = (
+                f"Unknown outcome for {calculated_url}, "
+                f"status {response.status_code}"
+            )
+            logger.warning(msg)
+            return None
+        if response.status_code != 200:  # noqa: PLR2004
+            PROBES.inc(platform=platform, outcome="miss", source=source)
+            msg = f"Found no data for {calculated_url}"
+            logger.info(msg)
+            return None
+
+        PROBES.inc(platform=platform, outcome="hit", source=source)
+        msg = f"Processed {calculated_url}"
+        logger.info(msg)
+
+        return calculated_url, response.headers.get("last-modified")
 
     def retrieve_data(
         self, system: OperatingSystem, architecture: Architecture
@@ -86,20 +338,15 @@ class _VersionParser:
         Returns:
             url of release if found, None if not found.
         """
-        calculated_url = calculate_url(
-            version=self._version, system=system, architecture=architecture
+        installer = self.fetch_installer(
+            system=system, architecture=architecture
         )
-        response = requests.head(calculated_url, timeout=10)
-        if response.status_code != 200:  # noqa: PLR2004
-            msg = f"Found no data for {calculated_url}"
-            logger.info(msg)
+        if not installer:
             return None
 
+        calculated_url, date = installer
         if not self._date:
-            self._date = response.headers.get("last-modified")
-
-        msg = f"Processed {calculated_url}"
-        logger.info(msg)
+            self._date = date
 
         return calculated_url
 
@@ -113,33 +360,272 @@ class _VersionParser:
         return self._date
 
 
-def parse_release_data_by_attribute(
+def iterate_versions(
     start_version: SemanticVersion, attribute_name: str
-) -> list[NukeRelease]:
-    """Parse data by start version and iterate over provided attribute.
+) -> Iterator[SemanticVersion]:
+    """Yield every version to probe when iterating over an attribute.
+
+    Note:
+        only minor scans jump from 10.0 to 10.5, a patch scan of 10.0
+        stays within 10.0 as 10.5 is scanned as its own minor.
 
     Args:
         start_version: version to start iteration with
         attribute_name: attribute name to use for iterating
 
+    Yields:
+        the next version to probe, without end.
+    """
+    jump = _get_version_to_process if attribute_name == "minor" else None
+    latest_version = jump(start_version) if jump else start_version
+    while True:
+        yield latest_version
+        if jump:
+            latest_version = jump(latest_version)
+        attribute_value = getattr(latest_version, attribute_name)
+        latest_version = replace(
+            latest_version, **{attribute_name: attribute_value + 1}
+        )
+
+
+class _Candidates:
+    """Indexable view on the lazily generated versions of a scan."""
+
+    def __init__(self, versions: Iterator[SemanticVersion]) -> None:
+        """Create instance of the Candidates object.
+
+        Args:
+            versions: versions to probe, in order.
+        """
+        self._versions = versions
+        self._generated: list[SemanticVersion] = []
+
+    def __getitem__(self, index: int) -> SemanticVersion:
+        """Return the version at the provided position of the scan."""
+        while len(self._generated) <= index:
+            self._generated.append(next(self._versions))
+        return self._generated[index]
+
+
+def gallop(
+    versions: Iterator[SemanticVersion], gap_tolerance: int
+) -> Generator[
+    list[SemanticVersion], list[NukeRelease | None], list[NukeRelease]
+]:
+    """Search the last release of a scan in a logarithmic amount of steps.
+
+    The distance to the next probe doubles until a version is missing, after
+    which the last release is located with a binary search between the
+    last found and the first missing version. Finally all versions up to
+    the last release are probed together.
+
+    This generator does not probe anything itself. It yields the versions
+    it needs and expects their releases (or None) to be sent back, in the
+    same order, so it can be driven by threads as well as by asyncio.
+
+    Note:
+        this expects releases to be contiguous, apart from holes that are
+        no longer than the gap tolerance. Releases found beyond a longer
+        hole are dropped, so the result matches the linear scan.
+
+    Args:
+        versions: versions to probe, in order.
+        gap_tolerance: amount of missing versions that are allowed in
+            between two releases.
+
     Returns:
-        list of NukeRelease if found, else empty list.
+        list of NukeRelease up to the last release.
     """
-    latest_version = _get_version_to_process(start_version)
-    previous_release = _VersionParser.to_nuke_release(latest_version)
-    if not previous_release:
+    candidates = _Candidates(versions)
+    found: dict[int, NukeRelease | None] = {}
+
+    def probe(
+        positions: range,
+    ) -> Generator[list[SemanticVersion], list[NukeRelease | None]]:
+        unknown_positions = [
+            position for position in positions if position not in found
+        ]
+        if unknown_positions:
+            releases = yield [
+                candidates[position] for position in unknown_positions
+            ]
+            found.update(zip(unknown_positions, releases, strict=True))
+
+    def exists(
+        position: int,
+    ) -> Generator[list[SemanticVersion], list[NukeRelease | None], bool]:
+        window = range(position, position + gap_tolerance + 1)
+        yield from probe(window)
+        return any(found[window_position] for window_position in window)
+
+    if not (yield from exists(0)):
         return []
 
-    nuke_releases = [previous_release]
-
-    while previous_release:
-        latest_version = _get_version_to_process(latest_version)
-        attribute_value = getattr(latest_version, attribute_name)
-        setattr(latest_version, attribute_name, attribute_value + 1)
-        release = _VersionParser.to_nuke_release(latest_version)
+    lower, step = 0, 1
+    while (yield from exists(lower + step)):
+        lower += step
+        step *= 2
+
+    upper = lower + step
+    while upper - lower > 1:
+        middle = (lower + upper) // 2
+        if (yield from exists(middle)):
+            lower = middle
+        else:
+            upper = middle
+
+    yield from probe(range(lower + 1))
+    releases = []
+    missing_versions = 0
+    for position in range(lower + 1):
+        release = found[position]
+        missing_versions = 0 if release else missing_versions + 1
+        if missing_versions > gap_tolerance:
+            break
         if release:
-            nuke_releases.append(release)
-        previous_release = release
+            releases.append(release)
+    return releases
+
+
+def _parse_with_galloping(
+    versions: Iterator[SemanticVersion],
+    session: requests.Session | None,
+    options: ScanOptions,
+    platform_executor: Executor,
+) -> list[NukeRelease]:
+    """Parse versions using the galloping search.
+
+    Args:
+        versions: versions to probe, in order.
+        session: session to send probes with.
+        options: options defining how to scan.
+        platform_executor: executor to probe the platforms with.
+
+    Returns:
+        list of NukeRelease up to the last release.
+    """
+    search = gallop(versions, options.gap_tolerance)
+    with ThreadPoolExecutor(max_workers=options.lookahead) as executor:
+        try:
+            batch = next(search)
+            while True:
+                releases = executor.map(
+                    VersionParser.to_nuke_release,
+                    batch,
+                    repeat(session),
+                    repeat(options),
+                    repeat(platform_executor),
+                )
+                batch = search.send(list(releases))
+        except StopIteration as stop:
+            return stop.value
+
+
+def _parse_with_lookahead(
+    versions: Iterator[SemanticVersion],
+    session: requests.Session | None,
+    options: ScanOptions,
+    platform_executor: Executor,
+) -> list[NukeRelease]:
+    """Probe the next versions at the same time and collect them in order.
+
+    Collecting stops when more versions than the gap tolerance are missing
+    in a row, after which all outstanding probes are cancelled.
+
+    Args:
+        versions: versions to probe, in order.
+        session: session to send probes with.
+        options: options defining how to scan.
+        platform_executor: executor to probe the platforms with.
+
+    Returns:
+        list of NukeRelease up to the last release.
+    """
+    nuke_releases = []
+    missing_versions = 0
+    executor = ThreadPoolExecutor(max_workers=options.lookahead)
+    try:
+        pending = deque(
+            executor.submit(
+                VersionParser.to_nuke_release,
+                version,
+                session,
+                options,
+                platform_executor,
+            )
+            for version in islice(versions, options.lookahead)
+        )
+        while True:
+            release = pending.popleft().result()
+            missing_versions = 0 if release else missing_versions + 1
+            if missing_versions > options.gap_tolerance:
+                break
+            if release:
+                nuke_releases.append(release)
+            pending.append(
+                executor.submit(
+                    VersionParser.to_nuke_release,
+                    next(versions),
+                    session,
+                    options,
+                    platform_executor,
+                )
+            )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    return nuke_releases
+
+
+def parse_release_data_by_attribute(
+    start_version: SemanticVersion,
+    attribute_name: str,
+    session: requests.Session | None = None,
+    options: ScanOptions | None = None,
+) -> list[NukeRelease]:
+    """Parse data by start version and iterate over provided attribute.
+
+    The platforms of all versions are probed in a single executor, which
+    is sized to the amount of probes the scan sends at the same time.
+
+    Args:
+        start_version: version to start iteration with
+        attribute_name: attribute name to use for iterating
+        session: session to send probes with.
+        options: options defining how to scan, defaults to a linear walk
+            over one version at a time.
+
+    Returns:
+        list of NukeRelease if found, else empty list.
+    """
+    options = options or ScanOptions()
+    versions = iterate_versions(start_version, attribute_name)
+    platform_executor = ThreadPoolExecutor(
+        max_workers=options.probes_in_flight, thread_name_prefix="platform"
+    )
+    try:
+        if options.strategy == ScanStrategy.GALLOPING:
+            return _parse_with_galloping(
+                versions, session, options, platform_executor
+            )
+        if options.lookahead > 1:
+            return _parse_with_lookahead(
+                versions, session, options, platform_executor
+            )
+
+        nuke_releases = []
+        missing_versions = 0
+        for version in versions:
+            release = VersionParser.to_nuke_release(
+                version, session, options, platform_executor
+            )
+            missing_versions = 0 if release else missing_versions + 1
+            if missing_versions > options.gap_tolerance:
+                break
+            if release:
+                nuke_releases.append(release)
+    finally:
+        platform_executor.shutdown(wait=False, cancel_futures=True)
 
     return nuke_releases
 
@@ -155,7 +641,6 @@ def _get_version_to_process(
     Returns:
         Either None or the version to jump to.
     """
-    version_10_5 = SemanticVersion(10, 5, 1)
-    if version > SemanticVersion(10, 0, 6) and version < version_10_5:
-        return version_10_5
-    return deepcopy(version)
+    if _LAST_VERSION_10_0 < version < _FIRST_VERSION_10_5:
+        return _FIRST_VERSION_10_5
+    return version
@@ -0,0 +1,247 @@
+"""Script that stores the result of probes on disk between runs.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+
+from requests import Response
+
+from nukeversionparser.files import ExportedFile
+from nukeversionparser.parser.concurrency import AdaptiveAdapter
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from requests import PreparedRequest
+
+__slots__ = ("CachingAdapter", "ProbeCache")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_NEGATIVE_TTL: float = 3600
+"""Seconds a missing installer is remembered before probing it again."""
+
+DEFAULT_MAX_ENTRIES: int = 10_000
+"""Amount of probes to store before the least recently used are evicted."""
+
+_CACHE_FILE_NAME = "probe-cache.json"
+_CACHE_FORMAT_VERSION = 1
+_NEGATIVE_STATUSES = frozenset({HTTPStatus.FORBIDDEN, HTTPStatus.NOT_FOUND})
+
+
+@dataclass
+class CachedProbe:
+    """Data object to store the result of a single probe."""
+
+    status_code: int
+    """Status code the server responded with."""
+    last_modified: str | None
+    """Last modified header of the installer, if found."""
+    checked_at: float
+    """Timestamp of the moment the probe was sent."""
+
+
+class ProbeCache:
+    """Object that is responsible for storing probes on disk.
+
+    Found installers do not change anymore, so these are stored without
+    expiry by default. Missing installers might be released later on, so
+    these expire after a short time.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        positive_ttl: float | None = None,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """Create instance of the ProbeCache object.
+
+        Args:
+            directory: directory to store the cache file in.
+            negative_ttl: seconds before a missing installer expires.
+            positive_ttl: seconds before a found installer expires,
+                None to never expire.
+            max_entries: maximum amount of probes to store.
+        """
+        self._file_path = directory / _CACHE_FILE_NAME
+        self._negative_ttl = negative_ttl
+        self._positive_ttl = positive_ttl
+        self._max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = self._read()
+
+    def __len__(self) -> int:
+        """Return the amount of stored probes."""
+        return len(self._entries)
+
+    def _read(self) -> OrderedDict[str, CachedProbe]:
+        """Read the cache file if it exists and is valid.
+
+        Returns:
+            all stored probes, from least to most recently used.
+        """
+        if not self._file_path.is_file():
+            return OrderedDict()
+        try:
+            data = json.loads(self._file_path.read_text())
+            if data["version"] != _CACHE_FORMAT_VERSION:
+                return OrderedDict()
+            return OrderedDict(
+                (url, CachedProbe(**probe))
+                for url, probe in data["entries"].items()
+            )
+        except (ValueError, KeyError, TypeError):
+            msg = f"Ignoring invalid probe cache {self._file_path}"
+            logger.warning(msg)
+            return OrderedDict()
+
+    def _is_expired(self, probe: CachedProbe) -> bool:
+        """Return True if the probe should be sent again.
+
+        Args:
+            probe: stored probe to check.
+        """
+        if probe.status_code == HTTPStatus.OK:
+            ttl = self._positive_ttl
+        else:
+            ttl = self._negative_ttl
+        if ttl is None:
+            return False
+        return time.time() - probe.checked_at > ttl
+
+    def get(self, url: str) -> CachedProbe | None:
+        """Return the stored probe of the url.
+
+        Args:
+            url: url that has been probed.
+
+        Returns:
+            CachedProbe if stored and not expired, else None.
+        """
+        with self._lock:
+            probe = self._entries.get(url)
+            if probe is None:
+                return None
+            if self._is_expired(probe):
+                del self._entries[url]
+                return None
+            self._entries.move_to_end(url)
+            return probe
+
+    def store(
+        self, url: str, status_code: int, last_modified: str | None
+    ) -> None:
+        """Store the result of a probe.
+
+        Only definitive results are stored, any other status is ignored.
+
+        Args:
+            url: url that has been probed.
+            status_code: status code the server responded with.
+            last_modified: last modified header of the response.
+        """
+        if (
+            status_code != HTTPStatus.OK
+            and status_code not in _NEGATIVE_STATUSES
+        ):
+            return
+        with self._lock:
+            self._entries[url] = CachedProbe(
+                status_code=status_code,
+                last_modified=last_modified,
+                checked_at=time.time(),
+            )
+            self._entries.move_to_end(url)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self) -> None:
+        """Write all probes that are not expired to the cache file."""
+        with self._lock:
+            entries: dict[str, Any] = {
+                url: asdict(probe)
+                for url, probe in self._entries.items()
+                if not self._is_expired(probe)
+            }
+        data = {"version": _CACHE_FORMAT_VERSION, "entries": entries}
+        self._file_path.parent.mkdir(parents=True, exist_ok=True)
+        with ExportedFile(self._file_path) as exported_file:
+            exported_file.write(json.dumps(data).encode())
+
+
+class CachingAdapter(AdaptiveAdapter):
+    """Adapter that answers HEAD requests from the probe cache.
+
+    Requests that are not cached are sent by the AdaptiveAdapter, so
+    cached probes never count against the concurrency limit. Responses
+    answered from the cache have their `from_cache` attribute set to True.
+    """
+
+    def __init__(self, cache: ProbeCache, **kwargs: Any) -> None:
+        """Create instance of the CachingAdapter object.
+
+        Args:
+            cache: cache to read and store probes.
+            kwargs: passed through to the AdaptiveAdapter.
+        """
+        self._cache = cache
+        super().__init__(**kwargs)
+
+    def send(self, request: PreparedRequest, **kwargs: Any) -> Response:
+        """Send the request, unless the probe is stored in the cache.
+
+        Args:
+            request: the request to send.
+            kwargs: passed through to the AdaptiveAdapter.
+
+        Returns:
+            the cached or the received response.
+        """
+        if request.method != "HEAD":
+            return super().send(request, **kwargs)
+
+        probe = self._cache.get(request.url)
+        if probe is not None:
+            return self._build_cached_response(request, probe)
+
+        response = super().send(request, **kwargs)
+        self._cache.store(
+            url=request.url,
+            status_code=response.status_code,
+            last_modified=response.headers.get("last-modified"),
+        )
+        return response
+
+    def _build_cached_response(
+        self, request: PreparedRequest, probe: CachedProbe
+    ) -> Response:
+        """Build a response from a stored probe.
+
+        Args:
+            request: the request that was answered from cache.
+            probe: the stored probe.
+
+        Returns:
+            response containing the stored status and date, marked as
+            answered from the cache.
+        """
+        response = Response()
+        response.status_code = probe.status_code
+        if probe.last_modified:
+            response.headers["last-modified"] = probe.last_modified
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
@@ -0,0 +1,94 @@
+"""Script that decides when and how long to wait before sending again.
+
+A probe has one of three outcomes. The installer is found (200), it is
+definitively absent (403 or 404), or the outcome is unknown because of a
+timeout, a reset connection or a server error. Only unknown outcomes are
+retried, and probes that stay unknown are remembered so they can be sent
+again at the end of the run.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import random
+import threading
+from http import HTTPStatus
+
+__slots__ = ("UnknownProbes", "get_backoff_delay", "is_unknown_status")
+
+DEFAULT_RETRIES: int = 5
+"""Amount of times a probe with an unknown outcome is sent again."""
+
+_BASE_DELAY = 0.5
+_MAX_DELAY = 30.0
+
+
+def is_unknown_status(status_code: int) -> bool:
+    """Return True if the status does not tell whether the file exists.
+
+    Args:
+        status_code: status code the server responded with.
+    """
+    return (
+        status_code == HTTPStatus.TOO_MANY_REQUESTS
+        or status_code >= HTTPStatus.INTERNAL_SERVER_ERROR
+    )
+
+
+def get_backoff_delay(attempt: int) -> float:
+    """Return the seconds to wait before sending a request again.
+
+    The delay is picked at random up to an exponentially growing cap
+    ("full jitter"), so retries of requests that failed together are
+    spread out instead of failing together again.
+
+    Args:
+        attempt: amount of times the request has been sent before.
+
+    Returns:
+        seconds to wait.
+    """
+    cap = min(_MAX_DELAY, _BASE_DELAY * 2**attempt)
+    return random.uniform(0, cap)
+
+
+class UnknownProbes:
+    """Object that remembers the probes of which the outcome is unknown."""
+
+    def __init__(self) -> None:
+        """Create instance of the UnknownProbes object."""
+        self._urls: set[str] = set()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        """Return the amount of unknown probes."""
+        return len(self._urls)
+
+    def add(self, url: str) -> None:
+        """Remember a probe that stayed unknown after all retries.
+
+        Args:
+            url: url that has been probed.
+        """
+        with self._lock:
+            self._urls.add(url)
+
+    def discard(self, url: str) -> None:
+        """Forget a probe of which the outcome is known by now.
+
+        Args:
+            url: url that has been probed.
+        """
+        with self._lock:
+            self._urls.discard(url)
+
+    def drain(self) -> list[str]:
+        """Return and forget all unknown probes.
+
+        Returns:
+            the unknown urls in sorted order.
+        """
+        with self._lock:
+            urls = sorted(self._urls)
+            self._urls.clear()
+        return urls
@@ -0,0 +1,74 @@
+"""Script that creates the HTTP session shared by all probes.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import requests
+
+from nukeversionparser.parser.concurrency import AdaptiveAdapter
+from nukeversionparser.parser.probe_cache import CachingAdapter
+
+if TYPE_CHECKING:
+    from nukeversionparser.parser.concurrency import (
+        AdaptiveConcurrencyController,
+    )
+    from nukeversionparser.parser.probe_cache import ProbeCache
+    from nukeversionparser.parser.retry import UnknownProbes
+
+__slots__ = ("create_session",)
+
+
+def create_session(
+    pool_size: int,
+    cache: ProbeCache | None = None,
+    controller: AdaptiveConcurrencyController | None = None,
+    unknown_probes: UnknownProbes | None = None,
+) -> requests.Session:
+    """Create a session that keeps connections alive between probes.
+
+    The connection pool is blocking, so the amount of open connections
+    never exceeds the pool size. Connections are handed out by urllib3
+    in a thread safe way, which makes the session safe to share between
+    the collector workers.
+
+    Args:
+        pool_size: amount of connections to keep alive per host. This
+            should match the amount of workers probing at the same time.
+        cache: cache to answer probes from, so only unknown urls are
+            sent to the server.
+        controller: controller that lowers the amount of requests in
+            flight below the pool size when the server is busy.
+        unknown_probes: stores the probes of which the outcome is still
+            unknown after all retries.
+
+    Raises:
+        ValueError: if pool_size is lower than 1.
+
+    Returns:
+        session to use for probing.
+    """
+    if pool_size < 1:
+        msg = "Pool size should be at least 1."
+        raise ValueError(msg)
+    if cache is None:
+        adapter = AdaptiveAdapter(
+            controller,
+            unknown_probes=unknown_probes,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+    else:
+        adapter = CachingAdapter(
+            cache,
+            controller=controller,
+            unknown_probes=unknown_probes,
+            pool_maxsize=pool_size,
+            pool_block=True,
+        )
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
@@ -0,0 +1,155 @@
+"""Script that measures where the time of a run is spent.
+
+Every phase of a run records its wall time and the CPU time of the
+process. A phase with a lot of wall time and little CPU time is waiting
+on the network, while a phase where both are close is computing.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import cProfile
+import logging
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from pathlib import Path
+
+__slots__ = ("PROFILER", "PhaseProfiler", "PhaseTiming")
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PhaseTiming:
+    """Data object to store the time spent in a phase."""
+
+    wall_time: float = 0.0
+    """Seconds that passed while in the phase."""
+    cpu_time: float = 0.0
+    """Seconds of CPU time the process used while in the phase."""
+    calls: int = 0
+    """Amount of times the phase has been entered."""
+
+
+class PhaseProfiler:
+    """Object that records the time spent in every phase of a run.
+
+    Recording is disabled until `start` is called, so the phases cost
+    nothing during a normal run.
+    """
+
+    def __init__(self) -> None:
+        """Create instance of the PhaseProfiler object."""
+        self._enabled = False
+        self._timings: dict[str, PhaseTiming] = {}
+        self._lock = threading.Lock()
+        self._profile: cProfile.Profile | None = None
+        self._tracemalloc_top = 0
+
+    @property
+    def timings(self) -> dict[str, PhaseTiming]:
+        """Return the recorded timings, in order of first entry."""
+        return dict(self._timings)
+
+    def start(
+        self, *, use_cprofile: bool = False, tracemalloc_top: int = 0
+    ) -> None:
+        """Start recording phases.
+
+        Args:
+            use_cprofile: also profile every function call, in every
+                thread. Calls of threads running at the same time are
+                interleaved, so their cumulative time is approximate.
+            tracemalloc_top: amount of allocation sites to report, 0 to
+                not trace allocations.
+        """
+        self._enabled = True
+        self._timings.clear()
+        self._tracemalloc_top = tracemalloc_top
+        if tracemalloc_top:
+            tracemalloc.start()
+        if use_cprofile:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self, stats_path: Path | None = None) -> str:
+        """Stop recording and return the report.
+
+        Args:
+            stats_path: path to dump the cProfile statistics to, which can
+                be loaded with `pstats`.
+
+        Returns:
+            report of the time spent per phase and the top allocations.
+        """
+        self._enabled = False
+        if self._profile is not None:
+            self._profile.disable()
+            if stats_path is not None:
+                self._profile.dump_stats(stats_path)
+            self._profile = None
+
+        lines = [self._format_timings()]
+        if tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            lines.append(f"Top {self._tracemalloc_top} allocations:")
+            lines.extend(
+                str(statistic)
+                for statistic in snapshot.statistics("lineno")[
+                    : self._tracemalloc_top
+                ]
+            )
+        return "\n".join(lines)
+
+    def _format_timings(self) -> str:
+        """Return a table of the time spent per phase."""
+        name_width = max((len(name) for name in self._timings), default=5)
+        header = (
+            f"{'phase':<{name_width}}  {'wall (s)':>9}  {'cpu (s)':>9}  "
+            f"{'calls':>5}"
+        )
+        lines = [header]
+        lines.extend(
+            f"{name:<{name_width}}  {timing.wall_time:>9.3f}  "
+            f"{timing.cpu_time:>9.3f}  {timing.calls:>5}"
+            for name, timing in self._timings.items()
+        )
+        return "\n".join(lines)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Record the time spent within the context as a phase.
+
+        Phases entered more than once, for example from several threads,
+        add up their time.
+
+        Args:
+            name: name of the phase.
+        """
+        if not self._enabled:
+            yield
+            return
+        start_wall = time.perf_counter()
+        start_cpu = time.process_time()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_wall
+            cpu_time = time.process_time() - start_cpu
+            with self._lock:
+                timing = self._timings.setdefault(name, PhaseTiming())
+                timing.wall_time += wall_time
+                timing.cpu_time += cpu_time
+                timing.calls += 1
+
+
+PROFILER = PhaseProfiler()
+"""Profiler shared by the whole process."""
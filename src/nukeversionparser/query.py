@@ -0,0 +1,247 @@
+"""Script that answers lookups on an exported snapshot of releases.
+
+The snapshot is loaded once into indexes, after which every lookup is a
+dict lookup or a binary search, instead of walking the exported data.
+
+@maintainer: Gilles Vink
+"""
+
+from __future__ import annotations
+
+import json
+from bisect import bisect_right
+from datetime import UTC, datetime, timedelta
+from functools import cached_property
+from operator import attrgetter
+from typing import TYPE_CHECKING, Any
+
+from nukeversionparser.datamodel.constants import PLATFORMS, SUPPORTED_DAYS
+from nukeversionparser.datamodel.nuke_data import NukeFamily, SemanticVersion
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+    from nukeversionparser.datamodel.constants import (
+        Architecture,
+        OperatingSystem,
+    )
+    from nukeversionparser.datamodel.nuke_data import NukeRelease
+
+__slots__ = ("ReleaseIndex", "create_releases_dict", "parse_datetime")
+
+_SUPPORTED_PERIOD = timedelta(days=SUPPORTED_DAYS + 1)
+"""Releases younger than this are supported, see `get_supported`."""
+
+
+class ReleaseIndex:
+    """Object that indexes the releases of an exported snapshot.
+
+    The latest release of every family and minor version, also per
+    platform, is determined once when the index is created. The releases
+    are only sorted by date when the supported releases are requested,
+    as that requires parsing every date.
+    """
+
+    def __init__(self, families: list[NukeFamily]) -> None:
+        """Create instance of the ReleaseIndex object.
+
+        Args:
+            families: families to index, in any order.
+        """
+        self._releases: list[NukeRelease] = sorted(
+            (release for family in families for release in family.releases),
+            key=attrgetter("version"),
+            reverse=True,
+        )
+        self._by_version = {
+            release.version: release for release in self._releases
+        }
+        self._latest: dict[
+            tuple[int | None, int | None, str | None], NukeRelease
+        ] = {}
+        for release in self._releases:
+            version = release.version
+            platforms = [
+                None,
+                *(
+                    field_name
+                    for field_name, _, _ in PLATFORMS
+                    if getattr(release.installer, field_name)
+                ),
+            ]
+            for major, minor in (
+                (None, None),
+                (version.major, None),
+                (version.major, version.minor),
+            ):
+                for platform in platforms:
+                    self._latest.setdefault((major, minor, platform), release)
+
+    @classmethod
+    def from_dict(cls, data: dict[Any, dict[str, Any]]) -> ReleaseIndex:
+        """Create a ReleaseIndex from the data of an exported file.
+
+        Args:
+            data: family versions mapped to their releases, as exported.
+
+        Returns:
+            the index of the releases.
+        """
+        return cls(
+            [
+                NukeFamily.from_dict({family_version: releases})
+                for family_version, releases in data.items()
+            ]
+        )
+
+    @classmethod
+    def from_file(cls, file_path: Path) -> ReleaseIndex:
+        """Create a ReleaseIndex from an exported JSON file.
+
+        Args:
+            file_path: path of the exported file, for example
+                `nuke-all-releases.json`.
+
+        Returns:
+            the index of the releases.
+        """
+        return cls.from_dict(json.loads(file_path.read_text()))
+
+    def __len__(self) -> int:
+        """Return the amount of indexed releases."""
+        return len(self._releases)
+
+    @property
+    def families(self) -> list[int]:
+        """Return the version of every family, latest first."""
+        return sorted(
+            {release.version.major for release in self._releases},
+            reverse=True,
+        )
+
+    def find(self, version: SemanticVersion | str) -> NukeRelease | None:
+        """Return the release of a version.
+
+        Args:
+            version: version of the release, for example 15.0v2.
+
+        Returns:
+            the release, None if it is not part of the snapshot.
+        """
+        if isinstance(version, str):
+            version = SemanticVersion.parse(version)
+        return self._by_version.get(version)
+
+    def latest(
+        self,
+        major: int | None = None,
+        minor: int | None = None,
+        operating_system: OperatingSystem | None = None,
+        architecture: Architecture | None = None,
+    ) -> NukeRelease | None:
+        """Return the latest release matching the provided filters.
+
+        Args:
+            major: only consider releases of this family.
+            minor: only consider releases of this minor version, requires
+                the major version.
+            operating_system: only consider releases with an installer
+                for this operating system.
+            architecture: only consider releases with an installer for
+                this architecture.
+
+        Returns:
+            the latest matching release, None if no release matches.
+
+        Raises:
+            ValueError: if a minor version is provided without a major
+                version.
+        """
+        if minor is not None and major is None:
+            msg = "A minor version can only be provided with a major version."
+            raise ValueError(msg)
+        if operating_system is None and architecture is None:
+            return self._latest.get((major, minor, None))
+        releases = [
+            self._latest[major, minor, field_name]
+            for field_name, platform_system, platform_architecture in (
+                PLATFORMS
+            )
+            if operating_system in (None, platform_system)
+            and architecture in (None, platform_architecture)
+            and (major, minor, field_name) in self._latest
+        ]
+        return max(releases, key=attrgetter("version"), default=None)
+
+    @cached_property
+    def _date_index(self) -> tuple[list[NukeRelease], list[datetime]]:
+        """Return the releases and their dates, sorted by date."""
+        releases = sorted(
+            (release for release in self._releases if release.date),
+            key=attrgetter("released"),
+        )
+        return releases, [release.released for release in releases]
+
+    def get_supported(
+        self, as_of: datetime | None = None
+    ) -> list[NukeRelease]:
+        """Return the releases that are supported at a moment.
+
+        This matches `NukeRelease.get_supported`, without checking every
+        release.
+
+        Args:
+            as_of: moment to evaluate the supported state at, defaults to
+                now.
+
+        Returns:
+            the supported releases, latest version first.
+        """
+        as_of = as_of or datetime.now(UTC)
+        releases, release_dates = self._date_index
+        first_supported = bisect_right(
+            release_dates, as_of - _SUPPORTED_PERIOD
+        )
+        return sorted(
+            releases[first_supported:],
+            key=attrgetter("version"),
+            reverse=True,
+        )
+
+
+def create_releases_dict(
+    releases: list[NukeRelease | None], as_of: datetime | None = None
+) -> dict[str, dict[str, Any]]:
+    """Convert the releases of a lookup to the exported format.
+
+    Args:
+        releases: releases to convert, releases that are None are skipped.
+        as_of: moment to evaluate the supported state at, defaults to now.
+
+    Returns:
+        the version of every release mapped to its data.
+    """
+    as_of = as_of or datetime.now(UTC)
+    releases_dict = {}
+    for release in releases:
+        if release is not None:
+            releases_dict.update(release.to_dict(as_of))
+    return releases_dict
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parse an ISO 8601 date, which is in UTC if no timezone is given.
+
+    Args:
+        value: date to parse, for example 2025-01-01.
+
+    Returns:
+        the timezone aware datetime.
+
+    Raises:
+        ValueError: if the value is not an ISO 8601 date.
+    """
+    parsed_datetime = datetime.fromisoformat(value)
+    if parsed_datetime.tzinfo is None:
+        parsed_datetime = parsed_datetime.replace(tzinfo=UTC)
+    return parsed_datetime
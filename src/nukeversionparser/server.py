@@ -0,0 +1,652 @@
+"""Script that serves the exported files over HTTP using asyncio.
+
+The exported files are loaded into memory, together with their gzip
+compressed variants, so a request is answered without touching the disk.
+Every response carries a strong ETag, and a request with a matching
+If-None-Match header is answered with 304 Not Modified. The directory is
+watched, and the files are loaded again when the exporter has written
+new ones.
+
+Next to the files, the lookups of the query library are served:
+
+* `/query/find?version=15.0v2`
+* `/query/latest?major=15&minor=0&os=linux&architecture=x86`
+* `/query/supported?as_of=2025-01-01`
+* `/query/changes?since=42`
+
+@maintainer: Gilles Vink
+"""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from contextlib import suppress
+from dataclasses import dataclass
+from email.utils import formatdate
+from http import HTTPStatus
+from typing import TYPE_CHECKING, Any
+from urllib.parse import parse_qs, urlsplit
+
+from nukeversionparser.datamodel.constants import (
+    Architecture,
+    OperatingSystem,
+)
+from nukeversionparser.exporter.binary_index import BINARY_INDEX_FILE
+from nukeversionparser.exporter.change_feed import (
+    CHANGES_FILE,
+    read_changes,
+)
+from nukeversionparser.exporter.export_data import (
+    ALL_RELEASES_FILE,
+    GZIP_SUFFIX,
+    MINIFIED_SUFFIX,
+    VIEW_FILES,
+)
+from nukeversionparser.exporter.manifest import MANIFEST_FILE
+from nukeversionparser.query import (
+    ReleaseIndex,
+    create_releases_dict,
+    parse_datetime,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+__slots__ = (
+    "DEFAULT_HOST",
+    "DEFAULT_PORT",
+    "DEFAULT_READ_TIMEOUT",
+    "DEFAULT_RELOAD_INTERVAL",
+    "ReleaseServer",
+    "serve",
+)
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST: str = "127.0.0.1"
+"""Default address to listen on."""
+DEFAULT_PORT: int = 8080
+"""Default port to listen on."""
+DEFAULT_RELOAD_INTERVAL: float = 2.0
+"""Default seconds between checks for newly exported files."""
+DEFAULT_READ_TIMEOUT: float = 30.0
+"""Default seconds to wait for the next request of a connection."""
+
+_MIN_GZIP_SIZE = 256
+"""Bytes a body needs before it is compressed."""
+_GZIP_LEVEL = 9
+"""Compression level of files that are not compressed on disk."""
+_QUERY_GZIP_LEVEL = 6
+"""Compression level of query results, which are compressed per request."""
+_MAX_CACHED_QUERIES = 256
+"""Amount of query results of which the resource is kept."""
+_MAX_HEADER_LINE = 16 * 1024
+"""Maximum length of the request line and of every header line."""
+_CONTENT_TYPES = {
+    ".json": "application/json",
+    ".jsonl": "application/jsonl",
+    ".idx": "application/octet-stream",
+}
+"""Content type of every served file extension."""
+_JSON_CONTENT_TYPE = _CONTENT_TYPES[".json"]
+_BAD_REQUEST_RESPONSE = (
+    b"HTTP/1.1 400 Bad Request\r\n"
+    b"Content-Length: 0\r\n"
+    b"Connection: close\r\n\r\n"
+)
+"""Response to a request that can not be parsed."""
+
+
+@dataclass(frozen=True)
+class _Resource:
+    """Data object to store a response body and its compressed variant."""
+
+    body: bytes
+    """Uncompressed body."""
+    etag: str
+    """Strong ETag of the uncompressed body."""
+    content_type: str
+    """Content type of the body."""
+    gzip_body: bytes | None = None
+    """Gzip compressed body, None if the body is not worth compressing."""
+    gzip_etag: str | None = None
+    """Strong ETag of the gzip compressed body."""
+
+
+def _create_etag(body: bytes) -> str:
+    """Return the strong ETag of a body."""
+    return f'"{hashlib.sha256(body).hexdigest()}"'
+
+
+def _create_resource(
+    body: bytes,
+    content_type: str,
+    gzip_body: bytes | None = None,
+    gzip_level: int = _GZIP_LEVEL,
+    etag: str | None = None,
+) -> _Resource:
+    """Create a resource, compressing the body if it is not compressed.
+
+    Args:
+        body: uncompressed body.
+        content_type: content type of the body.
+        gzip_body: already compressed body, for example read from disk.
+        gzip_level: level to compress the body with.
+        etag: ETag of the body, when it is already known.
+
+    Returns:
+        the created resource.
+    """
+    if gzip_body is None and len(body) >= _MIN_GZIP_SIZE:
+        gzip_body = gzip.compress(body, gzip_level, mtime=0)
+    return _Resource(
+        body=body,
+        etag=etag or _create_etag(body),
+        content_type=content_type,
+        gzip_body=gzip_body,
+        gzip_etag=None if gzip_body is None else _create_etag(gzip_body),
+    )
+
+
+def _get_served_files() -> list[str]:
+    """Return the name of every exported file that is served."""
+    return [
+        *VIEW_FILES,
+        *(
+            file_name.removesuffix(".json") + MINIFIED_SUFFIX
+            for file_name in VIEW_FILES
+        ),
+        BINARY_INDEX_FILE,
+        MANIFEST_FILE,
+        CHANGES_FILE,
+    ]
+
+
+def _get_signature(directory: Path) -> tuple[tuple[int, int] | None, ...]:
+    """Return the modification time and size of the watched files.
+
+    The exporter appends the change feed first, then replaces the views
+    and the binary index, and writes the manifest last. A reload can
+    therefore happen in the middle of an export. As the manifest lists the
+    hash of every file, it changes last whenever any file changed, which
+    loads the complete export again.
+
+    Args:
+        directory: directory the files are exported to.
+
+    Returns:
+        the modification time and size of every watched file, None if it
+        does not exist.
+    """
+    signature = []
+    for file_name in (ALL_RELEASES_FILE, MANIFEST_FILE, CHANGES_FILE):
+        try:
+            stat = (directory / file_name).stat()
+        except FileNotFoundError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Data object to store everything that is loaded from the files."""
+
+    resources: dict[str, _Resource]
+    """Path of every served file mapped to its resource."""
+    index: ReleaseIndex
+    """Index of all releases."""
+    changes: list[dict[str, Any]]
+    """Every change of the change feed, oldest first."""
+    signature: tuple[tuple[int, int] | None, ...]
+    """Signature of the watched files before they were loaded."""
+
+
+def _load_snapshot(directory: Path) -> _Snapshot:
+    """Load the exported files of a directory into memory.
+
+    Args:
+        directory: directory the files are exported to.
+
+    Returns:
+        the loaded snapshot.
+    """
+    signature = _get_signature(directory)
+    resources = {}
+    for file_name in _get_served_files():
+        file_path = directory / file_name
+        if not file_path.is_file():
+            continue
+        gzip_path = file_path.with_name(file_name + GZIP_SUFFIX)
+        resources[f"/{file_name}"] = _create_resource(
+            file_path.read_bytes(),
+            _CONTENT_TYPES[file_path.suffix],
+            gzip_path.read_bytes() if gzip_path.is_file() else None,
+        )
+
+    all_releases_file = directory / ALL_RELEASES_FILE
+    if all_releases_file.is_file():
+        index = ReleaseIndex.from_file(all_releases_file)
+    else:
+        logger.warning("No %s found to query.", ALL_RELEASES_FILE)
+        index = ReleaseIndex([])
+    return _Snapshot(
+        resources=resources,
+        index=index,
+        changes=read_changes(directory / CHANGES_FILE),
+        signature=signature,
+    )
+
+
+def _accepts_gzip(accept_encoding: str) -> bool:
+    """Return True if the Accept-Encoding header allows gzip.
+
+    Args:
+        accept_encoding: value of the Accept-Encoding header.
+
+    Returns:
+        True if gzip, or any encoding when gzip is not listed, is accepted
+        with a quality above 0.
+    """
+    qualities = {}
+    for coding in accept_encoding.split(","):
+        name, _, parameters = coding.partition(";")
+        quality = 1.0
+        parameter_name, _, value = parameters.partition("=")
+        if parameter_name.strip().lower() == "q":
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip().lower()] = quality
+    return qualities.get("gzip", qualities.get("*", 0.0)) > 0
+
+
+def _matches_etag(if_none_match: str, etag: str) -> bool:
+    """Return True if the If-None-Match header contains the ETag.
+
+    Args:
+        if_none_match: value of the If-None-Match header.
+        etag: strong ETag of the response.
+
+    Returns:
+        True if the client already has the response.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return any(
+        candidate.strip().removeprefix("W/") == etag
+        for candidate in if_none_match.split(",")
+    )
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    """Read the headers of a request.
+
+    Args:
+        reader: stream to read the headers from.
+
+    Returns:
+        the headers, with lowercase names.
+    """
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+class _BadRequestError(Exception):
+    """Exception that is raised when a query has invalid parameters."""
+
+
+def _get_parameter(
+    parameters: dict[str, list[str]], name: str
+) -> str | None:
+    """Return the last value of a query parameter, None if not set."""
+    values = parameters.get(name)
+    return values[-1] if values else None
+
+
+def _get_int_parameter(
+    parameters: dict[str, list[str]], name: str
+) -> int | None:
+    """Return a query parameter as int, None if not set.
+
+    Raises:
+        _BadRequestError: if the parameter is not an integer.
+    """
+    value = _get_parameter(parameters, name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        msg = f"Parameter {name} must be an integer."
+        raise _BadRequestError(msg) from None
+
+
+class ReleaseServer:
+    """Object that serves the exported files of a directory."""
+
+    def __init__(
+        self,
+        directory: Path,
+        reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+        read_timeout: float = DEFAULT_READ_TIMEOUT,
+    ) -> None:
+        """Create instance of the ReleaseServer object.
+
+        Args:
+            directory: directory the files are exported to.
+            reload_interval: seconds between checks for newly exported
+                files.
+            read_timeout: seconds to wait for the next request of a
+                connection before closing it.
+        """
+        self._directory = directory
+        self._reload_interval = reload_interval
+        self._read_timeout = read_timeout
+        self._snapshot = _load_snapshot(directory)
+        self._query_resources: OrderedDict[str, _Resource] = OrderedDict()
+
+    def _query(
+        self, path: str, parameters: dict[str, list[str]]
+    ) -> tuple[int, Any]:
+        """Answer a lookup of the query library.
+
+        Args:
+            path: path of the request.
+            parameters: parameters of the query string.
+
+        Returns:
+            status and the JSON serializable result.
+
+        Raises:
+            _BadRequestError: if the parameters are invalid.
+        """
+        index = self._snapshot.index
+        if path == "/query/changes":
+            since = _get_int_parameter(parameters, "since") or 0
+            return HTTPStatus.OK, self._snapshot.changes[max(since, 0) :]
+
+        try:
+            if path == "/query/find":
+                version = _get_parameter(parameters, "version")
+                if version is None:
+                    msg = "Parameter version is required."
+                    raise _BadRequestError(msg)
+                releases = [index.find(version)]
+            elif path == "/query/latest":
+                operating_system = _get_parameter(parameters, "os")
+                if operating_system is not None:
+                    operating_system = OperatingSystem(operating_system)
+                architecture = _get_parameter(parameters, "architecture")
+                if architecture is not None:
+                    architecture = Architecture(architecture)
+                releases = [
+                    index.latest(
+                        major=_get_int_parameter(parameters, "major"),
+                        minor=_get_int_parameter(parameters, "minor"),
+                        operating_system=operating_system,
+                        architecture=architecture,
+                    )
+                ]
+            elif path == "/query/supported":
+                as_of = _get_parameter(parameters, "as_of")
+                as_of = None if as_of is None else parse_datetime(as_of)
+                return HTTPStatus.OK, create_releases_dict(
+                    index.get_supported(as_of), as_of
+                )
+            else:
+                return HTTPStatus.NOT_FOUND, {"error": "Unknown query."}
+        except ValueError as error:
+            raise _BadRequestError(str(error)) from None
+        result = create_releases_dict(releases)
+        return (HTTPStatus.OK if result else HTTPStatus.NOT_FOUND), result
+
+    def _get_resource(self, target: str) -> tuple[int, _Resource]:
+        """Return the resource of a request target.
+
+        Args:
+            target: path and query string of the request.
+
+        Returns:
+            status and the resource to respond with.
+        """
+        split_target = urlsplit(target)
+        resource = self._snapshot.resources.get(split_target.path)
+        if resource is not None:
+            return HTTPStatus.OK, resource
+        if not split_target.path.startswith("/query/"):
+            status, result = HTTPStatus.NOT_FOUND, {"error": "Not found."}
+        else:
+            try:
+                status, result = self._query(
+                    split_target.path, parse_qs(split_target.query)
+                )
+            except _BadRequestError as error:
+                status, result = HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        body = json.dumps(result, separators=(",", ":")).encode()
+        return status, self._get_query_resource(body)
+
+    def _get_query_resource(self, body: bytes) -> _Resource:
+        """Return the resource of a query result.
+
+        Popular lookups return the same result over and over, so the
+        resources of the latest results are kept by their ETag and only
+        new results are compressed.
+
+        Args:
+            body: uncompressed query result.
+
+        Returns:
+            the resource of the result.
+        """
+        etag = _create_etag(body)
+        resource = self._query_resources.get(etag)
+        if resource is not None:
+            self._query_resources.move_to_end(etag)
+            return resource
+        resource = _create_resource(
+            body, _JSON_CONTENT_TYPE, gzip_level=_QUERY_GZIP_LEVEL, etag=etag
+        )
+        self._query_resources[etag] = resource
+        if len(self._query_resources) > _MAX_CACHED_QUERIES:
+            self._query_resources.popitem(last=False)
+        return resource
+
+    def respond(
+        self, method: str, target: str, headers: dict[str, str]
+    ) -> tuple[int, dict[str, str], bytes]:
+        """Return the response to a request.
+
+        Args:
+            method: method of the request.
+            target: path and query string of the request.
+            headers: headers of the request, with lowercase names.
+
+        Returns:
+            status, headers and body of the response.
+        """
+        response_headers = {"Date": formatdate(usegmt=True)}
+        if method not in ("GET", "HEAD"):
+            response_headers["Allow"] = "GET, HEAD"
+            response_headers["Content-Length"] = "0"
+            return HTTPStatus.METHOD_NOT_ALLOWED, response_headers, b""
+
+        status, resource = self._get_resource(target)
+        body, etag = resource.body, resource.etag
+        if resource.gzip_body is not None:
+            response_headers["Vary"] = "Accept-Encoding"
+            if _accepts_gzip(headers.get("accept-encoding", "")):
+                body, etag = resource.gzip_body, resource.gzip_etag
+                response_headers["Content-Encoding"] = "gzip"
+        response_headers["ETag"] = etag
+        response_headers["Cache-Control"] = "no-cache"
+
+        if status == HTTPStatus.OK and _matches_etag(
+            headers.get("if-none-match", ""), etag
+        ):
+            response_headers.pop("Content-Encoding", None)
+            return HTTPStatus.NOT_MODIFIED, response_headers, b""
+
+        response_headers["Content-Type"] = resource.content_type
+        response_headers["Content-Length"] = str(len(body))
+        if method == "HEAD":
+            body = b""
+        return status, response_headers, body
+
+    async def reload_if_changed(self) -> bool:
+        """Load the files again if the exporter has written new ones.
+
+        The files are loaded in a thread, and replace the served files at
+        once when they are all loaded.
+
+        Returns:
+            True if the files were loaded again.
+        """
+        signature = await asyncio.to_thread(_get_signature, self._directory)
+        if signature == self._snapshot.signature:
+            return False
+        try:
+            self._snapshot = await asyncio.to_thread(
+                _load_snapshot, self._directory
+            )
+        except (OSError, ValueError) as error:
+            logger.warning("Could not reload the exported files: %s", error)
+            return False
+        logger.info("Reloaded the exported files.")
+        return True
+
+    async def _watch(self) -> None:
+        """Reload the files whenever the exporter has written new ones."""
+        while True:
+            await asyncio.sleep(self._reload_interval)
+            await self.reload_if_changed()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Answer the requests of a connection until it is closed.
+
+        A connection that does not send a complete request within the
+        read timeout is closed, so idle keep-alive connections do not
+        stay open forever.
+
+        Args:
+            reader: stream to read the requests from.
+            writer: stream to write the responses to.
+        """
+        try:
+            while True:
+                async with asyncio.timeout(self._read_timeout):
+                    request_line = await reader.readline()
+                    if not request_line:
+                        break
+                    headers = await _read_headers(reader)
+
+                parts = request_line.decode("latin-1").split()
+                if len(parts) != 3:  # noqa: PLR2004
+                    writer.write(_BAD_REQUEST_RESPONSE)
+                    await writer.drain()
+                    break
+                method, target, version = parts
+                status, response_headers, body = self.respond(
+                    method, target, headers
+                )
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                    and method in ("GET", "HEAD")
+                )
+                if not keep_alive:
+                    response_headers["Connection"] = "close"
+                status = HTTPStatus(status)
+                writer.write(
+                    (
+                        f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                        + "".join(
+                            f"{name}: {value}\r\n"
+                            for name, value in response_headers.items()
+                        )
+                        + "\r\n"
+                    ).encode("latin-1")
+                    + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, TimeoutError, ValueError):
+            pass
+        finally:
+            writer.close()
+            with suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def start(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> asyncio.Server:
+        """Start listening for requests.
+
+        Args:
+            host: address to listen on.
+            port: port to listen on, 0 to pick a free one.
+
+        Returns:
+            the started server.
+        """
+        return await asyncio.start_server(
+            self._handle_connection, host, port, limit=_MAX_HEADER_LINE
+        )
+
+    async def serve_forever(
+        self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT
+    ) -> None:
+        """Serve requests and reload the files until cancelled.
+
+        Args:
+            host: address to listen on.
+            port: port to listen on.
+        """
+        server = await self.start(host, port)
+        for socket in server.sockets:
+            logger.info(
+                "Serving %s on %s.", self._directory, socket.getsockname()
+            )
+        watcher = asyncio.create_task(self._watch())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def serve(
+    directory: Path,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    reload_interval: float = DEFAULT_RELOAD_INTERVAL,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+) -> None:
+    """Serve the exported files of a directory until interrupted.
+
+    Args:
+        directory: directory the files are exported to.
+        host: address to listen on.
+        port: port to listen on.
+        reload_interval: seconds between checks for newly exported files.
+        read_timeout: seconds to wait for the next request of a
+            connection before closing it.
+    """
+    server = ReleaseServer(directory, reload_interval, read_timeout)
+    with suppress(KeyboardInterrupt):
+        asyncio.run(server.serve_forever(host, port))
@@ -3,12 +3,35 @@
 @maintainer: Gilles Vink
 """
 
-from datetime import datetime, timezone
+from datetime import UTC, datetime
 from unittest.mock import MagicMock, patch
 
 import pytest
 from requests import Response
 
+from nukeversionparser.datamodel.nuke_data import (
+    NukeInstaller,
+    NukeRelease,
+    SemanticVersion,
+)
+from nukeversionparser.metrics import REGISTRY
+
+AS_OF = datetime(2024, 1, 1, tzinfo=UTC)
+"""Moment the supported state of the test releases is evaluated at."""
+SUPPORTED_DATE = "Wed, 15 Nov 2023 15:08:31 GMT"
+"""Release date that is still supported at `AS_OF`."""
+UNSUPPORTED_DATE = "Wed, 15 Nov 2017 15:08:31 GMT"
+"""Release date that is no longer supported at `AS_OF`."""
+
+
+def create_release(
+    version: str, date: str = SUPPORTED_DATE, **urls: str
+) -> NukeRelease:
+    """Return a release of the version, date and installer urls."""
+    return NukeRelease(
+        SemanticVersion.parse(version), NukeInstaller(**urls), date
+    )
+
 
 @pytest.fixture(autouse=True)
 def _requests_mock() -> None:
@@ -21,17 +44,27 @@ def _requests_mock() -> None:
         "nukeversionparser.parser.parse_data.requests.head",
         return_value=response_mock,
     )
+    session_patch = patch(
+        "requests.Session.head",
+        return_value=response_mock,
+    )
 
-    with requests_patch:
+    with requests_patch, session_patch:
         yield
 
 
 @pytest.fixture(autouse=True)
 def _current_time_mock() -> None:
     """Make sure the tests run in the same time each time."""
-    current_date = datetime(2020, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+    current_date = datetime(2020, 1, 1, 0, 0, 0, tzinfo=UTC)
     with patch(
         "nukeversionparser.datamodel.nuke_data.datetime", wraps=datetime
     ) as time_mock:
         time_mock.now.return_value = current_date
         yield
+
+
+@pytest.fixture(autouse=True)
+def _metrics_reset() -> None:
+    """Make sure every test starts without recorded metrics."""
+    REGISTRY.reset()
@@ -4,8 +4,18 @@
 """
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from unittest.mock import MagicMock, patch
+import copy
+import pickle
+from dataclasses import (
+    FrozenInstanceError,
+    asdict,
+    astuple,
+    fields,
+    replace,
+)
+from datetime import UTC, datetime
+from email.utils import parsedate_to_datetime
+from unittest.mock import MagicMock, call, patch
 
 import pytest
 
@@ -54,6 +64,101 @@ class TestSemanticVersion:
         assert (SemanticVersion(1, 0, 1) < SemanticVersion(1, 0, 1)) == False
         assert (SemanticVersion(1, 0, 1) > SemanticVersion(1, 0, 1)) == False
 
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("test_string", "expected_version"),
+        [
+            ("15.0v2", SemanticVersion(15, 0, 2)),
+            ("9.10v11", SemanticVersion(9, 10, 11)),
+        ],
+    )
+    def test_parse(
+        test_string: str, expected_version: SemanticVersion
+    ) -> None:
+        """Test to parse the string format back into a SemanticVersion."""
+        assert SemanticVersion.parse(test_string) == expected_version
+
+    @staticmethod
+    @pytest.mark.parametrize("test_string", ["15.0", "15.0v2b", "v2", ""])
+    def test_parse_invalid(test_string: str) -> None:
+        """Test to raise a ValueError when the string is not a version."""
+        with pytest.raises(ValueError, match="Invalid version string"):
+            SemanticVersion.parse(test_string)
+
+    @staticmethod
+    def test_parse_is_cached() -> None:
+        """Test to return the same object when parsing a version again."""
+        assert SemanticVersion.parse("15.0v2") is SemanticVersion.parse(
+            "15.0v2"
+        )
+
+    @staticmethod
+    def test_is_immutable() -> None:
+        """Test to raise when changing a version."""
+        version = SemanticVersion(15, 0, 2)
+
+        with pytest.raises(FrozenInstanceError):
+            version.patch = 3  # type: ignore[misc]
+
+    @staticmethod
+    def test_is_hashable() -> None:
+        """Test to use equal versions as the same dict key."""
+        versions = {SemanticVersion(15, 0, 2): "first"}
+        versions[SemanticVersion(15, 0, 2)] = "second"
+
+        assert versions == {SemanticVersion(15, 0, 2): "second"}
+
+    @staticmethod
+    def test_total_ordering() -> None:
+        """Test to sort versions and compare them inclusively."""
+        versions = [
+            SemanticVersion(15, 1, 1),
+            SemanticVersion(9, 0, 10),
+            SemanticVersion(15, 0, 2),
+        ]
+
+        assert sorted(versions) == [versions[1], versions[2], versions[0]]
+        assert SemanticVersion(15, 0, 2) >= SemanticVersion(15, 0, 2)
+        assert SemanticVersion(15, 0, 2) <= SemanticVersion(15, 0, 3)
+        assert SemanticVersion(15, 0, 2) != "15.0v2"
+
+    @staticmethod
+    def test_derivation_helpers() -> None:
+        """Test to derive other versions without changing the original."""
+        version = SemanticVersion(15, 1, 4)
+
+        assert version.with_patch(1) == SemanticVersion(15, 1, 1)
+        assert version.next_patch() == SemanticVersion(15, 1, 5)
+        assert version.next_minor() == SemanticVersion(15, 2, 1)
+        assert version.next_major() == SemanticVersion(16, 0, 1)
+        assert version == SemanticVersion(15, 1, 4)
+
+    @staticmethod
+    def test_copy_returns_same_object() -> None:
+        """Test to share the version when copying, as it is immutable."""
+        version = SemanticVersion(15, 0, 2)
+
+        assert copy.deepcopy(version) is version
+
+    @staticmethod
+    def test_fields_exclude_key() -> None:
+        """Test to only convert the version numbers of the version."""
+        version = SemanticVersion(15, 0, 2)
+
+        assert astuple(version) == (15, 0, 2)
+        assert asdict(version) == {"major": 15, "minor": 0, "patch": 2}
+        assert replace(version, patch=3) == SemanticVersion(15, 0, 3)
+
+    @staticmethod
+    def test_pickle() -> None:
+        """Test to recreate an equal version when unpickled."""
+        version = SemanticVersion(15, 0, 2)
+
+        unpickled_version = pickle.loads(pickle.dumps(version))
+
+        assert unpickled_version == version
+        assert hash(unpickled_version) == hash(version)
+
     @staticmethod
     def test_size_comparison_with_invalid_object() -> None:
         """Test to raise a TypeError when compared to an invalid object."""
@@ -97,6 +202,17 @@ class TestNukeRelease:
 
         assert converted_result == expected_dict
 
+    @staticmethod
+    def test_from_dict() -> None:
+        """Test to restore a release from the to_dict format."""
+        test_release = NukeRelease(
+            version=SemanticVersion(15, 0, 2),
+            installer=NukeInstaller(linux_x86_64="some url"),
+            date="Wed, 15 Nov 2023 15:08:31 GMT",
+        )
+
+        assert NukeRelease.from_dict(test_release.to_dict()) == test_release
+
     @staticmethod
     @pytest.mark.parametrize(
         ("test_date", "expected_supported"),
@@ -118,7 +234,7 @@ class TestNukeRelease:
         Note:
             This test expects this day is 01/01/2020 (pre corona D:)
         """
-        test_current_date = datetime(2020, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+        test_current_date = datetime(2020, 1, 1, 0, 0, 0, tzinfo=UTC)
         test_release = NukeRelease(
             version=None, installer=None, date=test_date
         )
@@ -128,6 +244,71 @@ class TestNukeRelease:
             datetime_mock.now.return_value = test_current_date
             assert test_release.get_supported() == expected_supported
 
+    @staticmethod
+    def test_supported_as_of() -> None:
+        """Test to evaluate the supported state at the provided moment."""
+        test_release = NukeRelease(
+            version=None, installer=None, date="Tue, 31 Dec 2019 00:00:00 GMT"
+        )
+
+        assert test_release.get_supported(
+            datetime(2020, 1, 1, tzinfo=UTC)
+        )
+        assert not test_release.get_supported(
+            datetime(2030, 1, 1, tzinfo=UTC)
+        )
+
+    @staticmethod
+    def test_released_is_parsed_once() -> None:
+        """Test to parse the date once, and again only when it changed."""
+        first_date = "Tue, 31 Dec 2019 00:00:00 GMT"
+        changed_date = "Wed, 15 Nov 2023 15:08:31 GMT"
+        test_release = NukeRelease(
+            version=None, installer=None, date=first_date
+        )
+
+        with patch(
+            "nukeversionparser.datamodel.nuke_data.parsedate_to_datetime",
+            wraps=parsedate_to_datetime,
+        ) as parse_mock:
+            assert test_release.released == datetime(
+                2019, 12, 31, tzinfo=UTC
+            )
+            assert test_release.released.tzinfo is not None
+            test_release.date = changed_date
+            assert test_release.released == datetime(
+                2023, 11, 15, 15, 8, 31, tzinfo=UTC
+            )
+
+        assert parse_mock.call_args_list == [
+            call(first_date),
+            call(changed_date),
+        ]
+
+    @staticmethod
+    def test_fields_exclude_parsed_date() -> None:
+        """Test to keep the parsed date out of the release fields."""
+        first_date = "Tue, 31 Dec 2019 00:00:00 GMT"
+        changed_date = "Wed, 15 Nov 2023 15:08:31 GMT"
+        test_release = NukeRelease(
+            version=None, installer=None, date=first_date
+        )
+
+        assert test_release.released == datetime(2019, 12, 31, tzinfo=UTC)
+        assert [field.name for field in fields(NukeRelease)] == [
+            "version",
+            "installer",
+            "date",
+        ]
+        assert asdict(test_release) == {
+            "version": None,
+            "installer": None,
+            "date": first_date,
+        }
+        assert replace(test_release, date=changed_date).released == (
+            datetime(2023, 11, 15, 15, 8, 31, tzinfo=UTC)
+        )
+
     @staticmethod
     def test_supported_with_no_date_set() -> None:
         """Test to raise a ValueError if no date is set."""
@@ -211,3 +392,22 @@ class TestNukeFamily:
 
         assert test_family.to_dict() == {15: {"15.0v1": {"some": "data"}}}
         test_release.to_dict.assert_called_once()
+
+    def test_from_dict(self) -> None:
+        """Test to restore a family from the to_dict format."""
+        test_family = NukeFamily(
+            [
+                NukeRelease(
+                    version=SemanticVersion(15, 1, 1),
+                    installer=NukeInstaller(mac_arm="some url"),
+                    date="Wed, 15 Nov 2023 15:08:31 GMT",
+                ),
+                NukeRelease(
+                    version=SemanticVersion(15, 0, 1),
+                    installer=NukeInstaller(),
+                    date="Tue, 14 Nov 2023 15:08:31 GMT",
+                ),
+            ]
+        )
+
+        assert NukeFamily.from_dict(test_family.to_dict()) == test_family
@@ -0,0 +1,199 @@
+"""Tests related to the binary index script.
+
+@maintainer: Gilles Vink
+"""
+
+import struct
+from pathlib import Path
+
+import pytest
+
+from nukeversionparser.datamodel.nuke_data import (
+    NukeFamily,
+    SemanticVersion,
+)
+from nukeversionparser.exporter.binary_index import (
+    FORMAT_VERSION,
+    BinaryIndexError,
+    BinaryIndexReader,
+    create_binary_index,
+)
+from tests.conftest import SUPPORTED_DATE, create_release
+
+_TEST_FAMILIES = [
+    NukeFamily(
+        [
+            create_release("15.1v1", linux_x86_64="15.1v1 linux"),
+            create_release(
+                "15.0v2", linux_x86_64="15.0v2 linux", mac_arm="15.0v2 arm"
+            ),
+            create_release("15.0v1", linux_x86_64="15.0v1 linux"),
+        ]
+    ),
+    NukeFamily(
+        [
+            create_release("9.1v1", windows_x86_64="9.1v1 windows"),
+            create_release("9.0v1", windows_x86_64="9.0v1 windows"),
+        ]
+    ),
+]
+
+
+@pytest.fixture
+def reader(tmp_path: Path) -> BinaryIndexReader:
+    """Return a reader of the index of the test families."""
+    index_path = tmp_path / "test.idx"
+    index_path.write_bytes(create_binary_index(_TEST_FAMILIES))
+    with BinaryIndexReader(index_path) as index_reader:
+        yield index_reader
+
+
+def test_create_binary_index_is_deterministic() -> None:
+    """Test to create the same bytes regardless of the family order."""
+    assert create_binary_index(_TEST_FAMILIES) == create_binary_index(
+        list(reversed(_TEST_FAMILIES))
+    )
+
+
+def test_create_binary_index_interns_strings() -> None:
+    """Test to store every string only once."""
+    index = create_binary_index(_TEST_FAMILIES)
+
+    assert index.count(SUPPORTED_DATE.encode()) == 1
+
+
+class TestBinaryIndexReader:
+    """Tests related to the BinaryIndexReader object."""
+
+    @staticmethod
+    def test_families(reader: BinaryIndexReader) -> None:
+        """Test to read the amount of releases and the families."""
+        assert len(reader) == sum(
+            len(family.releases) for family in _TEST_FAMILIES
+        )
+        assert reader.family_versions == [9, 15]
+
+    @staticmethod
+    def test_find(reader: BinaryIndexReader) -> None:
+        """Test to restore every release by its version."""
+        for family in _TEST_FAMILIES:
+            for release in family.releases:
+                assert reader.find(release.version) == release
+
+    @staticmethod
+    def test_find_missing(reader: BinaryIndexReader) -> None:
+        """Test to return None for a version that is not in the index."""
+        assert reader.find(SemanticVersion(15, 0, 3)) is None
+        assert reader.find(SemanticVersion(16, 0, 1)) is None
+        assert reader.find(SemanticVersion(1, 0, 1)) is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("test_filters", "expected_version"),
+        [
+            ({}, "15.1v1"),
+            ({"major": 9}, "9.1v1"),
+            ({"major": 15, "minor": 0}, "15.0v2"),
+            ({"major": 15, "platform": "mac_arm"}, "15.0v2"),
+            ({"platform": "windows_x86_64"}, "9.1v1"),
+            ({"major": 15, "minor": 0, "platform": "linux_x86_64"}, "15.0v2"),
+        ],
+    )
+    def test_latest(
+        reader: BinaryIndexReader,
+        test_filters: dict,
+        expected_version: str,
+    ) -> None:
+        """Test to return the latest release matching the filters."""
+        assert str(reader.latest(**test_filters).version) == expected_version
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "test_filters",
+        [
+            {"major": 16},
+            {"major": 15, "minor": 2},
+            {"major": 9, "platform": "mac_arm"},
+        ],
+    )
+    def test_latest_without_match(
+        reader: BinaryIndexReader, test_filters: dict
+    ) -> None:
+        """Test to return None if no release matches the filters."""
+        assert reader.latest(**test_filters) is None
+
+    @staticmethod
+    def test_latest_invalid_filters(reader: BinaryIndexReader) -> None:
+        """Test to raise an exception on filters that can not match."""
+        with pytest.raises(ValueError, match="only be provided with a major"):
+            reader.latest(minor=0)
+        with pytest.raises(ValueError, match="Unknown platform"):
+            reader.latest(platform="amiga")
+
+    @staticmethod
+    def test_empty_index(tmp_path: Path) -> None:
+        """Test to read an index without any release."""
+        index_path = tmp_path / "test.idx"
+        index_path.write_bytes(create_binary_index([]))
+
+        with BinaryIndexReader(index_path) as reader:
+            assert len(reader) == 0
+            assert reader.family_versions == []
+            assert reader.latest() is None
+            assert reader.find(SemanticVersion(15, 0, 1)) is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("test_content", "expected_message"),
+        [
+            (b"", "is empty"),
+            (b"NVPI", "too small"),
+            (b"{}" * 32, "not a binary index"),
+            (
+                struct.pack("<4sHxx", b"NVPI", FORMAT_VERSION + 1)
+                + b"\0" * 24,
+                "only version 1 is supported",
+            ),
+            (
+                create_binary_index(_TEST_FAMILIES)[:-1],
+                "the strings do not fit",
+            ),
+            (
+                create_binary_index(_TEST_FAMILIES)[:64],
+                "the release table does not fit",
+            ),
+            (
+                struct.pack(
+                    "<4sHxxIIIIII", b"NVPI", FORMAT_VERSION, 0, 0, 0, 0, 0, 0
+                ),
+                "the family table does not fit",
+            ),
+            (
+                struct.pack(
+                    "<4sHxxIIIIIIIIII",
+                    b"NVPI",
+                    FORMAT_VERSION,
+                    1,
+                    0,
+                    0,
+                    32,
+                    44,
+                    44,
+                    15,
+                    0,
+                    1,
+                    0,
+                ),
+                "family 0 refers to missing releases",
+            ),
+        ],
+    )
+    def test_invalid_file(
+        tmp_path: Path, test_content: bytes, expected_message: str
+    ) -> None:
+        """Test to raise an exception when the file is not readable."""
+        index_path = tmp_path / "test.idx"
+        index_path.write_bytes(test_content)
+
+        with pytest.raises(BinaryIndexError, match=expected_message):
+            BinaryIndexReader(index_path)
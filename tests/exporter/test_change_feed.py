@@ -0,0 +1,158 @@
+"""Tests related to the change feed script.
+
+@maintainer: Gilles Vink
+"""
+
+from pathlib import Path
+
+import pytest
+
+from nukeversionparser.datamodel.nuke_data import NukeFamily
+from nukeversionparser.exporter import change_feed
+from nukeversionparser.exporter.change_feed import (
+    ChangeType,
+    append_changes,
+    create_snapshot,
+    find_changes,
+    read_changes,
+    read_last_sequence,
+)
+from tests.conftest import AS_OF, UNSUPPORTED_DATE, create_release
+
+
+def test_create_snapshot() -> None:
+    """Test to map every version of the exported data to its data."""
+    test_data = {
+        "15": {"15.0v2": {"supported": True}, "15.0v1": {"supported": True}},
+        "14": {"14.1v1": {"supported": False}},
+    }
+
+    assert create_snapshot(test_data) == {
+        "15.0v2": {"supported": True},
+        "15.0v1": {"supported": True},
+        "14.1v1": {"supported": False},
+    }
+
+
+def test_find_changes() -> None:
+    """Test to find added releases, installers and support flips."""
+    test_families = [
+        NukeFamily(
+            [
+                create_release("15.0v2", linux_x86_64="linux url"),
+                create_release(
+                    "15.0v1", linux_x86_64="linux url", mac_arm="mac url"
+                ),
+            ]
+        ),
+        NukeFamily([create_release("14.0v1", UNSUPPORTED_DATE)]),
+    ]
+    test_snapshot = {
+        "15.0v1": {
+            "installer": {"linux_x86_64": "linux url", "mac_arm": None},
+            "supported": True,
+        },
+        "14.0v1": {"installer": {}, "supported": True},
+    }
+
+    changes = find_changes(test_snapshot, test_families, AS_OF)
+
+    assert [(change["type"], change["version"]) for change in changes] == [
+        (ChangeType.RELEASE_ADDED, "15.0v2"),
+        (ChangeType.INSTALLER_ADDED, "15.0v1"),
+        (ChangeType.SUPPORT_CHANGED, "14.0v1"),
+    ]
+    assert changes[0]["installer"]["linux_x86_64"] == "linux url"
+    assert changes[0]["supported"] is True
+    assert changes[1]["platform"] == "mac_arm"
+    assert changes[1]["url"] == "mac url"
+    assert changes[2]["supported"] is False
+    assert all(change["time"] == AS_OF.isoformat() for change in changes)
+
+
+def test_find_changes_without_changes() -> None:
+    """Test to find nothing when the releases are the same."""
+    test_families = [
+        NukeFamily([create_release("15.0v1", mac_arm="mac url")])
+    ]
+    test_snapshot = create_snapshot(test_families[0].to_dict(AS_OF))
+
+    assert find_changes(test_snapshot, test_families, AS_OF) == []
+
+
+def test_append_and_read_changes(tmp_path: Path) -> None:
+    """Test to number the changes and read them after a sequence."""
+    test_file = tmp_path / "changes.jsonl"
+
+    test_changes = [{"version": "15.0v2"}, {"version": "16"}]
+    last_sequence = 1 + len(test_changes)
+
+    assert append_changes(test_file, [{"version": "15.0v1"}]) == 1
+    assert append_changes(test_file, []) == 1
+    assert append_changes(test_file, test_changes) == last_sequence
+
+    assert read_last_sequence(test_file) == last_sequence
+    assert [change["sequence"] for change in read_changes(test_file)] == [
+        1,
+        2,
+        3,
+    ]
+    assert read_changes(test_file, since=2) == [
+        {"sequence": 3, "version": "16"}
+    ]
+    assert read_changes(test_file, since=3) == []
+    assert test_file.read_text().splitlines()[0] == (
+        '{"sequence":1,"version":"15.0v1"}'
+    )
+
+
+def test_read_changes_ignores_incomplete_line(tmp_path: Path) -> None:
+    """Test to skip a last change that is still being written."""
+    test_file = tmp_path / "changes.jsonl"
+    append_changes(test_file, [{"version": "15.0v1"}])
+    with test_file.open("a") as file:
+        file.write('{"sequence":2,')
+
+    assert read_changes(test_file) == [{"sequence": 1, "version": "15.0v1"}]
+
+
+@pytest.mark.parametrize("test_chunk_size", [16, 4096])
+def test_append_changes_after_incomplete_line(
+    tmp_path: Path, test_chunk_size: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test to continue the feed after a run was killed while appending."""
+    monkeypatch.setattr(change_feed, "_TAIL_CHUNK_SIZE", test_chunk_size)
+    test_file = tmp_path / "changes.jsonl"
+    append_changes(test_file, [{"version": "15.0v1"}])
+    with test_file.open("a") as file:
+        file.write('{"sequence":2,"version":"15.0')
+
+    assert read_last_sequence(test_file) == 1
+    last_sequence = append_changes(test_file, [{"version": "15.0v2"}])
+
+    assert read_last_sequence(test_file) == last_sequence
+    assert read_changes(test_file) == [
+        {"sequence": 1, "version": "15.0v1"},
+        {"sequence": 2, "version": "15.0v2"},
+    ]
+
+
+def test_read_changes_missing_file(tmp_path: Path) -> None:
+    """Test to return no changes if there is no feed yet."""
+    assert read_changes(tmp_path / "changes.jsonl") == []
+    assert read_last_sequence(tmp_path / "changes.jsonl") == 0
+
+
+@pytest.mark.parametrize("test_changes", [1, 50])
+def test_read_last_sequence_reads_from_end(
+    tmp_path: Path, test_changes: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test to find the last sequence when it spans several chunks."""
+    monkeypatch.setattr(change_feed, "_TAIL_CHUNK_SIZE", 16)
+    test_file = tmp_path / "changes.jsonl"
+    append_changes(
+        test_file,
+        [{"version": f"15.0v{patch}"} for patch in range(test_changes)],
+    )
+
+    assert read_last_sequence(test_file) == test_changes
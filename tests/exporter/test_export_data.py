@@ -4,28 +4,50 @@
 """
 
 
-import copy
+import gzip
 import json
+from datetime import UTC, datetime
 from pathlib import Path
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, call, patch
 
 import pytest
 
 from nukeversionparser.datamodel.nuke_data import (
     NukeFamily,
+    NukeInstaller,
     NukeRelease,
     SemanticVersion,
 )
+from nukeversionparser.exporter.change_feed import (
+    CHANGES_FILE,
+    read_changes,
+)
 from nukeversionparser.exporter.export_data import (
-    _convert_data_to_json,
-    _create_all_json,
-    _create_all_supported_json,
-    _create_minor_json,
-    _create_minor_supported_json,
-    _reduce_to_only_minor_releases,
-    _reduce_to_only_supported,
+    VIEW_FILES,
+    ExportOptions,
+    _get_variant_paths,
+    _JsonObjectWriter,
+    _read_families_from_file,
     _sort_families,
-    _write_json_to_file,
+    _write_views,
+    collect_and_write_json_files,
+)
+from nukeversionparser.exporter.manifest import (
+    MANIFEST_FILE,
+    FileDigest,
+    read_manifest,
+)
+from nukeversionparser.files import get_file_sha256
+from nukeversionparser.metrics import BYTES_WRITTEN
+from nukeversionparser.parser.bucket_listing import DiscoveryBackend
+from nukeversionparser.parser.parse_data import ScanOptions
+from nukeversionparser.parser.probe_cache import ProbeCache
+from nukeversionparser.parser.retry import UnknownProbes
+from tests.conftest import (
+    AS_OF,
+    SUPPORTED_DATE,
+    UNSUPPORTED_DATE,
+    create_release,
 )
 
 
@@ -97,189 +119,521 @@ def test__sort_releases() -> None:
     assert test_unsorted_list == expected_list
 
 
-def test__reduce_to_only_minor_releases() -> None:
-    """Test convert to only contain minor releases.
+def _get_view_versions(file_path: Path) -> dict[str, list[str]]:
+    """Return the versions of every family in the written view."""
+    return {
+        family_version: list(releases)
+        for family_version, releases in json.loads(
+            file_path.read_text()
+        ).items()
+    }
 
-    This will contain latest of patch of latest minor.
-    """
+
+def test__write_views(tmp_path: Path) -> None:
+    """Test to derive every view from the sorted families."""
     test_families = [
         NukeFamily(
             [
-                NukeRelease(
-                    SemanticVersion(9, 0, 1), installer=None, date=None
-                ),
-                NukeRelease(
-                    SemanticVersion(9, 0, 2), installer=None, date=None
-                ),
-                NukeRelease(
-                    SemanticVersion(9, 0, 3), installer=None, date=None
-                ),
-                NukeRelease(
-                    SemanticVersion(9, 1, 1), installer=None, date=None
-                ),
+                create_release("15.1v1", SUPPORTED_DATE),
+                create_release("15.0v3", SUPPORTED_DATE),
+                create_release("15.0v2", UNSUPPORTED_DATE),
+                create_release("15.0v1", UNSUPPORTED_DATE),
             ]
         ),
         NukeFamily(
             [
-                NukeRelease(
-                    SemanticVersion(10, 1, 3), installer=None, date=None
-                ),
+                create_release("9.1v1", UNSUPPORTED_DATE),
+                create_release("9.0v2", UNSUPPORTED_DATE),
             ]
         ),
     ]
-    expected_families = [
+
+    _write_views(test_families, tmp_path, AS_OF)
+
+    assert {
+        file_path.name: _get_view_versions(file_path)
+        for file_path in tmp_path.glob("*-releases.json")
+    } == {
+        "nuke-minor-releases.json": {
+            "15": ["15.1v1", "15.0v3"],
+            "9": ["9.1v1", "9.0v2"],
+        },
+        "nuke-all-releases.json": {
+            "15": ["15.1v1", "15.0v3", "15.0v2", "15.0v1"],
+            "9": ["9.1v1", "9.0v2"],
+        },
+        "nuke-minor-supported-releases.json": {"15": ["15.1v1", "15.0v3"]},
+        "nuke-all-supported-releases.json": {"15": ["15.1v1", "15.0v3"]},
+    }
+
+
+def test__write_views_latest_patch_of_minor(tmp_path: Path) -> None:
+    """Test to keep the latest patch of every minor, in order of minors.
+
+    The latest patch is used even when an older patch is listed first,
+    and it is left out of the supported view when it is unsupported.
+    """
+    test_families = [
         NukeFamily(
             [
-                NukeRelease(
-                    SemanticVersion(9, 0, 3), installer=None, date=None
-                ),
-                NukeRelease(
-                    SemanticVersion(9, 1, 1), installer=None, date=None
-                ),
+                create_release("14.0v1", SUPPORTED_DATE),
+                create_release("14.1v1", SUPPORTED_DATE),
+                create_release("14.0v2", UNSUPPORTED_DATE),
             ]
-        ),
-        NukeFamily(
-            [
-                NukeRelease(
-                    SemanticVersion(10, 1, 3), installer=None, date=None
-                ),
-            ]
-        ),
+        )
     ]
 
-    _reduce_to_only_minor_releases(test_families)
-    assert test_families == expected_families
+    _write_views(test_families, tmp_path, AS_OF)
+
+    assert _get_view_versions(tmp_path / "nuke-minor-releases.json") == {
+        "14": ["14.0v2", "14.1v1"]
+    }
+    assert _get_view_versions(
+        tmp_path / "nuke-minor-supported-releases.json"
+    ) == {"14": ["14.1v1"]}
 
 
-def test__reduce_to_only_supported() -> None:
-    """Test to keep only the supported releases in the provided list."""
-    mock_release = MagicMock(
-        spec=NukeRelease, version=SemanticVersion(1, 0, 1)
+def test__write_views_format(tmp_path: Path) -> None:
+    """Test to write the views formatted like `json.dumps` does."""
+    releases = [
+        create_release("15.0v2", SUPPORTED_DATE),
+        create_release("14.0v1", UNSUPPORTED_DATE),
+    ]
+    test_families = [NukeFamily([release]) for release in releases]
+
+    _write_views(test_families, tmp_path, AS_OF)
+
+    assert (tmp_path / "nuke-all-releases.json").read_text() == json.dumps(
+        {
+            15: releases[0].to_dict(AS_OF),
+            14: releases[1].to_dict(AS_OF),
+        },
+        indent=4,
     )
-    mock_release.get_supported.return_value = True
+    assert (
+        tmp_path / "nuke-all-supported-releases.json"
+    ).read_text() == json.dumps({15: releases[0].to_dict(AS_OF)}, indent=4)
+
+
+def test__write_views_variants(tmp_path: Path) -> None:
+    """Test to write a minified and compressed variant of every view."""
+    releases = [
+        create_release("15.0v2", SUPPORTED_DATE),
+        create_release("14.0v1", UNSUPPORTED_DATE),
+    ]
+    test_families = [NukeFamily([release]) for release in releases]
+
+    exported_files = _write_views(test_families, tmp_path, AS_OF)
+
+    assert sorted(exported_files) == sorted(
+        variant_path.name
+        for view_file in VIEW_FILES
+        for variant_path in _get_variant_paths(tmp_path / view_file)
+    )
+    assert sorted(exported_files) == sorted(
+        file_path.name for file_path in tmp_path.iterdir()
+    )
+    formatted = (tmp_path / "nuke-all-releases.json").read_text()
+    minified = (tmp_path / "nuke-all-releases.min.json").read_text()
+    assert minified == json.dumps(
+        json.loads(formatted), separators=(",", ":")
+    )
+    assert gzip.decompress(
+        (tmp_path / "nuke-all-releases.json.gz").read_bytes()
+    ) == formatted.encode()
+    assert gzip.decompress(
+        (tmp_path / "nuke-all-releases.min.json.gz").read_bytes()
+    ) == minified.encode()
+
+
+def test__write_views_deterministic_gzip(tmp_path: Path) -> None:
+    """Test to compress the same content into the same bytes."""
+    test_families = [NukeFamily([create_release("15.0v2", SUPPORTED_DATE)])]
+    first_directory = tmp_path / "first"
+    second_directory = tmp_path / "second"
+    first_directory.mkdir()
+    second_directory.mkdir()
+
+    _write_views(test_families, first_directory, AS_OF)
+    with patch("gzip.time.time", return_value=1e9):
+        _write_views(test_families, second_directory, AS_OF)
 
-    supported_release = copy.deepcopy(mock_release)
-    unsupported_release = copy.deepcopy(mock_release)
-    unsupported_release.get_supported.return_value = False
+    for file_path in first_directory.glob("*.gz"):
+        assert (
+            file_path.read_bytes()
+            == (second_directory / file_path.name).read_bytes()
+        )
+
+
+def test__write_views_without_families(tmp_path: Path) -> None:
+    """Test to write an empty object to every view."""
+    _write_views([], tmp_path, AS_OF)
+
+    assert [
+        file_path.read_text() for file_path in tmp_path.glob("*.json")
+    ] == ["{}"] * 8
+
+
+def test__write_views_metrics(tmp_path: Path) -> None:
+    """Test to record the size of every written file."""
+    _write_views([], tmp_path, AS_OF)
+
+    assert BYTES_WRITTEN.to_dict()["samples"] == [
+        {"labels": {"file": file_path.name}, "value": file_path.stat().st_size}
+        for file_path in sorted(tmp_path.iterdir())
+    ]
+
+
+def test__write_views_metrics_unchanged(tmp_path: Path) -> None:
+    """Test to record no size of files that have not been replaced."""
+    _write_views([], tmp_path, AS_OF)
+    BYTES_WRITTEN.reset()
+
+    _write_views([], tmp_path, AS_OF)
+
+    assert BYTES_WRITTEN.to_dict()["samples"] == []
+
+
+class TestJsonObjectWriter:
+    """Tests related to the _JsonObjectWriter object."""
+
+    @staticmethod
+    def test_writes_atomically(tmp_path: Path) -> None:
+        """Test to keep the previous file until the object is complete."""
+        test_file = tmp_path / "test.json"
+        test_file.write_text("previous")
+
+        with _JsonObjectWriter(test_file) as writer:
+            writer.write_member("15", {"15.0v1": {}})
+            assert test_file.read_text() == "previous"
+
+        assert json.loads(test_file.read_text()) == {"15": {"15.0v1": {}}}
+        assert sorted(file_path.name for file_path in tmp_path.iterdir()) == [
+            "test.json",
+            "test.json.gz",
+            "test.min.json",
+            "test.min.json.gz",
+        ]
+
+    @staticmethod
+    def test_keeps_previous_file_on_error(tmp_path: Path) -> None:
+        """Test to remove the temporary files when writing fails."""
+        test_file = tmp_path / "test.json"
+        test_file.write_text("previous")
+
+        with pytest.raises(TypeError), _JsonObjectWriter(test_file) as writer:
+            writer.write_member("15", object())
+
+        assert test_file.read_text() == "previous"
+        assert list(tmp_path.iterdir()) == [test_file]
+
+    @staticmethod
+    def test_uses_manifest(tmp_path: Path) -> None:
+        """Test to pass the digest of every variant to its file."""
+        test_digest = FileDigest(sha256="abc", size=2, modified="any")
+
+        with patch(
+            "nukeversionparser.exporter.export_data.ExportedFile"
+        ) as exported_file_mock:
+            _JsonObjectWriter(
+                tmp_path / "test.json", {"test.min.json.gz": test_digest}
+            )
+
+        assert exported_file_mock.call_args_list == [
+            call(tmp_path / "test.json", None),
+            call(tmp_path / "test.json.gz", None),
+            call(tmp_path / "test.min.json", None),
+            call(tmp_path / "test.min.json.gz", test_digest),
+        ]
+
+    @staticmethod
+    def test_raises_without_json_suffix() -> None:
+        """Test to raise an exception when the path is not a JSON file."""
+        with pytest.raises(
+            ValueError, match=r"Provided path does not end with \.json"
+        ):
+            _JsonObjectWriter(Path("something.txt"))
+
+
+def test__read_families_from_file(tmp_path: Path) -> None:
+    """Test to read back the families of an exported JSON file."""
     test_families = [
-        NukeFamily([supported_release, unsupported_release]),
         NukeFamily(
             [
-                unsupported_release,
+                NukeRelease(
+                    SemanticVersion(15, 0, 1),
+                    installer=NukeInstaller(linux_x86_64="some url"),
+                    date="Wed, 15 Nov 2023 15:08:31 GMT",
+                )
             ]
         ),
-    ]
-    expected_result = [
         NukeFamily(
             [
-                supported_release,
+                NukeRelease(
+                    SemanticVersion(14, 1, 2),
+                    installer=NukeInstaller(),
+                    date="Tue, 14 Nov 2023 15:08:31 GMT",
+                )
             ]
         ),
     ]
-
-    _reduce_to_only_supported(test_families)
-
-    assert test_families == expected_result
+    test_file = tmp_path / "nuke-all-releases.json"
+    _write_views(test_families, tmp_path)
+
+    assert _read_families_from_file(test_file) == test_families
+
+
+@pytest.mark.parametrize("previous_data_exists", [True, False])
+def test_collect_and_write_json_files_incremental(
+    tmp_path: Path, previous_data_exists: bool
+) -> None:
+    """Test to pass the previously written families to the collector."""
+    previous_file = tmp_path / "nuke-all-releases.json"
+    if previous_data_exists:
+        previous_file.write_text("{}")
+
+    with patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        return_value=[],
+    ) as collect_families_mock:
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(incremental=True)
+        )
+
+    collect_families_mock.assert_called_once_with(
+        session=ANY,
+        known_families=[] if previous_data_exists else None,
+        options=ScanOptions(),
+        backend=DiscoveryBackend.PROBING,
+    )
+    assert previous_file.read_text() == "{}"
 
 
-def test__convert_data_to_json() -> None:
-    """Test to convert a list of NukeFamily to a JSON string."""
-    first_nuke_family_mock = MagicMock(spec=NukeFamily)
-    first_nuke_family_mock.to_dict.return_value = {"15": "first_data"}
-    second_nuke_family_mock = MagicMock(spec=NukeFamily)
-    second_nuke_family_mock.to_dict.return_value = {"16": "second_data"}
-    test_families = [first_nuke_family_mock, second_nuke_family_mock]
+def test_collect_and_write_json_files_saves_cache(tmp_path: Path) -> None:
+    """Test to save the probe cache, also when collecting failed."""
+    cache_dir = tmp_path / "cache"
 
-    converted_data = _convert_data_to_json(test_families)
+    with patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        side_effect=TimeoutError,
+    ), patch(
+        "nukeversionparser.exporter.export_data.create_session",
+    ) as create_session_mock:
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(cache_dir=cache_dir)
+        )
 
-    assert converted_data == json.dumps(
-        {"15": "first_data", "16": "second_data"}, indent=4
-    )
+    assert isinstance(create_session_mock.call_args.args[1], ProbeCache)
+    assert (cache_dir / "probe-cache.json").is_file()
 
 
-def test__write_json_to_file(tmp_path: Path) -> None:
-    """Test to write provided string to a file."""
-    test_string = "my multiline \n string"
-    test_file = tmp_path / "my_file.json"
+def test_collect_and_write_json_files_unknown_probes(tmp_path: Path) -> None:
+    """Test to write nothing when probes are unknown after the second pass."""
+    unknown_probes = UnknownProbes()
+    unknown_probes.add("url")
+    test_families = [
+        NukeFamily(
+            [
+                NukeRelease(
+                    SemanticVersion(15, 0, 1),
+                    NukeInstaller(),
+                    "Wed, 15 Nov 2023 15:08:31 GMT",
+                )
+            ]
+        )
+    ]
 
-    _write_json_to_file(json_data=test_string, file_path=test_file)
+    with patch(
+        "nukeversionparser.exporter.export_data.UnknownProbes",
+        return_value=unknown_probes,
+    ), patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        return_value=test_families,
+    ), patch(
+        "nukeversionparser.exporter.export_data.reprobe_unknown_installers",
+        side_effect=lambda families, *_, **__: families,
+    ):
+        collect_and_write_json_files(tmp_path)
 
-    assert test_file.read_text() == test_string
+    assert not list(tmp_path.iterdir())
 
 
-def test__write_json_to_file_to_raise_exception() -> None:
-    """Test to raise an exception when the filepath is not a JSON file."""
-    test_file = Path("something.txt")
+def test_collect_and_write_json_files_as_of(tmp_path: Path) -> None:
+    """Test to evaluate the supported state of every file at one moment."""
+    as_of = datetime(2024, 1, 1, tzinfo=UTC)
+    test_families = [
+        NukeFamily(
+            [
+                NukeRelease(
+                    SemanticVersion(15, 0, 1),
+                    NukeInstaller(),
+                    "Wed, 15 Nov 2023 15:08:31 GMT",
+                ),
+                NukeRelease(
+                    SemanticVersion(15, 0, 2),
+                    NukeInstaller(),
+                    "Wed, 15 Nov 2023 15:08:31 GMT",
+                ),
+            ]
+        )
+    ]
 
-    with pytest.raises(
-        ValueError, match="Provided path does not end with .json"
+    with patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        return_value=test_families,
+    ), patch(
+        "nukeversionparser.exporter.export_data.datetime"
+    ) as datetime_mock:
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=as_of)
+        )
+
+    datetime_mock.now.assert_not_called()
+    for file_name in (
+        "nuke-all-supported-releases.json",
+        "nuke-minor-supported-releases.json",
     ):
-        _write_json_to_file(json_data=None, file_path=test_file)
-
+        data = json.loads((tmp_path / file_name).read_text())
+        assert data["15"]["15.0v2"]["supported"] is True
 
-class TestDataCollectionAndReturning:
-    """These tests simply exist for checking if implementation stays the same.
 
-    All functions called within here have already been tested, so we only need
-    to check if they have been called properly.
-    """
-
-    @staticmethod
-    def test__create_all_json() -> None:
-        """Test the creation of the all json data."""
-        test_families = [MagicMock(spec=NukeFamily)]
-        with patch(
-            "nukeversionparser.exporter.export_data._convert_data_to_json"
-        ) as convert_to_json_mock:
-            result_data = _create_all_json(test_families)
+def test_collect_and_write_json_files_manifest(tmp_path: Path) -> None:
+    """Test to only touch the files and the manifest when data changed."""
+    first_run = datetime(2024, 1, 1, tzinfo=UTC)
+    second_run = datetime(2024, 1, 2, tzinfo=UTC)
+    test_families = [
+        NukeFamily(
+            [
+                NukeRelease(
+                    SemanticVersion(15, 0, 1),
+                    NukeInstaller(),
+                    "Wed, 15 Nov 2023 15:08:31 GMT",
+                )
+            ]
+        )
+    ]
 
-        assert test_families is not result_data
-        convert_to_json_mock.assert_called_once()
+    with patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        return_value=test_families,
+    ):
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=first_run)
+        )
+        first_stats = {
+            path.name: path.stat().st_mtime_ns for path in tmp_path.iterdir()
+        }
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=first_run)
+        )
+
+    assert {
+        path.name: path.stat().st_mtime_ns for path in tmp_path.iterdir()
+    } == first_stats
+    manifest = read_manifest(tmp_path)
+    assert set(manifest) == set(first_stats) - {MANIFEST_FILE}
+    for file_name, digest in manifest.items():
+        assert digest.sha256 == get_file_sha256(tmp_path / file_name)
+        assert digest.modified == first_run.isoformat()
+
+    test_families[0].releases.append(
+        NukeRelease(
+            SemanticVersion(15, 0, 0),
+            NukeInstaller(),
+            "Wed, 15 Nov 2023 15:08:31 GMT",
+        )
+    )
+    with patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        return_value=test_families,
+    ):
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=second_run)
+        )
 
-    @staticmethod
-    def test__create_all_supported_json() -> None:
-        """Test the creation of the all supported json data."""
-        test_families = [MagicMock(spec=NukeFamily)]
-        with patch(
-            "nukeversionparser.exporter.export_data._convert_data_to_json"
-        ) as convert_to_json_mock, patch(
-            "nukeversionparser.exporter.export_data._reduce_to_only_supported"
-        ) as reduce_mock:
-            result_data = _create_all_supported_json(test_families)
+    manifest = read_manifest(tmp_path)
+    assert manifest["nuke-all-releases.json"].modified == (
+        second_run.isoformat()
+    )
+    assert manifest["nuke-minor-releases.json"] == FileDigest(
+        sha256=get_file_sha256(tmp_path / "nuke-minor-releases.json"),
+        size=(tmp_path / "nuke-minor-releases.json").stat().st_size,
+        modified=first_run.isoformat(),
+    )
 
-        assert test_families is not result_data
-        convert_to_json_mock.assert_called_once()
-        reduce_mock.assert_called_once()
 
-    @staticmethod
-    def test__create_minor_json() -> None:
-        """Test the creation of the minor releases json data."""
-        test_families = [MagicMock(spec=NukeFamily)]
-        with patch(
-            "nukeversionparser.exporter.export_data._convert_data_to_json"
-        ) as convert_to_json_mock, patch(
-            "nukeversionparser.exporter.export_data._reduce_to_only_minor_releases"
-        ) as convert_to_minor_mock:
-            result_data = _create_minor_json(test_families)
+def test_collect_and_write_json_files_change_feed(tmp_path: Path) -> None:
+    """Test to record the changes compared to the previous releases."""
+    test_families = [
+        NukeFamily(
+            [
+                NukeRelease(
+                    SemanticVersion(15, 0, 1),
+                    NukeInstaller(),
+                    "Wed, 15 Nov 2023 15:08:31 GMT",
+                )
+            ]
+        )
+    ]
 
-        assert test_families is not result_data
-        convert_to_json_mock.assert_called_once()
-        convert_to_minor_mock.assert_called_once()
+    with patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        return_value=test_families,
+    ):
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=AS_OF)
+        )
+        assert not (tmp_path / CHANGES_FILE).exists()
+
+        test_families[0].releases.append(
+            NukeRelease(
+                SemanticVersion(15, 0, 2),
+                NukeInstaller(),
+                "Wed, 15 Nov 2023 15:08:31 GMT",
+            )
+        )
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=AS_OF)
+        )
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=AS_OF)
+        )
+
+    changes = read_changes(tmp_path / CHANGES_FILE)
+    assert [
+        (change["sequence"], change["type"], change["version"])
+        for change in changes
+    ] == [(1, "release_added", "15.0v2")]
+
+
+def test_collect_and_write_json_files_change_feed_first(
+    tmp_path: Path,
+) -> None:
+    """Test to append the change feed before the views are replaced."""
+    (tmp_path / "nuke-all-releases.json").write_text("{}")
+    test_families = [
+        NukeFamily(
+            [
+                NukeRelease(
+                    SemanticVersion(15, 0, 1),
+                    NukeInstaller(),
+                    "Wed, 15 Nov 2023 15:08:31 GMT",
+                )
+            ]
+        )
+    ]
 
-    @staticmethod
-    def test__create_minor_supported_json() -> None:
-        """Test the creation of the minor supported releases json data."""
-        test_families = [MagicMock(spec=NukeFamily)]
-        with patch(
-            "nukeversionparser.exporter.export_data._convert_data_to_json"
-        ) as convert_to_json_mock, patch(
-            "nukeversionparser.exporter.export_data._reduce_to_only_supported"
-        ) as reduce_mock, patch(
-            "nukeversionparser.exporter.export_data._reduce_to_only_minor_releases"
-        ) as convert_to_minor_mock:
-            result_data = _create_minor_supported_json(test_families)
-
-        assert test_families is not result_data
-        convert_to_json_mock.assert_called_once()
-        reduce_mock.assert_called_once()
-        convert_to_minor_mock.assert_called_once()
+    with patch(
+        "nukeversionparser.exporter.export_data.collect_families",
+        return_value=test_families,
+    ), patch(
+        "nukeversionparser.exporter.export_data._write_views",
+        side_effect=OSError("No space left on device"),
+    ), pytest.raises(OSError, match="No space left on device"):
+        collect_and_write_json_files(
+            tmp_path, export_options=ExportOptions(as_of=AS_OF)
+        )
+
+    changes = read_changes(tmp_path / CHANGES_FILE)
+    assert [change["version"] for change in changes] == ["15.0v1"]
+    assert not (tmp_path / MANIFEST_FILE).exists()
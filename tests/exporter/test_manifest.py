@@ -0,0 +1,70 @@
+"""Tests related to the manifest script.
+
+@maintainer: Gilles Vink
+"""
+
+import json
+import logging
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pytest
+
+from nukeversionparser.exporter.manifest import (
+    MANIFEST_FILE,
+    FileDigest,
+    read_manifest,
+    write_manifest,
+)
+
+
+def test_read_manifest_missing(tmp_path: Path) -> None:
+    """Test to return an empty manifest if there is none."""
+    assert read_manifest(tmp_path) == {}
+
+
+@pytest.mark.parametrize(
+    "test_content",
+    ["not json", "{}", '{"files": {"test.json": {"sha256": "abc"}}}'],
+)
+def test_read_manifest_invalid(
+    tmp_path: Path, test_content: str, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test to ignore a manifest that can not be read."""
+    (tmp_path / MANIFEST_FILE).write_text(test_content)
+
+    with caplog.at_level(logging.WARNING):
+        assert read_manifest(tmp_path) == {}
+    assert "Ignoring invalid manifest" in caplog.text
+
+
+def test_write_and_read_manifest(tmp_path: Path) -> None:
+    """Test to read back a written manifest."""
+    test_files = {
+        "b.json": FileDigest(sha256="b", size=2, modified="2024-01-01"),
+        "a.json": FileDigest(sha256="a", size=1, modified="2024-01-02"),
+    }
+    generated = datetime(2024, 1, 2, tzinfo=UTC)
+
+    write_manifest(tmp_path, test_files, generated)
+
+    data = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    assert data["generated"] == generated.isoformat()
+    assert list(data["files"]) == ["a.json", "b.json"]
+    assert read_manifest(tmp_path) == test_files
+    assert list(tmp_path.iterdir()) == [tmp_path / MANIFEST_FILE]
+
+
+def test_write_manifest_keeps_unchanged_file(tmp_path: Path) -> None:
+    """Test to leave the manifest untouched if its content is the same."""
+    test_files = {
+        "a.json": FileDigest(sha256="a", size=1, modified="2024-01-02"),
+    }
+    generated = datetime(2024, 1, 2, tzinfo=UTC)
+    write_manifest(tmp_path, test_files, generated)
+    previous_stat = (tmp_path / MANIFEST_FILE).stat()
+
+    write_manifest(tmp_path, test_files, generated)
+
+    assert (tmp_path / MANIFEST_FILE).stat().st_ino == previous_stat.st_ino
+    assert list(tmp_path.iterdir()) == [tmp_path / MANIFEST_FILE]
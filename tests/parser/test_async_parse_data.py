@@ -0,0 +1,273 @@
+"""Tests related to the asyncio parsing functionality.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from requests import Response, Session
+
+from nukeversionparser.datamodel.constants import (
+    PLATFORMS,
+    Architecture,
+    OperatingSystem,
+)
+from nukeversionparser.datamodel.nuke_data import (
+    NukeInstaller,
+    NukeRelease,
+    SemanticVersion,
+)
+from nukeversionparser.parser.async_parse_data import AsyncProbingEngine
+from nukeversionparser.parser.parse_data import ScanOptions, ScanStrategy
+
+
+class TestAsyncProbingEngine:
+    """Tests related to the async probing engine."""
+
+    @staticmethod
+    def test_invalid_concurrency() -> None:
+        """Test to raise a ValueError when the limit is lower than 1."""
+        with pytest.raises(
+            ValueError, match=r"Concurrency limit should be at least 1\."
+        ):
+            AsyncProbingEngine(0)
+
+    @staticmethod
+    def test_provided_session() -> None:
+        """Test to probe with the provided session and leave it open."""
+        session_mock = MagicMock(spec=Session)
+        session_mock.head.return_value.status_code = 403
+
+        with AsyncProbingEngine(2, session_mock) as engine:
+            asyncio.run(engine.to_nuke_release(SemanticVersion(15, 0, 1)))
+
+        assert session_mock.head.call_count == 1
+        session_mock.close.assert_not_called()
+
+    @staticmethod
+    @pytest.mark.parametrize("data_exists", [True, False])
+    def test_to_nuke_release(data_exists: bool) -> None:
+        """Test to probe all platforms and return NukeRelease."""
+        response_mock = MagicMock(spec=Response)
+        response_mock.status_code = 200 if data_exists else 403
+        response_mock.headers = {"last-modified": "test_date"}
+
+        with patch(
+            "requests.Session.head",
+            return_value=response_mock,
+        ) as head_mock, AsyncProbingEngine(4) as engine:
+            retrieved_data = asyncio.run(
+                engine.to_nuke_release(SemanticVersion(15, 0, 1))
+            )
+
+        assert head_mock.call_count == (len(PLATFORMS) if data_exists else 1)
+        if not data_exists:
+            assert retrieved_data is None
+            return
+        assert isinstance(retrieved_data, NukeRelease)
+        assert retrieved_data.date == "test_date"
+        assert retrieved_data.version == SemanticVersion(15, 0, 1)
+        assert retrieved_data.installer.linux_x86_64
+        assert retrieved_data.installer.mac_arm
+
+    @staticmethod
+    def test_to_nuke_release_date_priority() -> None:
+        """Test that the date follows platform order, not response order."""
+
+        def fetch_installer(
+            system: OperatingSystem, architecture: Architecture
+        ) -> tuple[str, str] | None:
+            if system == OperatingSystem.LINUX:
+                return None
+            return f"{system.value}_url", f"{system.value}_date"
+
+        with patch(
+            "nukeversionparser.parser.async_parse_data.VersionParser"
+        ) as version_parser_mock, AsyncProbingEngine(4) as engine:
+            version_parser_mock.return_value.fetch_installer.side_effect = (
+                fetch_installer
+            )
+            retrieved_data = asyncio.run(
+                engine.to_nuke_release(SemanticVersion(16, 0, 9))
+            )
+
+        assert retrieved_data.date == "win_date"
+        assert retrieved_data.installer == NukeInstaller(
+            mac_arm="mac_url",
+            mac_x86_64="mac_url",
+            windows_x86_64="win_url",
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("attribute_name", "expected_calls"),
+        [
+            (
+                "major",
+                [SemanticVersion(1, 0, 0), SemanticVersion(2, 0, 0)],
+            ),
+            (
+                "minor",
+                [SemanticVersion(1, 0, 0), SemanticVersion(1, 1, 0)],
+            ),
+            (
+                "patch",
+                [SemanticVersion(1, 0, 0), SemanticVersion(1, 0, 1)],
+            ),
+        ],
+    )
+    def test_iterating_over_specified_attribute(
+        attribute_name: str, expected_calls: list[SemanticVersion]
+    ) -> None:
+        """Test iteration over attribute stops after None."""
+        with patch.object(
+            AsyncProbingEngine, "to_nuke_release", new_callable=AsyncMock
+        ) as to_nuke_release_mock, AsyncProbingEngine(1) as engine:
+            responses = ["first_data", "second_data", None]
+            to_nuke_release_mock.side_effect = responses
+            releases = asyncio.run(
+                engine.parse_release_data_by_attribute(
+                    SemanticVersion(1, 0, 0), attribute_name
+                )
+            )
+
+        assert releases == ["first_data", "second_data"]
+        assert to_nuke_release_mock.call_count == len(responses)
+        to_nuke_release_mock.assert_any_call(expected_calls[0])
+        to_nuke_release_mock.assert_any_call(expected_calls[1])
+
+    @staticmethod
+    def test_lookahead() -> None:
+        """Test to collect versions in order up to the first missing one."""
+        existing_patches = [1, 2, 3]
+        slow_patch = 2
+        lookahead = 4
+        next_patch_fetched = asyncio.Event()
+
+        async def to_nuke_release(
+            version: SemanticVersion,
+        ) -> NukeRelease | None:
+            if version.patch == slow_patch:
+                await asyncio.wait_for(next_patch_fetched.wait(), timeout=5)
+            elif version.patch == slow_patch + 1:
+                next_patch_fetched.set()
+            if version.patch not in existing_patches:
+                return None
+            return NukeRelease(version=version, installer=None, date="date")
+
+        with patch.object(
+            AsyncProbingEngine,
+            "to_nuke_release",
+            new_callable=AsyncMock,
+            side_effect=to_nuke_release,
+        ) as to_nuke_release_mock, AsyncProbingEngine(
+            4, options=ScanOptions(lookahead=lookahead)
+        ) as engine:
+            releases = asyncio.run(
+                engine.parse_release_data_by_attribute(
+                    SemanticVersion(15, 0, 1), "patch"
+                )
+            )
+
+        assert [
+            release.version.patch for release in releases
+        ] == existing_patches
+        assert to_nuke_release_mock.call_count == (
+            len(existing_patches) + lookahead
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "options",
+        [
+            ScanOptions(gap_tolerance=1),
+            ScanOptions(lookahead=3, gap_tolerance=1),
+            ScanOptions(strategy=ScanStrategy.GALLOPING, gap_tolerance=1),
+        ],
+    )
+    def test_strategies(options: ScanOptions) -> None:
+        """Test that every strategy finds the releases it tolerates."""
+        existing_patches = [1, 2, 4, 5]
+
+        async def to_nuke_release(
+            version: SemanticVersion,
+        ) -> NukeRelease | None:
+            if version.patch not in existing_patches:
+                return None
+            return NukeRelease(version=version, installer=None, date="date")
+
+        with patch.object(
+            AsyncProbingEngine,
+            "to_nuke_release",
+            new_callable=AsyncMock,
+            side_effect=to_nuke_release,
+        ), AsyncProbingEngine(4, options=options) as engine:
+            releases = asyncio.run(
+                engine.parse_release_data_by_attribute(
+                    SemanticVersion(15, 0, 1), "patch"
+                )
+            )
+
+        assert [
+            release.version.patch for release in releases
+        ] == existing_patches
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "options",
+        [
+            ScanOptions(gap_tolerance=1),
+            ScanOptions(strategy=ScanStrategy.GALLOPING, gap_tolerance=1),
+        ],
+    )
+    def test_patches_of_10_0_stay_within_10_0(options: ScanOptions) -> None:
+        """Test to not step into 10.5 when tolerating a gap after 10.0v6."""
+        existing_versions = {
+            *(SemanticVersion(10, 0, patch) for patch in range(1, 7)),
+            *(SemanticVersion(10, 5, patch) for patch in range(1, 9)),
+        }
+
+        async def to_nuke_release(
+            version: SemanticVersion,
+        ) -> NukeRelease | None:
+            if version not in existing_versions:
+                return None
+            return NukeRelease(version=version, installer=None, date="date")
+
+        with patch.object(
+            AsyncProbingEngine,
+            "to_nuke_release",
+            new_callable=AsyncMock,
+            side_effect=to_nuke_release,
+        ), AsyncProbingEngine(4, options=options) as engine:
+            releases = asyncio.run(
+                engine.parse_release_data_by_attribute(
+                    SemanticVersion(10, 0, 1), "patch"
+                )
+            )
+
+        assert [release.version for release in releases] == [
+            SemanticVersion(10, 0, patch) for patch in range(1, 7)
+        ]
+
+    @staticmethod
+    def test_version_skips_to() -> None:
+        """Test that version will be skipped to expected version."""
+        with patch.object(
+            AsyncProbingEngine,
+            "to_nuke_release",
+            new_callable=AsyncMock,
+            return_value=None,
+        ) as to_nuke_release_mock, AsyncProbingEngine(1) as engine:
+            asyncio.run(
+                engine.parse_release_data_by_attribute(
+                    SemanticVersion(10, 1, 1), "minor"
+                )
+            )
+
+        to_nuke_release_mock.assert_called_once_with(
+            SemanticVersion(10, 5, 1)
+        )
@@ -0,0 +1,223 @@
+"""Tests related to discovering releases by listing the bucket.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+
+import pytest
+
+from benchmarks.fake_bucket import BucketBehaviour, FakeBucket
+from nukeversionparser.datamodel.constants import (
+    Architecture,
+    OperatingSystem,
+)
+from nukeversionparser.datamodel.nuke_data import (
+    NukeInstaller,
+    SemanticVersion,
+)
+from nukeversionparser.parser.bucket_listing import (
+    BUCKET_URL,
+    RELEASES_PREFIX,
+    ListingUnavailableError,
+    _parse_listing,
+    _to_header_date,
+    list_families,
+    parse_installer_key,
+)
+from nukeversionparser.parser.url_calculator import calculate_url
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+
+def _listing_page(
+    objects: list[tuple[str, str]], next_token: str | None = None
+) -> str:
+    """Return a ListObjectsV2 response containing the provided objects."""
+    contents = "".join(
+        f"<Contents><Key>{key}</Key>"
+        f"<LastModified>{last_modified}</LastModified></Contents>"
+        for key, last_modified in objects
+    )
+    truncated = "false"
+    if next_token is not None:
+        truncated = "true"
+        contents += (
+            f"<NextContinuationToken>{next_token}</NextContinuationToken>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<ListBucketResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+        f"<IsTruncated>{truncated}</IsTruncated>{contents}"
+        "</ListBucketResult>"
+    )
+
+
+def _key(
+    version: SemanticVersion,
+    system: OperatingSystem,
+    architecture: Architecture,
+) -> str:
+    """Return the key of the installer in the bucket."""
+    return calculate_url(version, system, architecture).removeprefix(
+        BUCKET_URL
+    )
+
+
+_BUCKET_OBJECTS = {
+    _key(
+        SemanticVersion(15, 0, 1), OperatingSystem.MAC, Architecture.ARM
+    ): "Thu, 16 Nov 2023 10:00:00 GMT",
+    _key(
+        SemanticVersion(15, 0, 1), OperatingSystem.LINUX, Architecture.X86_64
+    ): "Wed, 15 Nov 2023 15:08:31 GMT",
+    _key(
+        SemanticVersion(15, 1, 1), OperatingSystem.WINDOWS, Architecture.X86_64
+    ): "Wed, 01 May 2024 08:00:00 GMT",
+    f"{RELEASES_PREFIX}15.0v1/release-notes.pdf": (
+        "Wed, 15 Nov 2023 15:08:31 GMT"
+    ),
+    "products/mari/releases/6.0v1/Mari6.0v1.tgz": (
+        "Wed, 15 Nov 2023 15:08:31 GMT"
+    ),
+}
+"""Objects of a bucket containing two releases of Nuke 15."""
+
+
+@pytest.fixture
+def fake_bucket() -> Iterator[FakeBucket]:
+    """Serve the bucket objects, one object per page of the listing."""
+    with FakeBucket(
+        _BUCKET_OBJECTS, BucketBehaviour(listing_page_size=1)
+    ) as bucket:
+        yield bucket
+
+
+class TestParseListing:
+    """Tests related to parsing a page of the listing."""
+
+    @staticmethod
+    def test_last_page() -> None:
+        """Test to return all objects and no token on the last page."""
+        objects, next_token = _parse_listing(
+            _listing_page([("key", "2023-11-15T15:08:31.000Z")])
+        )
+
+        assert objects == [("key", "2023-11-15T15:08:31.000Z")]
+        assert next_token is None
+
+    @staticmethod
+    def test_truncated_page() -> None:
+        """Test to return the token of the next page."""
+        assert _parse_listing(_listing_page([], "token"))[1] == "token"
+
+    @staticmethod
+    def test_invalid_listing() -> None:
+        """Test to raise when the body is no XML."""
+        with pytest.raises(ListingUnavailableError, match="invalid"):
+            _parse_listing("<html>")
+
+
+class TestParseInstallerKey:
+    """Tests related to mapping keys back to installers."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("version", "system", "architecture", "field_name"),
+        [
+            (
+                SemanticVersion(15, 0, 2),
+                OperatingSystem.MAC,
+                Architecture.ARM,
+                "mac_arm",
+            ),
+            (
+                SemanticVersion(12, 1, 2),
+                OperatingSystem.WINDOWS,
+                Architecture.X86_64,
+                "windows_x86_64",
+            ),
+            (
+                SemanticVersion(10, 5, 8),
+                OperatingSystem.LINUX,
+                Architecture.X86_64,
+                "linux_x86_64",
+            ),
+        ],
+    )
+    def test_calculated_key(
+        version: SemanticVersion,
+        system: OperatingSystem,
+        architecture: Architecture,
+        field_name: str,
+    ) -> None:
+        """Test that every calculated url maps back to its platform."""
+        assert parse_installer_key(_key(version, system, architecture)) == (
+            version,
+            field_name,
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "key",
+        [
+            f"{RELEASES_PREFIX}15.0v2/Nuke15.0v2-linux-x86_64.rpm",
+            f"{RELEASES_PREFIX}15.0v2/",
+            f"{RELEASES_PREFIX}15.0v2/docs/Nuke15.0v2-linux-x86_64.tgz",
+            "products/mari/releases/6.0v1/Mari6.0v1-linux-x86_64.tgz",
+        ],
+    )
+    def test_unknown_key(key: str) -> None:
+        """Test to ignore keys that are not an installer."""
+        assert parse_installer_key(key) is None
+
+
+def test__to_header_date() -> None:
+    """Test to convert the listing date to a last-modified header."""
+    assert (
+        _to_header_date("2023-11-15T15:08:31.000Z")
+        == "Wed, 15 Nov 2023 15:08:31 GMT"
+    )
+
+
+class TestListFamilies:
+    """Tests related to listing the families from a fake bucket."""
+
+    @staticmethod
+    def test_list_families(fake_bucket: FakeBucket) -> None:
+        """Test to follow all pages and combine installers per version."""
+        families = list_families(bucket_url=fake_bucket.url)
+
+        listed_keys = [
+            key for key in _BUCKET_OBJECTS if key.startswith(RELEASES_PREFIX)
+        ]
+        assert fake_bucket.requests == {
+            ("GET", HTTPStatus.OK): len(listed_keys)
+        }
+        assert [family.version for family in families] == [15]
+        release_1, release_2 = families[0].releases
+        assert release_1.version == SemanticVersion(15, 0, 1)
+        assert release_1.date == "Wed, 15 Nov 2023 15:08:31 GMT"
+        assert release_1.installer == NukeInstaller(
+            mac_arm=(
+                f"{BUCKET_URL}{RELEASES_PREFIX}"
+                "15.0v1/Nuke15.0v1-mac-arm64.dmg"
+            ),
+            linux_x86_64=(
+                f"{BUCKET_URL}{RELEASES_PREFIX}"
+                "15.0v1/Nuke15.0v1-linux-x86_64.tgz"
+            ),
+        )
+        assert release_2.version == SemanticVersion(15, 1, 1)
+        assert release_2.date == "Wed, 01 May 2024 08:00:00 GMT"
+
+    @staticmethod
+    def test_listing_denied() -> None:
+        """Test to raise when the bucket refuses to be listed."""
+        with FakeBucket(
+            _BUCKET_OBJECTS, BucketBehaviour(allow_listing=False)
+        ) as bucket, pytest.raises(ListingUnavailableError, match="403"):
+            list_families(bucket_url=bucket.url)
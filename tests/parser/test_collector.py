@@ -3,20 +3,39 @@
 @maintainer: Gilles Vink
 """
 
+import asyncio
+from unittest.mock import ANY, MagicMock, patch
 
-from unittest.mock import patch
+import pytest
 
+from nukeversionparser.datamodel.constants import (
+    Architecture,
+    OperatingSystem,
+)
 from nukeversionparser.datamodel.nuke_data import (
     NukeFamily,
+    NukeInstaller,
     NukeRelease,
     SemanticVersion,
 )
+from nukeversionparser.parser.bucket_listing import (
+    DiscoveryBackend,
+    ListingUnavailableError,
+)
 from nukeversionparser.parser.collector import (
     _find_all_minor_versions,
     _find_all_patch_versions,
     _get_all_families,
+    _get_next_family_version,
+    _get_next_minor_version,
+    _get_next_patch_versions,
+    async_collect_families,
     collect_families,
+    reprobe_unknown_installers,
 )
+from nukeversionparser.parser.parse_data import ScanOptions, VersionParser
+from nukeversionparser.parser.retry import UnknownProbes
+from nukeversionparser.parser.url_calculator import calculate_url
 
 
 def test__get_all_families() -> None:
@@ -41,6 +60,88 @@ def test__get_all_families() -> None:
     assert collected_families == expected_families
 
 
+def test__get_all_families_with_known_families() -> None:
+    """Test to only probe for families newer than the known families."""
+    known_families = [
+        NukeFamily(
+            [
+                NukeRelease(
+                    version=SemanticVersion(14, 0, 1),
+                    installer=None,
+                    date=None,
+                )
+            ]
+        )
+    ]
+    new_release = NukeRelease(
+        version=SemanticVersion(15, 0, 1), installer=None, date=None
+    )
+
+    with patch(
+        "nukeversionparser.parser.collector.parse_release_data_by_attribute",
+        return_value=[new_release],
+    ) as version_parser_mock:
+        collected_families = _get_all_families(None, known_families)
+
+    version_parser_mock.assert_called_once_with(
+        SemanticVersion(15, 0, 1), "major", None, None
+    )
+    assert collected_families == [*known_families, NukeFamily([new_release])]
+
+
+@pytest.mark.parametrize(
+    ("known_versions", "expected_version"),
+    [
+        ([], SemanticVersion(9, 0, 1)),
+        ([SemanticVersion(9, 0, 1)], SemanticVersion(10, 0, 1)),
+        (
+            [SemanticVersion(15, 1, 2), SemanticVersion(14, 0, 1)],
+            SemanticVersion(16, 0, 1),
+        ),
+    ],
+)
+def test__get_next_family_version(
+    known_versions: list[SemanticVersion], expected_version: SemanticVersion
+) -> None:
+    """Test to return the first release after the latest known family."""
+    known_families = [
+        NukeFamily([NukeRelease(version=version, installer=None, date=None)])
+        for version in known_versions
+    ]
+
+    assert _get_next_family_version(known_families) == expected_version
+
+
+def test__get_next_minor_version() -> None:
+    """Test to return the first release after the latest known minor."""
+    family = NukeFamily(
+        [
+            NukeRelease(SemanticVersion(15, 0, 1), installer=None, date=None),
+            NukeRelease(SemanticVersion(15, 1, 3), installer=None, date=None),
+            NukeRelease(SemanticVersion(15, 0, 4), installer=None, date=None),
+        ]
+    )
+
+    assert _get_next_minor_version(family) == SemanticVersion(15, 2, 1)
+
+
+def test__get_next_patch_versions() -> None:
+    """Test to return the version after the latest patch of every minor."""
+    family = NukeFamily(
+        [
+            NukeRelease(SemanticVersion(15, 0, 1), installer=None, date=None),
+            NukeRelease(SemanticVersion(15, 1, 3), installer=None, date=None),
+            NukeRelease(SemanticVersion(15, 0, 4), installer=None, date=None),
+            NukeRelease(SemanticVersion(15, 1, 1), installer=None, date=None),
+        ]
+    )
+
+    assert _get_next_patch_versions(family) == [
+        SemanticVersion(15, 0, 5),
+        SemanticVersion(15, 1, 4),
+    ]
+
+
 def test__find_all_minor_versions() -> None:
     """Test find all minor versions to find new versions from family."""
     already_found_release = NukeRelease(
@@ -97,6 +198,65 @@ def test__find_all_patch_versions() -> None:
     assert test_family == expected_family
 
 
+def test__find_all_patch_versions_skips_known_versions() -> None:
+    """Test to not add releases of which the version is already known."""
+    known_release = NukeRelease(
+        version=SemanticVersion(1, 0, 1), installer=None, date=None
+    )
+    test_family = NukeFamily([known_release])
+    new_release = NukeRelease(
+        version=SemanticVersion(1, 0, 2), installer=None, date=None
+    )
+
+    with patch(
+        "nukeversionparser.parser.collector.parse_release_data_by_attribute",
+        return_value=[
+            NukeRelease(
+                version=SemanticVersion(1, 0, 1), installer=None, date=None
+            ),
+            new_release,
+        ],
+    ):
+        _find_all_patch_versions(test_family)
+
+    assert test_family.releases == [known_release, new_release]
+
+
+def test_collect_families_incremental_over_10_5() -> None:
+    """Test to not find 10.5 again when continuing the patches of 10.0."""
+    existing_versions = {
+        *(SemanticVersion(10, 0, patch) for patch in range(1, 7)),
+        *(SemanticVersion(10, 5, patch) for patch in range(1, 9)),
+    }
+    known_family = NukeFamily(
+        [
+            NukeRelease(version, installer=None, date=None)
+            for version in sorted(existing_versions)
+            if version <= SemanticVersion(10, 5, 3)
+        ]
+    )
+
+    with patch.object(
+        VersionParser,
+        "to_nuke_release",
+        side_effect=lambda version, *_: (
+            NukeRelease(version, installer=None, date=None)
+            if version in existing_versions
+            else None
+        ),
+    ):
+        collected_families = collect_families(
+            MagicMock(), max_workers=2, known_families=[known_family]
+        )
+
+    versions = [
+        release.version
+        for family in collected_families
+        for release in family.releases
+    ]
+    assert sorted(versions) == sorted(existing_versions)
+
+
 def test_collect_families() -> None:
     """Test collect to iterate over found families and call functions."""
     family1 = NukeFamily(
@@ -126,14 +286,207 @@ def test_collect_families() -> None:
         "nukeversionparser.parser.collector._find_all_minor_versions",
     ) as find_minor_mock, patch(
         "nukeversionparser.parser.collector._find_all_patch_versions",
-    ) as find_patch_mock:
-        collected_families = collect_families()
+    ) as find_patch_mock, patch(
+        "nukeversionparser.parser.collector.create_session",
+    ) as create_session_mock:
+        collected_families = collect_families(max_workers=3)
 
-    get_families_mock.assert_called_once()
+    create_session_mock.assert_called_once_with(12)
+    session = create_session_mock.return_value.__enter__.return_value
+    get_families_mock.assert_called_once_with(session, None, ScanOptions())
     assert collected_families
     for family in collected_families:
         assert isinstance(family, NukeFamily)
     for family in [family1, family2]:
-        find_minor_mock.assert_any_call(family)
-        find_patch_mock.assert_any_call(family)
+        find_minor_mock.assert_any_call(family, session, ScanOptions())
+        find_patch_mock.assert_any_call(family, session, ScanOptions())
+
 
+def test_collect_families_pool_size_with_lookahead() -> None:
+    """Test to size the session pool to all probes sent at once."""
+    with patch(
+        "nukeversionparser.parser.collector._get_all_families",
+        return_value=[],
+    ), patch(
+        "nukeversionparser.parser.collector.create_session",
+    ) as create_session_mock:
+        collect_families(max_workers=3, options=ScanOptions(lookahead=2))
+
+    create_session_mock.assert_called_once_with(24)
+
+
+def test_async_collect_families() -> None:
+    """Test to collect majors, then minors and patches of every release."""
+    release_1 = NukeRelease(
+        version=SemanticVersion(9, 0, 1), installer=None, date=None
+    )
+    release_2 = NukeRelease(
+        version=SemanticVersion(9, 1, 1), installer=None, date=None
+    )
+    release_3 = NukeRelease(
+        version=SemanticVersion(9, 1, 2), installer=None, date=None
+    )
+    scan_results = {
+        ("9.0v1", "major"): [release_1],
+        ("9.1v1", "minor"): [release_2],
+        ("9.0v2", "patch"): [],
+        ("9.1v2", "patch"): [release_3],
+    }
+
+    async def parse_release_data_by_attribute(
+        version: SemanticVersion, attribute_name: str
+    ) -> list[NukeRelease]:
+        return scan_results[(str(version), attribute_name)]
+
+    with patch(
+        "nukeversionparser.parser.collector.AsyncProbingEngine"
+    ) as engine_mock:
+        engine = engine_mock.return_value.__enter__.return_value
+        engine.parse_release_data_by_attribute.side_effect = (
+            parse_release_data_by_attribute
+        )
+        collected_families = asyncio.run(async_collect_families(8))
+
+    engine_mock.assert_called_once_with(8, None, None)
+    assert collected_families == [
+        NukeFamily([release_1, release_2, release_3])
+    ]
+
+
+def test_collect_families_scans_minors_before_patches() -> None:
+    """Test that patches of newly found minor releases are scanned too."""
+    family = NukeFamily(
+        [NukeRelease(SemanticVersion(15, 0, 1), installer=None, date=None)]
+    )
+    minor_release = NukeRelease(
+        SemanticVersion(15, 1, 1), installer=None, date=None
+    )
+
+    def parse_release_data_by_attribute(
+        version: SemanticVersion,
+        attribute_name: str,
+        session: MagicMock,
+        options: ScanOptions,
+    ) -> list[NukeRelease]:
+        if attribute_name == "minor":
+            return [minor_release]
+        return []
+
+    with patch(
+        "nukeversionparser.parser.collector.parse_release_data_by_attribute",
+        side_effect=parse_release_data_by_attribute,
+    ) as version_parser_mock:
+        collect_families(MagicMock(), max_workers=2, known_families=[family])
+
+    patch_calls = [
+        call.args[0]
+        for call in version_parser_mock.call_args_list
+        if call.args[1] == "patch"
+    ]
+    assert patch_calls == [SemanticVersion(15, 0, 2), SemanticVersion(15, 1, 2)]
+    assert family.releases[-1] == minor_release
+
+
+def test_collect_families_from_listing() -> None:
+    """Test to list the bucket instead of probing."""
+    session = MagicMock()
+    listed_families = [MagicMock(spec=NukeFamily)]
+
+    with patch(
+        "nukeversionparser.parser.collector.list_families",
+        return_value=listed_families,
+    ) as list_families_mock, patch(
+        "nukeversionparser.parser.collector._get_all_families",
+    ) as get_families_mock:
+        collected_families = collect_families(
+            session, backend=DiscoveryBackend.LISTING
+        )
+
+    assert collected_families == listed_families
+    list_families_mock.assert_called_once_with(session)
+    get_families_mock.assert_not_called()
+
+
+def test_collect_families_listing_denied() -> None:
+    """Test to fall back to probing when listing is refused."""
+    session = MagicMock()
+
+    with patch(
+        "nukeversionparser.parser.collector.list_families",
+        side_effect=ListingUnavailableError("Access denied."),
+    ), patch(
+        "nukeversionparser.parser.collector._get_all_families",
+        return_value=[],
+    ) as get_families_mock:
+        collected_families = collect_families(
+            session, backend=DiscoveryBackend.LISTING
+        )
+
+    assert collected_families == []
+    get_families_mock.assert_called_once_with(session, None, ScanOptions())
+
+
+class TestReprobeUnknownInstallers:
+    """Tests related to the second pass over unknown probes."""
+
+    @staticmethod
+    def test_without_unknown_probes() -> None:
+        """Test to return the families without probing anything."""
+        families = [MagicMock(spec=NukeFamily)]
+
+        with patch(
+            "nukeversionparser.parser.collector.collect_families"
+        ) as collect_families_mock:
+            result = reprobe_unknown_installers(
+                families, UnknownProbes(), MagicMock()
+            )
+
+        assert result is families
+        collect_families_mock.assert_not_called()
+
+    @staticmethod
+    def test_reprobe() -> None:
+        """Test to add found installers and continue stopped scans."""
+        session = MagicMock()
+        known_release = NukeRelease(
+            version=SemanticVersion(15, 0, 1),
+            installer=NukeInstaller(linux_x86_64="linux_url"),
+            date="linux_date",
+        )
+        new_release = NukeRelease(
+            version=SemanticVersion(16, 0, 1),
+            installer=NukeInstaller(linux_x86_64="new_url"),
+            date="new_date",
+        )
+        families = [NukeFamily([known_release])]
+        unknown_probes = UnknownProbes()
+        for version, system, architecture in (
+            (known_release.version, OperatingSystem.MAC, Architecture.ARM),
+            (new_release.version, OperatingSystem.LINUX, Architecture.X86_64),
+        ):
+            unknown_probes.add(calculate_url(version, system, architecture))
+        unknown_probes.add("https://example.com/release-notes.pdf")
+
+        with patch.object(
+            VersionParser, "fetch_installer", return_value=("arm_url", "")
+        ) as fetch_installer_mock, patch.object(
+            VersionParser, "to_nuke_release", return_value=new_release
+        ) as to_nuke_release_mock, patch(
+            "nukeversionparser.parser.collector.collect_families",
+            side_effect=lambda session, workers, families, options: families,
+        ) as collect_families_mock:
+            result = reprobe_unknown_installers(
+                families, unknown_probes, session, options=ScanOptions()
+            )
+
+        fetch_installer_mock.assert_called_once_with(
+            OperatingSystem.MAC, Architecture.ARM
+        )
+        to_nuke_release_mock.assert_called_once_with(
+            new_release.version, session, ScanOptions(), ANY
+        )
+        collect_families_mock.assert_called_once()
+        assert known_release.installer.mac_arm == "arm_url"
+        assert known_release.date == "linux_date"
+        assert [family.version for family in result] == [15, 16]
+        assert not unknown_probes
@@ -0,0 +1,238 @@
+"""Tests related to the adaptive concurrency control.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import threading
+from contextlib import suppress
+from http import HTTPStatus
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import Request, Response
+from requests.exceptions import ConnectionError as RequestsConnectionError
+
+from nukeversionparser.parser.concurrency import (
+    AdaptiveAdapter,
+    AdaptiveConcurrencyController,
+)
+from nukeversionparser.parser.retry import UnknownProbes
+
+TEST_URL = "https://thefoundry.s3.amazonaws.com/products/nuke/releases/x.tgz"
+
+
+def _response(status_code: int) -> Response:
+    """Return a response mock with the provided status."""
+    response_mock = MagicMock(spec=Response)
+    response_mock.status_code = status_code
+    return response_mock
+
+
+class TestAdaptiveConcurrencyController:
+    """Tests related to the AdaptiveConcurrencyController object."""
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("max_limit", "min_limit", "decrease_factor"),
+        [(0, 1, 0.5), (4, 5, 0.5), (4, 1, 1.0), (4, 1, 0.0)],
+    )
+    def test_invalid_arguments(
+        max_limit: int, min_limit: int, decrease_factor: float
+    ) -> None:
+        """Test to raise a ValueError on invalid limits or factor."""
+        with pytest.raises(ValueError, match="should be"):
+            AdaptiveConcurrencyController(
+                max_limit, min_limit, decrease_factor
+            )
+
+    @staticmethod
+    def test_throttle_decreases_once_per_burst() -> None:
+        """Test to halve the limit once for throttles close together."""
+        max_limit = 16
+        throttle_times = [100.0, 100.5, 101.5]
+        controller = AdaptiveConcurrencyController(max_limit)
+
+        with patch(
+            "nukeversionparser.parser.concurrency.time.monotonic",
+            side_effect=throttle_times,
+        ):
+            for _ in throttle_times:
+                controller.record_throttle()
+
+        assert controller.limit == max_limit // 4
+        assert controller.throttle_count == len(throttle_times)
+
+    @staticmethod
+    def test_decrease_respects_min_limit() -> None:
+        """Test to never lower the limit below the minimum."""
+        min_limit = 3
+        controller = AdaptiveConcurrencyController(4, min_limit=min_limit)
+
+        controller.record_throttle()
+
+        assert controller.limit == min_limit
+
+    @staticmethod
+    def test_slow_response_decreases() -> None:
+        """Test to lower the limit when a response exceeds the threshold."""
+        max_limit = 8
+        controller = AdaptiveConcurrencyController(
+            max_limit, latency_threshold=1
+        )
+
+        controller.record_response(0.5)
+        controller.record_response(1.5)
+
+        assert controller.limit == max_limit // 2
+        assert controller.slow_count == 1
+        assert controller.throttle_count == 0
+
+    @staticmethod
+    def test_healthy_responses_increase() -> None:
+        """Test to grow by about one after a limit of healthy responses."""
+        max_limit = 8
+        controller = AdaptiveConcurrencyController(max_limit)
+        controller.record_throttle()
+        throttled_limit = controller.limit
+
+        for _ in range(throttled_limit + 1):
+            controller.record_response(0.1)
+        assert controller.limit == throttled_limit + 1
+        for _ in range(100):
+            controller.record_response(0.1)
+        assert controller.limit == max_limit
+
+    @staticmethod
+    def test_acquire_waits_for_release() -> None:
+        """Test to block requests above the limit until one is released."""
+        controller = AdaptiveConcurrencyController(1)
+        controller.acquire()
+        acquired = threading.Event()
+
+        def acquire() -> None:
+            controller.acquire()
+            acquired.set()
+
+        thread = threading.Thread(target=acquire)
+        thread.start()
+        assert not acquired.wait(0.05)
+        controller.release()
+        assert acquired.wait(1)
+        thread.join()
+        assert controller.in_flight == 1
+
+
+class TestAdaptiveAdapter:
+    """Tests related to the AdaptiveAdapter object."""
+
+    @staticmethod
+    def test_retries_throttled_requests() -> None:
+        """Test to send throttled requests again until they succeed."""
+        controller = AdaptiveConcurrencyController(4)
+        adapter = AdaptiveAdapter(controller)
+        request = Request("HEAD", TEST_URL).prepare()
+        throttled = _response(HTTPStatus.SERVICE_UNAVAILABLE)
+        success = _response(HTTPStatus.OK)
+        responses = [throttled, RequestsConnectionError(), success]
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send", side_effect=responses
+        ) as send_mock, patch(
+            "nukeversionparser.parser.concurrency.time.sleep"
+        ) as sleep_mock:
+            response = adapter.send(request)
+
+        assert response is success
+        throttled.close.assert_called_once_with()
+        success.close.assert_not_called()
+        assert send_mock.call_count == len(responses)
+        assert sleep_mock.call_count == len(responses) - 1
+        assert controller.throttle_count == len(responses) - 1
+        assert controller.in_flight == 0
+
+    @staticmethod
+    def test_returns_throttled_response_after_retries() -> None:
+        """Test to return the last throttled response after all retries."""
+        retries = 2
+        adapter = AdaptiveAdapter(retries=retries)
+        request = Request("HEAD", TEST_URL).prepare()
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send",
+            return_value=_response(HTTPStatus.SERVICE_UNAVAILABLE),
+        ) as send_mock, patch(
+            "nukeversionparser.parser.concurrency.time.sleep"
+        ):
+            response = adapter.send(request)
+
+        assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+        assert send_mock.call_count == retries + 1
+
+    @staticmethod
+    def test_raises_connection_error_after_retries() -> None:
+        """Test to raise when the connection keeps being reset."""
+        retries = 1
+        adapter = AdaptiveAdapter(retries=retries)
+        request = Request("HEAD", TEST_URL).prepare()
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send",
+            side_effect=RequestsConnectionError(),
+        ) as send_mock, patch(
+            "nukeversionparser.parser.concurrency.time.sleep"
+        ), pytest.raises(RequestsConnectionError):
+            adapter.send(request)
+
+        assert send_mock.call_count == retries + 1
+
+    @staticmethod
+    def test_missing_installer_is_not_retried() -> None:
+        """Test to return a missing installer right away."""
+        adapter = AdaptiveAdapter(AdaptiveConcurrencyController(4))
+        request = Request("HEAD", TEST_URL).prepare()
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send",
+            return_value=_response(HTTPStatus.FORBIDDEN),
+        ) as send_mock:
+            response = adapter.send(request)
+
+        assert response.status_code == HTTPStatus.FORBIDDEN
+        send_mock.assert_called_once()
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "side_effect",
+        [[_response(500)] * 2, [RequestsConnectionError()] * 2],
+    )
+    def test_stores_unknown_probes(side_effect: list) -> None:
+        """Test to store probes that are unknown after all retries."""
+        unknown_probes = UnknownProbes()
+        adapter = AdaptiveAdapter(retries=1, unknown_probes=unknown_probes)
+        request = Request("HEAD", TEST_URL).prepare()
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send", side_effect=side_effect
+        ), patch(
+            "nukeversionparser.parser.concurrency.time.sleep"
+        ), suppress(RequestsConnectionError):
+            adapter.send(request)
+
+        assert unknown_probes.drain() == [TEST_URL]
+
+    @staticmethod
+    def test_forgets_known_probes() -> None:
+        """Test to forget unknown probes once their outcome is known."""
+        unknown_probes = UnknownProbes()
+        unknown_probes.add(TEST_URL)
+        adapter = AdaptiveAdapter(unknown_probes=unknown_probes)
+        request = Request("HEAD", TEST_URL).prepare()
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send",
+            return_value=_response(404),
+        ):
+            adapter.send(request)
+
+        assert not unknown_probes
@@ -4,11 +4,13 @@
 """
 from __future__ import annotations
 
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import fields
-from unittest.mock import MagicMock, patch
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
-from requests import Response
+from requests import RequestException, Response, Session
 
 from nukeversionparser.datamodel.constants import (
     Architecture,
@@ -19,9 +21,14 @@ from nukeversionparser.datamodel.nuke_data import (
     NukeRelease,
     SemanticVersion,
 )
+from nukeversionparser.metrics import PROBE_LATENCY_SECONDS, PROBES
 from nukeversionparser.parser.parse_data import (
+    ScanOptions,
+    ScanStrategy,
+    VersionParser,
     _get_version_to_process,
-    _VersionParser,
+    gallop,
+    iterate_versions,
     parse_release_data_by_attribute,
 )
 
@@ -32,7 +39,7 @@ class TestVersionParser:
     @pytest.mark.parametrize("data_exists", [True, False])
     def test_retrieve_data(self, data_exists: bool) -> None:
         """Test to retrieve None with code 403 and str with code 200."""
-        version_parser = _VersionParser(SemanticVersion(1, 0, 0))
+        version_parser = VersionParser(SemanticVersion(1, 0, 0))
         response_mock = MagicMock(spec=Response)
         response_mock.headers = {"last-modified": "test_date"}
         response_mock.status_code = 200 if data_exists else 403
@@ -60,7 +67,7 @@ class TestVersionParser:
     @pytest.mark.parametrize("data_exists", [True, False])
     def test_retrieve_data_store_date(self, data_exists: bool) -> None:
         """Test that date is stored when data is available."""
-        version_parser = _VersionParser(SemanticVersion(1, 0, 0))
+        version_parser = VersionParser(SemanticVersion(1, 0, 0))
         response_mock = MagicMock(spec=Response)
         response_mock.status_code = 200 if data_exists else 403
         response_mock.headers = {"last-modified": "test_date"}
@@ -77,6 +84,101 @@ class TestVersionParser:
         else:
             assert version_parser.date is None
 
+    @staticmethod
+    def test_retrieve_data_with_session() -> None:
+        """Test to send the probe with the provided session."""
+        session_mock = MagicMock(spec=Session)
+        session_mock.head.return_value.status_code = 200
+        session_mock.head.return_value.headers = {}
+        version_parser = VersionParser(
+            SemanticVersion(15, 0, 1), session_mock
+        )
+
+        with patch(
+            "nukeversionparser.parser.parse_data.requests.head"
+        ) as head_mock:
+            retrieved_data = version_parser.retrieve_data(
+                OperatingSystem.LINUX, Architecture.X86_64
+            )
+
+        head_mock.assert_not_called()
+        session_mock.head.assert_called_once_with(retrieved_data, timeout=10)
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("status_code", "outcome"),
+        [(200, "hit"), (404, "miss"), (500, "error")],
+    )
+    def test_fetch_installer_metrics(status_code: int, outcome: str) -> None:
+        """Test to count the outcome and the latency of every probe."""
+        session_mock = MagicMock(spec=Session)
+        session_mock.head.return_value.status_code = status_code
+        session_mock.head.return_value.headers = {}
+        version_parser = VersionParser(
+            SemanticVersion(15, 0, 1), session_mock
+        )
+
+        version_parser.fetch_installer(OperatingSystem.MAC, Architecture.ARM)
+
+        assert PROBES.to_dict()["samples"] == [
+            {
+                "labels": {
+                    "platform": "mac_arm",
+                    "outcome": outcome,
+                    "source": "network",
+                },
+                "value": 1,
+            }
+        ]
+        assert PROBE_LATENCY_SECONDS.to_dict()["samples"][0]["count"] == 1
+
+    @staticmethod
+    def test_fetch_installer_metrics_from_cache() -> None:
+        """Test to count cached probes apart and leave out their latency."""
+        session_mock = MagicMock(spec=Session)
+        session_mock.head.return_value.status_code = 200
+        session_mock.head.return_value.headers = {}
+        session_mock.head.return_value.from_cache = True
+        version_parser = VersionParser(
+            SemanticVersion(15, 0, 1), session_mock
+        )
+
+        version_parser.fetch_installer(OperatingSystem.MAC, Architecture.ARM)
+
+        assert PROBES.to_dict()["samples"] == [
+            {
+                "labels": {
+                    "platform": "mac_arm",
+                    "outcome": "hit",
+                    "source": "cache",
+                },
+                "value": 1,
+            }
+        ]
+        assert PROBE_LATENCY_SECONDS.to_dict()["samples"] == []
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "side_effect",
+        [RequestException("reset"), [MagicMock(status_code=503)]],
+    )
+    def test_fetch_installer_unknown_outcome(
+        side_effect: Exception | list[MagicMock],
+    ) -> None:
+        """Test to report failed probes as missing instead of raising."""
+        session_mock = MagicMock(spec=Session)
+        session_mock.head.side_effect = side_effect
+        version_parser = VersionParser(
+            SemanticVersion(15, 0, 1), session_mock
+        )
+
+        assert (
+            version_parser.fetch_installer(
+                OperatingSystem.LINUX, Architecture.X86_64
+            )
+            is None
+        )
+
     @pytest.mark.parametrize("data_exists", [True, False])
     def test_to_nuke_release(self, data_exists: bool) -> None:
         """Test to iterate over all data and return NukeRelease."""
@@ -90,8 +192,9 @@ class TestVersionParser:
             "nukeversionparser.parser.parse_data.requests.head",
             return_value=response_mock,
         ):
-            retrieved_data = _VersionParser.to_nuke_release(
-                SemanticVersion(1, 0, 0)
+            retrieved_data = VersionParser.to_nuke_release(
+                SemanticVersion(1, 0, 0),
+                options=ScanOptions(primary_platform=None),
             )
 
         # make sure we have 4 unique calls
@@ -106,6 +209,88 @@ class TestVersionParser:
         assert retrieved_data.version == SemanticVersion(1, 0, 0)
         assert isinstance(retrieved_data.installer, NukeInstaller)
 
+    @staticmethod
+    def test_to_nuke_release_date_priority() -> None:
+        """Test that the date follows platform order, not response order."""
+        others_fetched = threading.Event()
+        others = threading.Barrier(
+            len(fields(NukeInstaller)) - 1, action=others_fetched.set
+        )
+
+        def fetch_installer(
+            system: OperatingSystem, architecture: Architecture
+        ) -> tuple[str, str]:
+            if system == OperatingSystem.LINUX:
+                assert others_fetched.wait(timeout=5)
+            else:
+                others.wait(timeout=5)
+            name = f"{system.value}_{architecture.value}"
+            return f"{name}_url", f"{name}_date"
+
+        with ThreadPoolExecutor(4) as executor, patch.object(
+            VersionParser, "fetch_installer", side_effect=fetch_installer
+        ):
+            retrieved_data = VersionParser.to_nuke_release(
+                SemanticVersion(15, 0, 1),
+                options=ScanOptions(primary_platform=None),
+                executor=executor,
+            )
+
+        assert retrieved_data.date == "linux_x86_date"
+        assert retrieved_data.installer == NukeInstaller(
+            mac_arm="mac_arm_url",
+            mac_x86_64="mac_x86_url",
+            linux_x86_64="linux_x86_url",
+            windows_x86_64="win_x86_url",
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("version", "expected_probes"),
+        [(SemanticVersion(15, 0, 1), 1), (SemanticVersion(16, 0, 9), 4)],
+    )
+    def test_to_nuke_release_primary_platform(
+        version: SemanticVersion, expected_probes: int
+    ) -> None:
+        """Test to skip the other platforms when the primary is missing."""
+        with patch.object(
+            VersionParser, "fetch_installer", return_value=None
+        ) as fetch_installer_mock:
+            retrieved_data = VersionParser.to_nuke_release(version)
+
+        assert retrieved_data is None
+        assert fetch_installer_mock.call_count == expected_probes
+        fetch_installer_mock.assert_any_call(
+            OperatingSystem.LINUX, Architecture.X86_64
+        )
+
+    @staticmethod
+    def test_to_nuke_release_without_primary_installer() -> None:
+        """Test to find exclusive versions that miss the primary platform."""
+
+        def fetch_installer(
+            system: OperatingSystem, architecture: Architecture
+        ) -> tuple[str, str] | None:
+            if system == OperatingSystem.LINUX:
+                return None
+            return f"{system.value}_url", f"{system.value}_date"
+
+        with patch.object(
+            VersionParser, "fetch_installer", side_effect=fetch_installer
+        ):
+            retrieved_data = VersionParser.to_nuke_release(
+                SemanticVersion(16, 0, 9)
+            )
+
+        assert retrieved_data.date == "win_date"
+        assert retrieved_data.installer.linux_x86_64 is None
+
+    @staticmethod
+    def test_invalid_primary_platform() -> None:
+        """Test to raise a ValueError when the platform is unknown."""
+        with pytest.raises(ValueError, match="Primary platform should be"):
+            ScanOptions(primary_platform="linux_arm")
+
 
 class TestParseReleaseDataByAttribute:
     """Tests related to the parse_release_data_by_attribute function."""
@@ -133,7 +318,7 @@ class TestParseReleaseDataByAttribute:
     ) -> None:
         """Test iteration over attribute stops after None."""
         with patch(
-            "nukeversionparser.parser.parse_data._VersionParser.to_nuke_release"
+            "nukeversionparser.parser.parse_data.VersionParser.to_nuke_release"
         ) as version_parser_mock:
             version_parser_mock.side_effect = [
                 "first_data",
@@ -145,14 +330,174 @@ class TestParseReleaseDataByAttribute:
             )
 
         assert version_parser_mock.call_count == 3
-        version_parser_mock.assert_any_call(expected_calls[0])
-        version_parser_mock.assert_any_call(expected_calls[1])
+        version_parser_mock.assert_any_call(
+            expected_calls[0], None, ScanOptions(), ANY
+        )
+        version_parser_mock.assert_any_call(
+            expected_calls[1], None, ScanOptions(), ANY
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize("lookahead", [2, 3, 8])
+    def test_lookahead(lookahead: int) -> None:
+        """Test to collect versions in order up to the first missing one."""
+        existing_patches = [1, 2, 3, 4, 5]
+        slow_patch = 3
+        next_patch_fetched = threading.Event()
+
+        def to_nuke_release(
+            version: SemanticVersion, *_: object
+        ) -> NukeRelease | None:
+            if version.patch == slow_patch:
+                assert next_patch_fetched.wait(timeout=5)
+            elif version.patch == slow_patch + 1:
+                next_patch_fetched.set()
+            if version.patch not in existing_patches:
+                return None
+            return NukeRelease(version=version, installer=None, date="date")
+
+        with patch(
+            "nukeversionparser.parser.parse_data.VersionParser.to_nuke_release",
+            side_effect=to_nuke_release,
+        ) as version_parser_mock:
+            releases = parse_release_data_by_attribute(
+                SemanticVersion(15, 0, 1),
+                "patch",
+                options=ScanOptions(lookahead=lookahead),
+            )
+
+        assert [
+            release.version.patch for release in releases
+        ] == existing_patches
+        assert version_parser_mock.call_count <= (
+            len(existing_patches) + lookahead
+        )
+
+    @staticmethod
+    def test_lookahead_jumps_versions() -> None:
+        """Test that the lookahead respects the versions to jump to."""
+        found_release = NukeRelease(
+            version=SemanticVersion(10, 5, 1), installer=None, date="date"
+        )
+        with patch(
+            "nukeversionparser.parser.parse_data.VersionParser.to_nuke_release",
+            side_effect=lambda version, *_: (
+                found_release if version == found_release.version else None
+            ),
+        ) as version_parser_mock:
+            releases = parse_release_data_by_attribute(
+                SemanticVersion(10, 1, 1),
+                "minor",
+                options=ScanOptions(lookahead=2),
+            )
+
+        assert releases == [found_release]
+        options = ScanOptions(lookahead=2)
+        version_parser_mock.assert_any_call(
+            SemanticVersion(10, 5, 1), None, options, ANY
+        )
+        version_parser_mock.assert_any_call(
+            SemanticVersion(10, 6, 1), None, options, ANY
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("options", "existing_patches", "expected_patches"),
+        [
+            (ScanOptions(), {1, 2, 4}, [1, 2]),
+            (ScanOptions(gap_tolerance=1), {1, 2, 4, 5, 8}, [1, 2, 4, 5]),
+            (ScanOptions(gap_tolerance=2), {1, 2, 4, 5, 8}, [1, 2, 4, 5, 8]),
+            (
+                ScanOptions(lookahead=3, gap_tolerance=1),
+                {1, 2, 4, 5, 8},
+                [1, 2, 4, 5],
+            ),
+            (
+                ScanOptions(strategy=ScanStrategy.GALLOPING, lookahead=4),
+                {1, 2, 3, 4, 5, 6},
+                [1, 2, 3, 4, 5, 6],
+            ),
+            (
+                ScanOptions(strategy=ScanStrategy.GALLOPING, gap_tolerance=1),
+                {1, 2, 4, 5},
+                [1, 2, 4, 5],
+            ),
+        ],
+    )
+    def test_strategies(
+        options: ScanOptions,
+        existing_patches: set[int],
+        expected_patches: list[int],
+    ) -> None:
+        """Test that every strategy finds the releases it tolerates."""
+        with patch(
+            "nukeversionparser.parser.parse_data.VersionParser.to_nuke_release",
+            side_effect=lambda version, *_: (
+                NukeRelease(version=version, installer=None, date="date")
+                if version.patch in existing_patches
+                else None
+            ),
+        ):
+            releases = parse_release_data_by_attribute(
+                SemanticVersion(15, 0, 1), "patch", options=options
+            )
+
+        assert [release.version.patch for release in releases] == (
+            expected_patches
+        )
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "options",
+        [
+            ScanOptions(gap_tolerance=1),
+            ScanOptions(lookahead=3, gap_tolerance=1),
+            ScanOptions(strategy=ScanStrategy.GALLOPING, gap_tolerance=1),
+        ],
+    )
+    def test_patches_of_10_0_stay_within_10_0(options: ScanOptions) -> None:
+        """Test to not step into 10.5 when tolerating a gap after 10.0v6."""
+        existing_versions = {
+            *(SemanticVersion(10, 0, patch) for patch in range(1, 7)),
+            *(SemanticVersion(10, 5, patch) for patch in range(1, 9)),
+        }
+        with patch(
+            "nukeversionparser.parser.parse_data.VersionParser.to_nuke_release",
+            side_effect=lambda version, *_: (
+                NukeRelease(version=version, installer=None, date="date")
+                if version in existing_versions
+                else None
+            ),
+        ):
+            releases = parse_release_data_by_attribute(
+                SemanticVersion(10, 0, 1), "patch", options=options
+            )
+
+        assert [release.version for release in releases] == [
+            SemanticVersion(10, 0, patch) for patch in range(1, 7)
+        ]
+
+    @staticmethod
+    def test_invalid_gap_tolerance() -> None:
+        """Test to raise a ValueError when the gap tolerance is negative."""
+        with pytest.raises(
+            ValueError, match=r"Gap tolerance should not be negative\."
+        ):
+            ScanOptions(gap_tolerance=-1)
+
+    @staticmethod
+    def test_invalid_lookahead() -> None:
+        """Test to raise a ValueError when the lookahead is lower than 1."""
+        with pytest.raises(
+            ValueError, match=r"Lookahead should be at least 1\."
+        ):
+            ScanOptions(lookahead=0)
 
     @staticmethod
     def test_version_skips_to() -> None:
         """Test that version will be skipped to expected version."""
         with patch(
-            "nukeversionparser.parser.parse_data._VersionParser.to_nuke_release",
+            "nukeversionparser.parser.parse_data.VersionParser.to_nuke_release",
             return_value=None,
         ) as version_parser_mock, patch(
             "nukeversionparser.parser.parse_data._get_version_to_process",
@@ -162,7 +507,9 @@ class TestParseReleaseDataByAttribute:
         get_version_to_process_mock.assert_called_once_with(
             SemanticVersion(10, 1, 1)
         )
-        version_parser_mock.assert_called_with(SemanticVersion(10, 5, 1))
+        version_parser_mock.assert_called_with(
+            SemanticVersion(10, 5, 1), None, ScanOptions(), ANY
+        )
 
     @staticmethod
     @pytest.mark.parametrize(
@@ -178,3 +525,58 @@ class TestParseReleaseDataByAttribute:
     ) -> None:
         """Test the collection of version."""
         assert _get_version_to_process(test_version) == jump_to
+
+
+class TestGallop:
+    """Tests related to the galloping search."""
+
+    @staticmethod
+    def _run_search(
+        existing_patches: set[int], gap_tolerance: int = 0
+    ) -> tuple[list[int], int, int]:
+        """Drive the search and return patches, rounds and probes sent."""
+        search = gallop(
+            iterate_versions(SemanticVersion(15, 0, 1), "patch"),
+            gap_tolerance,
+        )
+        rounds = probes = 0
+        try:
+            batch = next(search)
+            while True:
+                rounds += 1
+                probes += len(batch)
+                batch = search.send(
+                    [
+                        version if version.patch in existing_patches else None
+                        for version in batch
+                    ]
+                )
+        except StopIteration as stop:
+            patches = [version.patch for version in stop.value]
+        return patches, rounds, probes
+
+    @pytest.mark.parametrize("last_patch", [0, 1, 2, 3, 7, 8, 9, 33, 100])
+    def test_finds_all_releases(self, last_patch: int) -> None:
+        """Test to find every release in a logarithmic amount of rounds."""
+        existing_patches = set(range(1, last_patch + 1))
+
+        patches, rounds, probes = self._run_search(existing_patches)
+
+        assert patches == sorted(existing_patches)
+        assert rounds <= 2 * max(last_patch, 1).bit_length() + 2
+        assert probes <= last_patch + rounds
+
+    def test_drops_releases_past_hole(self) -> None:
+        """Test to drop releases the gallop jumped to over a hole."""
+        existing_patches = {1, 2, 3, 4, 5, 6, 8, 9, 10, 11, 12}
+
+        assert self._run_search(existing_patches)[0] == [1, 2, 3, 4, 5, 6]
+
+    def test_gap_tolerance(self) -> None:
+        """Test to continue past holes that are within the tolerance."""
+        existing_patches = {1, 2, 3, 5, 6, 7, 8, 9, 11, 12}
+
+        assert self._run_search(existing_patches)[0] == [1, 2, 3]
+        assert self._run_search(existing_patches, 1)[0] == sorted(
+            existing_patches
+        )
@@ -0,0 +1,176 @@
+"""Tests related to the probe cache.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import Request, Response
+
+from nukeversionparser.parser.probe_cache import CachingAdapter, ProbeCache
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+TEST_URL = "https://thefoundry.s3.amazonaws.com/products/nuke/releases/x.tgz"
+
+
+class TestProbeCache:
+    """Tests related to the ProbeCache object."""
+
+    @staticmethod
+    def test_store_and_get(tmp_path: Path) -> None:
+        """Test to return a stored probe."""
+        cache = ProbeCache(tmp_path)
+        cache.store(TEST_URL, HTTPStatus.OK, "test_date")
+
+        probe = cache.get(TEST_URL)
+
+        assert probe.status_code == HTTPStatus.OK
+        assert probe.last_modified == "test_date"
+
+    @staticmethod
+    @pytest.mark.parametrize("status_code", [500, 503, 301])
+    def test_store_ignores_undefinitive_status(
+        tmp_path: Path, status_code: int
+    ) -> None:
+        """Test to not store results that might be temporary."""
+        cache = ProbeCache(tmp_path)
+        cache.store(TEST_URL, status_code, None)
+
+        assert cache.get(TEST_URL) is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("status_code", "elapsed", "expected_cached"),
+        [
+            (404, 10, True),
+            (403, 10, True),
+            (404, 100, False),
+            (200, 10**9, True),
+        ],
+    )
+    def test_expiry(
+        tmp_path: Path, status_code: int, elapsed: float, expected_cached: bool
+    ) -> None:
+        """Test that only missing installers expire by default."""
+        cache = ProbeCache(tmp_path, negative_ttl=60)
+        with patch(
+            "nukeversionparser.parser.probe_cache.time.time"
+        ) as time_mock:
+            time_mock.return_value = 1000
+            cache.store(TEST_URL, status_code, None)
+            time_mock.return_value = 1000 + elapsed
+            probe = cache.get(TEST_URL)
+
+        assert (probe is not None) == expected_cached
+
+    @staticmethod
+    def test_positive_ttl(tmp_path: Path) -> None:
+        """Test that found installers expire when a ttl is provided."""
+        cache = ProbeCache(tmp_path, positive_ttl=60)
+        with patch(
+            "nukeversionparser.parser.probe_cache.time.time"
+        ) as time_mock:
+            time_mock.return_value = 1000
+            cache.store(TEST_URL, 200, "test_date")
+            time_mock.return_value = 1061
+            assert cache.get(TEST_URL) is None
+
+    @staticmethod
+    def test_evicts_least_recently_used(tmp_path: Path) -> None:
+        """Test to evict the least recently used probe when full."""
+        max_entries = 2
+        cache = ProbeCache(tmp_path, max_entries=max_entries)
+        cache.store("first", 200, None)
+        cache.store("second", 200, None)
+        cache.get("first")
+        cache.store("third", 200, None)
+
+        assert len(cache) == max_entries
+        assert cache.get("second") is None
+        assert cache.get("first")
+        assert cache.get("third")
+
+    @staticmethod
+    def test_save_and_read(tmp_path: Path) -> None:
+        """Test to read back all probes that are not expired."""
+        cache = ProbeCache(tmp_path / "cache", negative_ttl=60)
+        with patch(
+            "nukeversionparser.parser.probe_cache.time.time"
+        ) as time_mock:
+            time_mock.return_value = 1000
+            cache.store("expired", 404, None)
+            time_mock.return_value = 1050
+            cache.store("missing", HTTPStatus.NOT_FOUND, None)
+            cache.store("found", HTTPStatus.OK, "test_date")
+            time_mock.return_value = 1070
+            cache.save()
+            restored_cache = ProbeCache(tmp_path / "cache", negative_ttl=60)
+
+            assert restored_cache.get("expired") is None
+            assert restored_cache.get("found").last_modified == "test_date"
+            assert (
+                restored_cache.get("missing").status_code
+                == HTTPStatus.NOT_FOUND
+            )
+        assert list((tmp_path / "cache").iterdir()) == [
+            tmp_path / "cache" / "probe-cache.json"
+        ]
+
+    @staticmethod
+    def test_read_invalid_file(tmp_path: Path) -> None:
+        """Test to start with an empty cache if the file is invalid."""
+        (tmp_path / "probe-cache.json").write_text("{invalid")
+
+        assert len(ProbeCache(tmp_path)) == 0
+
+
+class TestCachingAdapter:
+    """Tests related to the CachingAdapter object."""
+
+    @staticmethod
+    def test_send_stores_response(tmp_path: Path) -> None:
+        """Test to send unknown probes and store their result."""
+        cache = ProbeCache(tmp_path)
+        adapter = CachingAdapter(cache)
+        request = Request("HEAD", TEST_URL).prepare()
+        response_mock = MagicMock(spec=Response)
+        response_mock.status_code = HTTPStatus.OK
+        response_mock.headers = {"last-modified": "test_date"}
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send",
+            return_value=response_mock,
+        ) as send_mock:
+            first_response = adapter.send(request)
+            second_response = adapter.send(request)
+
+        send_mock.assert_called_once()
+        assert first_response is response_mock
+        assert second_response.from_cache is True
+        assert second_response.status_code == HTTPStatus.OK
+        assert second_response.headers["last-modified"] == "test_date"
+        assert second_response.url == TEST_URL
+
+    @staticmethod
+    def test_send_ignores_other_methods(tmp_path: Path) -> None:
+        """Test to never cache requests other than HEAD."""
+        cache = ProbeCache(tmp_path)
+        adapter = CachingAdapter(cache)
+        request = Request("GET", TEST_URL).prepare()
+
+        with patch(
+            "requests.adapters.HTTPAdapter.send"
+        ) as send_mock:
+            send_mock.return_value.status_code = HTTPStatus.OK
+            sends = 2
+            for _ in range(sends):
+                adapter.send(request)
+
+        assert send_mock.call_count == sends
+        assert len(cache) == 0
@@ -0,0 +1,49 @@
+"""Tests related to the retry helpers.
+
+@maintainer: Gilles Vink
+"""
+from unittest.mock import patch
+
+import pytest
+
+from nukeversionparser.parser.retry import (
+    UnknownProbes,
+    get_backoff_delay,
+    is_unknown_status,
+)
+
+
+@pytest.mark.parametrize(
+    ("status_code", "unknown"),
+    [(200, False), (403, False), (404, False), (429, True), (500, True)],
+)
+def test_is_unknown_status(status_code: int, unknown: bool) -> None:
+    """Test that only throttling and server errors are unknown."""
+    assert is_unknown_status(status_code) is unknown
+
+
+@pytest.mark.parametrize(
+    ("attempt", "cap"), [(0, 0.5), (1, 1.0), (3, 4.0), (10, 30.0)]
+)
+def test_get_backoff_delay(attempt: int, cap: float) -> None:
+    """Test to pick a delay up to the exponentially growing cap."""
+    with patch(
+        "nukeversionparser.parser.retry.random.uniform",
+        side_effect=lambda low, high: high,
+    ):
+        assert get_backoff_delay(attempt) == cap
+    assert 0 <= get_backoff_delay(attempt) <= cap
+
+
+def test_unknown_probes() -> None:
+    """Test to return all unknown probes once."""
+    unknown_probes = UnknownProbes()
+    unknown_probes.add("b")
+    unknown_probes.add("a")
+    unknown_probes.add("c")
+    unknown_probes.discard("c")
+    expected_probes = ["a", "b"]
+
+    assert len(unknown_probes) == len(expected_probes)
+    assert unknown_probes.drain() == expected_probes
+    assert not unknown_probes
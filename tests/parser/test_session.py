@@ -0,0 +1,63 @@
+"""Tests related to the shared HTTP session.
+
+@maintainer: Gilles Vink
+"""
+
+from http import HTTPStatus
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from requests import Request, Response
+
+from nukeversionparser.parser.concurrency import (
+    AdaptiveAdapter,
+    AdaptiveConcurrencyController,
+)
+from nukeversionparser.parser.probe_cache import CachingAdapter, ProbeCache
+from nukeversionparser.parser.session import create_session
+
+
+def test_create_session_pool_size() -> None:
+    """Test that the connection pool is sized to the provided size."""
+    pool_size = 12
+    session = create_session(pool_size)
+
+    for prefix in ("https://", "http://"):
+        adapter = session.get_adapter(prefix)
+        pool_kwargs = adapter.poolmanager.connection_pool_kw
+        assert pool_kwargs["maxsize"] == pool_size
+        assert pool_kwargs["block"]
+
+
+def test_create_session_invalid_pool_size() -> None:
+    """Test to raise a ValueError when the pool size is lower than 1."""
+    with pytest.raises(ValueError, match=r"Pool size should be at least 1\."):
+        create_session(0)
+
+
+def test_create_session_with_cache(tmp_path: Path) -> None:
+    """Test that probes are answered by the cache when provided."""
+    session = create_session(4, ProbeCache(tmp_path))
+
+    assert isinstance(session.get_adapter("https://"), CachingAdapter)
+
+
+def test_create_session_with_controller() -> None:
+    """Test that requests are limited by the provided controller."""
+    controller = AdaptiveConcurrencyController(4)
+    session = create_session(4, controller=controller)
+
+    in_flight = []
+
+    def send(*_: object, **__: object) -> Response:
+        in_flight.append(controller.in_flight)
+        return MagicMock(spec=Response, status_code=HTTPStatus.FORBIDDEN)
+
+    adapter = session.get_adapter("https://")
+    with patch("requests.adapters.HTTPAdapter.send", side_effect=send):
+        adapter.send(Request("HEAD", "https://example.com").prepare())
+
+    assert isinstance(adapter, AdaptiveAdapter)
+    assert in_flight == [1]
+    assert controller.in_flight == 0
@@ -0,0 +1,80 @@
+"""Tests related to the files script.
+
+@maintainer: Gilles Vink
+"""
+
+import hashlib
+from pathlib import Path
+from unittest.mock import patch
+
+from nukeversionparser.exporter.manifest import FileDigest
+from nukeversionparser.files import (
+    ExportedFile,
+    get_file_sha256,
+)
+
+
+def test_get_file_sha256(tmp_path: Path) -> None:
+    """Test to hash the content of a file."""
+    test_file = tmp_path / "test.json"
+    test_file.write_bytes(b"{}")
+
+    assert get_file_sha256(test_file) == hashlib.sha256(b"{}").hexdigest()
+
+
+def test_get_file_sha256_missing_file(tmp_path: Path) -> None:
+    """Test to return None if the file does not exist."""
+    assert get_file_sha256(tmp_path / "test.json") is None
+
+
+class TestExportedFile:
+    """Tests related to the ExportedFile object."""
+
+    @staticmethod
+    def test_keeps_unchanged_file(tmp_path: Path) -> None:
+        """Test to leave the target untouched if its content is the same."""
+        test_file = tmp_path / "test.json"
+        test_file.write_text("{}")
+        previous_stat = test_file.stat()
+
+        with ExportedFile(test_file) as exported_file:
+            exported_file.write(b"{}")
+
+        assert exported_file.changed is False
+        assert exported_file.sha256 == get_file_sha256(test_file)
+        assert test_file.stat().st_ino == previous_stat.st_ino
+        assert test_file.stat().st_mtime_ns == previous_stat.st_mtime_ns
+        assert list(tmp_path.iterdir()) == [test_file]
+
+    @staticmethod
+    def test_uses_previous_digest(tmp_path: Path) -> None:
+        """Test to compare against the digest instead of hashing the file."""
+        test_file = tmp_path / "test.json"
+        test_file.write_text("{}")
+        test_digest = FileDigest(
+            sha256=get_file_sha256(test_file), size=2, modified="any"
+        )
+
+        with patch(
+            "nukeversionparser.files.get_file_sha256"
+        ) as hash_mock, ExportedFile(test_file, test_digest) as exported_file:
+            exported_file.write(b"{}")
+
+        hash_mock.assert_not_called()
+        assert exported_file.changed is False
+
+    @staticmethod
+    def test_replaces_changed_file(tmp_path: Path) -> None:
+        """Test to replace the target if its content differs."""
+        test_file = tmp_path / "test.json"
+        test_file.write_text("{}")
+        test_digest = FileDigest(
+            sha256=get_file_sha256(test_file), size=2, modified="any"
+        )
+
+        with ExportedFile(test_file, test_digest) as exported_file:
+            exported_file.write(b'{"15": {}}')
+
+        assert exported_file.changed is True
+        assert exported_file.size == test_file.stat().st_size
+        assert exported_file.sha256 == get_file_sha256(test_file)
@@ -0,0 +1,129 @@
+"""Tests related to the run metrics.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import json
+from typing import TYPE_CHECKING
+
+import pytest
+
+from nukeversionparser.metrics import (
+    JSON_FILE_NAME,
+    PROMETHEUS_FILE_NAME,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    write_metrics,
+)
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    """Return a registry containing one metric of every type."""
+    registry = MetricsRegistry()
+    counter = registry.register(
+        Counter("probes_total", "Probes.", ("platform", "outcome"))
+    )
+    counter.inc(platform="linux", outcome="hit")
+    counter.inc(2, platform="linux", outcome="miss")
+    registry.register(Gauge("run_seconds", "Duration.")).set(1.5)
+    histogram = registry.register(
+        Histogram("latency_seconds", "Latency.", ("platform",), (0.1, 1.0))
+    )
+    histogram.observe(0.05, platform="linux")
+    histogram.observe(0.5, platform="linux")
+    return registry
+
+
+class TestMetricsRegistry:
+    """Tests related to the MetricsRegistry object."""
+
+    @staticmethod
+    def test_to_prometheus(registry: MetricsRegistry) -> None:
+        """Test to format all metrics in the Prometheus text format."""
+        assert registry.to_prometheus() == (
+            "# HELP probes_total Probes.\n"
+            "# TYPE probes_total counter\n"
+            'probes_total{platform="linux",outcome="hit"} 1\n'
+            'probes_total{platform="linux",outcome="miss"} 2\n'
+            "# HELP run_seconds Duration.\n"
+            "# TYPE run_seconds gauge\n"
+            "run_seconds 1.5\n"
+            "# HELP latency_seconds Latency.\n"
+            "# TYPE latency_seconds histogram\n"
+            'latency_seconds_bucket{platform="linux",le="0.1"} 1\n'
+            'latency_seconds_bucket{platform="linux",le="1"} 2\n'
+            'latency_seconds_bucket{platform="linux",le="+Inf"} 2\n'
+            'latency_seconds_sum{platform="linux"} 0.55\n'
+            'latency_seconds_count{platform="linux"} 2\n'
+        )
+
+    @staticmethod
+    def test_to_dict(registry: MetricsRegistry) -> None:
+        """Test to summarize all metrics in a dictionary."""
+        summary = registry.to_dict()
+
+        assert summary["run_seconds"]["samples"] == [
+            {"labels": {}, "value": 1.5}
+        ]
+        assert summary["latency_seconds"]["samples"] == [
+            {
+                "labels": {"platform": "linux"},
+                "count": 2,
+                "sum": 0.55,
+                "buckets": {"0.1": 1, "1": 2, "+Inf": 2},
+            }
+        ]
+
+    @staticmethod
+    def test_reset(registry: MetricsRegistry) -> None:
+        """Test to forget all recorded values."""
+        registry.reset()
+
+        assert all(
+            not metric["samples"] for metric in registry.to_dict().values()
+        )
+
+    @staticmethod
+    def test_register_twice(registry: MetricsRegistry) -> None:
+        """Test to raise when a metric name is registered twice."""
+        with pytest.raises(ValueError, match="already registered"):
+            registry.register(Gauge("run_seconds", "Duration."))
+
+
+def test_invalid_labels() -> None:
+    """Test to raise when the labels do not match the label names."""
+    counter = Counter("probes_total", "Probes.", ("platform",))
+
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(outcome="hit")
+
+
+def test_label_escaping() -> None:
+    """Test to escape quotes in label values."""
+    registry = MetricsRegistry()
+    registry.register(Gauge("size", "Size.", ("file",))).set(1, file='a"b')
+
+    assert 'size{file="a\\"b"} 1' in registry.to_prometheus()
+
+
+def test_write_metrics(tmp_path: Path, registry: MetricsRegistry) -> None:
+    """Test to write the textfile and the JSON summary."""
+    write_metrics(tmp_path / "metrics", registry)
+
+    directory = tmp_path / "metrics"
+    assert (directory / PROMETHEUS_FILE_NAME).read_text() == (
+        registry.to_prometheus()
+    )
+    assert json.loads((directory / JSON_FILE_NAME).read_text()) == (
+        registry.to_dict()
+    )
+    assert sorted(path.name for path in directory.iterdir()) == sorted(
+        [PROMETHEUS_FILE_NAME, JSON_FILE_NAME]
+    )
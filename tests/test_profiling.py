@@ -0,0 +1,87 @@
+"""Tests related to the phase profiler.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import pstats
+import threading
+import tracemalloc
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+from nukeversionparser.profiling import PhaseProfiler, PhaseTiming
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def test_phase_disabled() -> None:
+    """Test to record nothing before the profiler is started."""
+    profiler = PhaseProfiler()
+
+    with profiler.phase("scan"):
+        pass
+
+    assert profiler.timings == {}
+
+
+def test_phase_adds_up() -> None:
+    """Test to add up the time of a phase that is entered twice."""
+    profiler = PhaseProfiler()
+    profiler.start()
+
+    with patch(
+        "nukeversionparser.profiling.time.perf_counter",
+        side_effect=[1.0, 3.0, 10.0, 11.0],
+    ), patch(
+        "nukeversionparser.profiling.time.process_time",
+        side_effect=[0.0, 0.5, 1.0, 1.25],
+    ):
+        with profiler.phase("scan"):
+            pass
+        with profiler.phase("scan"):
+            pass
+    report = profiler.stop()
+
+    assert profiler.timings == {
+        "scan": PhaseTiming(wall_time=3.0, cpu_time=0.75, calls=2)
+    }
+    assert report.splitlines()[1].split() == ["scan", "3.000", "0.750", "2"]
+
+
+def test_stop_dumps_statistics(tmp_path: Path) -> None:
+    """Test to dump cProfile statistics and report the top allocations."""
+    profiler = PhaseProfiler()
+    profiler.start(use_cprofile=True, tracemalloc_top=3)
+
+    with profiler.phase("export"):
+        data = [str(number) for number in range(1000)]
+    report = profiler.stop(tmp_path / "run.pstats")
+
+    assert data
+    assert "Top 3 allocations:" in report
+    assert not tracemalloc.is_tracing()
+    assert pstats.Stats(str(tmp_path / "run.pstats")).total_calls > 0
+
+
+def _scan_in_worker() -> None:
+    """Function that is only called from a worker thread."""
+
+
+def test_stop_dumps_worker_statistics(tmp_path: Path) -> None:
+    """Test to profile the calls of worker threads as well."""
+    profiler = PhaseProfiler()
+    profiler.start(use_cprofile=True)
+
+    worker = threading.Thread(target=_scan_in_worker)
+    worker.start()
+    worker.join()
+    profiler.stop(tmp_path / "run.pstats")
+
+    assert any(
+        function_name == _scan_in_worker.__name__
+        for _, _, function_name in pstats.Stats(
+            str(tmp_path / "run.pstats")
+        ).stats
+    )
@@ -0,0 +1,206 @@
+"""Tests related to the query script.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import json
+from datetime import timedelta
+from email.utils import format_datetime
+from typing import TYPE_CHECKING
+
+import pytest
+
+from nukeversionparser.datamodel.constants import (
+    Architecture,
+    OperatingSystem,
+)
+from nukeversionparser.datamodel.nuke_data import (
+    NukeFamily,
+    SemanticVersion,
+)
+from nukeversionparser.main import query
+from nukeversionparser.query import ReleaseIndex
+from tests.conftest import AS_OF, create_release
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+
+def _get_date(days_old: int) -> str:
+    """Return the date of a release released days before `AS_OF`."""
+    return format_datetime(AS_OF - timedelta(days=days_old), usegmt=True)
+
+
+_TEST_FAMILIES = [
+    NukeFamily(
+        [
+            create_release("15.0v1", _get_date(300), linux_x86_64="url"),
+            create_release("15.1v1", _get_date(10), linux_x86_64="url"),
+            create_release(
+                "15.0v2", _get_date(200), linux_x86_64="url", mac_arm="url"
+            ),
+        ]
+    ),
+    NukeFamily(
+        [
+            create_release("14.0v1", _get_date(700), windows_x86_64="url"),
+            create_release("14.0v2", _get_date(548), mac_x86_64="url"),
+        ]
+    ),
+]
+_TEST_RELEASE_COUNT = sum(len(family.releases) for family in _TEST_FAMILIES)
+
+
+@pytest.fixture
+def index() -> ReleaseIndex:
+    """Return the index of the test families."""
+    return ReleaseIndex(_TEST_FAMILIES)
+
+
+@pytest.fixture
+def snapshot(tmp_path: Path) -> Path:
+    """Return an exported file of the test families."""
+    snapshot_path = tmp_path / "nuke-all-releases.json"
+    data = {}
+    for family in _TEST_FAMILIES:
+        data.update(family.to_dict(AS_OF))
+    snapshot_path.write_text(json.dumps(data))
+    return snapshot_path
+
+
+class TestReleaseIndex:
+    """Tests related to the ReleaseIndex object."""
+
+    @staticmethod
+    def test_families(index: ReleaseIndex) -> None:
+        """Test to index every release of every family."""
+        assert len(index) == _TEST_RELEASE_COUNT
+        assert index.families == [15, 14]
+
+    @staticmethod
+    def test_find(index: ReleaseIndex) -> None:
+        """Test to find a release by its version."""
+        release = _TEST_FAMILIES[0].releases[2]
+
+        assert index.find(SemanticVersion(15, 0, 2)) is release
+        assert index.find("15.0v2") is release
+        assert index.find("15.0v3") is None
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("test_filters", "expected_version"),
+        [
+            ({}, "15.1v1"),
+            ({"major": 14}, "14.0v2"),
+            ({"major": 15, "minor": 0}, "15.0v2"),
+            ({"operating_system": OperatingSystem.WINDOWS}, "14.0v1"),
+            ({"operating_system": OperatingSystem.MAC}, "15.0v2"),
+            (
+                {
+                    "operating_system": OperatingSystem.MAC,
+                    "architecture": Architecture.X86_64,
+                },
+                "14.0v2",
+            ),
+            ({"architecture": Architecture.ARM}, "15.0v2"),
+            (
+                {"major": 15, "operating_system": OperatingSystem.LINUX},
+                "15.1v1",
+            ),
+        ],
+    )
+    def test_latest(
+        index: ReleaseIndex, test_filters: dict, expected_version: str
+    ) -> None:
+        """Test to return the latest release matching the filters."""
+        assert str(index.latest(**test_filters).version) == expected_version
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "test_filters",
+        [
+            {"major": 16},
+            {"major": 15, "minor": 2},
+            {"major": 14, "architecture": Architecture.ARM},
+        ],
+    )
+    def test_latest_without_match(
+        index: ReleaseIndex, test_filters: dict
+    ) -> None:
+        """Test to return None if no release matches the filters."""
+        assert index.latest(**test_filters) is None
+
+    @staticmethod
+    def test_latest_minor_without_major(index: ReleaseIndex) -> None:
+        """Test to raise an exception for a minor without a major."""
+        with pytest.raises(ValueError, match="only be provided with a major"):
+            index.latest(minor=0)
+
+    @staticmethod
+    def test_get_supported(index: ReleaseIndex) -> None:
+        """Test to return the supported releases, latest version first."""
+        assert [
+            str(release.version) for release in index.get_supported(AS_OF)
+        ] == ["15.1v1", "15.0v2", "15.0v1", "14.0v2"]
+
+    @staticmethod
+    @pytest.mark.parametrize("test_days", [0, 1, 100, 400, 1000])
+    def test_get_supported_matches_release(
+        index: ReleaseIndex, test_days: int
+    ) -> None:
+        """Test to find the same releases as `NukeRelease.get_supported`."""
+        as_of = AS_OF + timedelta(days=test_days, hours=5)
+
+        assert {
+            release.version for release in index.get_supported(as_of)
+        } == {
+            release.version
+            for family in _TEST_FAMILIES
+            for release in family.releases
+            if release.get_supported(as_of)
+        }
+
+    @staticmethod
+    def test_from_file(snapshot: Path) -> None:
+        """Test to index the releases of an exported file."""
+        index = ReleaseIndex.from_file(snapshot)
+
+        assert index.find("15.0v2") == _TEST_FAMILIES[0].releases[2]
+        assert len(index) == _TEST_RELEASE_COUNT
+
+
+@pytest.mark.parametrize(
+    ("test_args", "expected_versions"),
+    [
+        (["find", "15.0v1"], ["15.0v1"]),
+        (["latest", "--major", "14"], ["14.0v2"]),
+        (["latest", "--os", "win"], ["14.0v1"]),
+        (["latest", "--architecture", "arm"], ["15.0v2"]),
+        (
+            ["supported", "--as-of", "2024-06-01"],
+            ["15.1v1", "15.0v2", "15.0v1"],
+        ),
+    ],
+)
+def test_query(
+    snapshot: Path,
+    test_args: list[str],
+    expected_versions: list[str],
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test to print the releases found by the query subcommand."""
+    exit_code = query(["--snapshot", str(snapshot), *test_args])
+
+    assert exit_code == 0
+    assert list(json.loads(capsys.readouterr().out)) == expected_versions
+
+
+def test_query_without_result(
+    snapshot: Path, capsys: pytest.CaptureFixture
+) -> None:
+    """Test to exit with 1 when no release is found."""
+    exit_code = query(["--snapshot", str(snapshot), "find", "16.0v1"])
+
+    assert exit_code == 1
+    assert json.loads(capsys.readouterr().out) == {}
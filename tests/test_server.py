@@ -0,0 +1,365 @@
+"""Tests related to the server script.
+
+@maintainer: Gilles Vink
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+from http import HTTPStatus
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+from nukeversionparser.datamodel.nuke_data import NukeFamily
+from nukeversionparser.exporter.change_feed import (
+    CHANGES_FILE,
+    append_changes,
+)
+from nukeversionparser.exporter.export_data import _write_views
+from nukeversionparser.server import (
+    ReleaseServer,
+    _accepts_gzip,
+    _matches_etag,
+)
+from tests.conftest import AS_OF, UNSUPPORTED_DATE, create_release
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+_TEST_FAMILIES = [
+    NukeFamily(
+        [
+            create_release(
+                "15.0v2", linux_x86_64="linux url", mac_arm="mac url"
+            ),
+            create_release(
+                "15.0v1", UNSUPPORTED_DATE, linux_x86_64="linux url"
+            ),
+        ]
+    )
+]
+
+
+@pytest.fixture
+def directory(tmp_path: Path) -> Path:
+    """Return a directory with exported files of the test families."""
+    _write_views(_TEST_FAMILIES, tmp_path, AS_OF)
+    append_changes(
+        tmp_path / CHANGES_FILE,
+        [{"type": "release_added", "version": "15.0v1"}, {"version": "2"}],
+    )
+    return tmp_path
+
+
+@pytest.fixture
+def server(directory: Path) -> ReleaseServer:
+    """Return a server of the exported files."""
+    return ReleaseServer(directory)
+
+
+@pytest.mark.parametrize(
+    ("test_header", "expected_result"),
+    [
+        ("gzip", True),
+        ("deflate, gzip;q=0.5", True),
+        ("*", True),
+        ("", False),
+        ("deflate", False),
+        ("gzip;q=0", False),
+        ("gzip;q=0, *", False),
+        ("gzip;q=invalid", False),
+    ],
+)
+def test__accepts_gzip(test_header: str, expected_result: bool) -> None:
+    """Test to only compress when the client accepts gzip."""
+    assert _accepts_gzip(test_header) is expected_result
+
+
+@pytest.mark.parametrize(
+    ("test_header", "expected_result"),
+    [
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"def", "abc"', True),
+        ("*", True),
+        ('"def"', False),
+        ("", False),
+    ],
+)
+def test__matches_etag(test_header: str, expected_result: bool) -> None:
+    """Test to compare the ETags of the If-None-Match header."""
+    assert _matches_etag(test_header, '"abc"') is expected_result
+
+
+class TestReleaseServer:
+    """Tests related to the ReleaseServer object."""
+
+    @staticmethod
+    def test_respond_file(server: ReleaseServer, directory: Path) -> None:
+        """Test to respond with the exported file and its ETag."""
+        status, headers, body = server.respond(
+            "GET", "/nuke-all-releases.json", {}
+        )
+
+        assert status == HTTPStatus.OK
+        assert body == (directory / "nuke-all-releases.json").read_bytes()
+        assert headers["Content-Length"] == str(len(body))
+        assert headers["Content-Type"] == "application/json"
+        assert headers["Vary"] == "Accept-Encoding"
+        assert headers["ETag"].startswith('"')
+        assert "Content-Encoding" not in headers
+
+    @staticmethod
+    def test_respond_gzip(server: ReleaseServer, directory: Path) -> None:
+        """Test to respond with the compressed file when it is accepted."""
+        _, plain_headers, _ = server.respond(
+            "GET", "/nuke-all-releases.min.json", {}
+        )
+        status, headers, body = server.respond(
+            "GET",
+            "/nuke-all-releases.min.json",
+            {"accept-encoding": "gzip, deflate"},
+        )
+
+        assert status == HTTPStatus.OK
+        assert headers["Content-Encoding"] == "gzip"
+        assert (
+            body
+            == (directory / "nuke-all-releases.min.json.gz").read_bytes()
+        )
+        assert headers["ETag"] != plain_headers["ETag"]
+
+    @staticmethod
+    @pytest.mark.parametrize("test_encoding", ["", "gzip"])
+    def test_respond_not_modified(
+        server: ReleaseServer, test_encoding: str
+    ) -> None:
+        """Test to respond without a body when the ETag matches."""
+        request_headers = {"accept-encoding": test_encoding}
+        _, headers, _ = server.respond(
+            "GET", "/nuke-all-releases.json", request_headers
+        )
+
+        status, not_modified_headers, body = server.respond(
+            "GET",
+            "/nuke-all-releases.json",
+            {**request_headers, "if-none-match": headers["ETag"]},
+        )
+
+        assert status == HTTPStatus.NOT_MODIFIED
+        assert body == b""
+        assert not_modified_headers["ETag"] == headers["ETag"]
+        assert "Content-Encoding" not in not_modified_headers
+
+    @staticmethod
+    def test_respond_head(server: ReleaseServer) -> None:
+        """Test to respond to HEAD with the headers only."""
+        _, get_headers, _ = server.respond(
+            "GET", "/nuke-all-releases.json", {}
+        )
+        status, headers, body = server.respond(
+            "HEAD", "/nuke-all-releases.json", {}
+        )
+
+        assert status == HTTPStatus.OK
+        assert body == b""
+        assert headers["Content-Length"] == get_headers["Content-Length"]
+
+    @staticmethod
+    def test_respond_method_not_allowed(server: ReleaseServer) -> None:
+        """Test to only allow reading."""
+        status, headers, _ = server.respond(
+            "POST", "/nuke-all-releases.json", {}
+        )
+
+        assert status == HTTPStatus.METHOD_NOT_ALLOWED
+        assert headers["Allow"] == "GET, HEAD"
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        "test_target", ["/", "/requests.jsonl", "/../manifest.json"]
+    )
+    def test_respond_not_found(
+        server: ReleaseServer, test_target: str
+    ) -> None:
+        """Test to only serve the exported files."""
+        status, _, body = server.respond("GET", test_target, {})
+
+        assert status == HTTPStatus.NOT_FOUND
+        assert json.loads(body) == {"error": "Not found."}
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("test_target", "expected_status", "expected_versions"),
+        [
+            ("/query/find?version=15.0v1", 200, ["15.0v1"]),
+            ("/query/find?version=15.0v3", 404, []),
+            ("/query/latest", 200, ["15.0v2"]),
+            ("/query/latest?major=15&minor=0&os=linux", 200, ["15.0v2"]),
+            ("/query/latest?major=14", 404, []),
+            (
+                "/query/supported?as_of=2024-01-01",
+                200,
+                ["15.0v2"],
+            ),
+            ("/query/supported?as_of=2030-01-01", 200, []),
+        ],
+    )
+    def test_respond_query(
+        server: ReleaseServer,
+        test_target: str,
+        expected_status: int,
+        expected_versions: list[str],
+    ) -> None:
+        """Test to answer the lookups of the query library."""
+        status, headers, body = server.respond("GET", test_target, {})
+
+        assert status == expected_status
+        assert list(json.loads(body)) == expected_versions
+        assert headers["ETag"]
+
+    @staticmethod
+    @pytest.mark.parametrize(
+        ("test_target", "expected_message"),
+        [
+            ("/query/find", "Parameter version is required."),
+            ("/query/find?version=latest", "Invalid version string"),
+            ("/query/latest?major=x", "Parameter major must be an integer."),
+            ("/query/latest?minor=1", "only be provided with a major"),
+            ("/query/latest?os=amiga", "is not a valid OperatingSystem"),
+            ("/query/supported?as_of=tomorrow", "Invalid isoformat"),
+        ],
+    )
+    def test_respond_query_bad_request(
+        server: ReleaseServer, test_target: str, expected_message: str
+    ) -> None:
+        """Test to respond with the reason of an invalid query."""
+        status, _, body = server.respond("GET", test_target, {})
+
+        assert status == HTTPStatus.BAD_REQUEST
+        assert expected_message in json.loads(body)["error"]
+
+    @staticmethod
+    def test_respond_query_compresses_once(server: ReleaseServer) -> None:
+        """Test to compress the same query result only once."""
+        target = "/query/supported?as_of=2018-01-01"
+        headers = {"accept-encoding": "gzip"}
+        with patch(
+            "nukeversionparser.server.gzip.compress", wraps=gzip.compress
+        ) as compress_mock:
+            responses = [
+                server.respond("GET", target, headers) for _ in range(2)
+            ]
+
+        compress_mock.assert_called_once()
+        assert responses[0][2] == responses[1][2]
+        assert responses[0][1]["Content-Encoding"] == "gzip"
+
+    @staticmethod
+    def test_respond_changes(server: ReleaseServer) -> None:
+        """Test to respond with the changes after a sequence."""
+        _, _, body = server.respond("GET", "/query/changes?since=1", {})
+
+        assert json.loads(body) == [{"sequence": 2, "version": "2"}]
+
+    @staticmethod
+    def test_reload_if_changed(
+        server: ReleaseServer, directory: Path
+    ) -> None:
+        """Test to serve the new files once they are written."""
+        assert asyncio.run(server.reload_if_changed()) is False
+
+        _TEST_FAMILIES[0].releases.insert(0, create_release("15.1v1"))
+        try:
+            _write_views(_TEST_FAMILIES, directory, AS_OF)
+        finally:
+            del _TEST_FAMILIES[0].releases[0]
+        all_releases_file = directory / "nuke-all-releases.json"
+        stat = all_releases_file.stat()
+        os.utime(all_releases_file, ns=(stat.st_atime_ns, 0))
+
+        assert asyncio.run(server.reload_if_changed()) is True
+        _, _, body = server.respond("GET", "/nuke-all-releases.json", {})
+        assert body == all_releases_file.read_bytes()
+        _, _, body = server.respond("GET", "/query/latest", {})
+        assert list(json.loads(body)) == ["15.1v1"]
+
+
+def test_serve_keep_alive(server: ReleaseServer) -> None:
+    """Test to answer several requests on a single connection."""
+    connections = ("keep-alive", "close")
+
+    async def _request() -> list[bytes]:
+        """Send two requests and return the raw responses."""
+        started_server = await server.start("127.0.0.1", 0)
+        port = started_server.sockets[0].getsockname()[1]
+        async with started_server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            responses = []
+            for connection in connections:
+                writer.write(
+                    b"GET /nuke-minor-releases.json HTTP/1.1\r\n"
+                    b"Host: localhost\r\nAccept-Encoding: gzip\r\n"
+                    + f"Connection: {connection}\r\n\r\n".encode()
+                )
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(
+                    head.split(b"Content-Length: ")[1].split(b"\r\n")[0]
+                )
+                responses.append(head + await reader.readexactly(length))
+            assert await reader.read() == b""
+            writer.close()
+            await writer.wait_closed()
+        return responses
+
+    responses = asyncio.run(_request())
+
+    assert len(responses) == len(connections)
+    for response in responses:
+        head, _, body = response.partition(b"\r\n\r\n")
+        assert head.startswith(b"HTTP/1.1 200 OK")
+        assert b"Content-Encoding: gzip" in head
+        assert json.loads(gzip.decompress(body))
+    assert b"Connection: close" in responses[1]
+
+
+def test_serve_bad_request(server: ReleaseServer) -> None:
+    """Test to close the connection on a request that can not be parsed."""
+
+    async def _request() -> bytes:
+        """Send an invalid request and return the raw response."""
+        started_server = await server.start("127.0.0.1", 0)
+        port = started_server.sockets[0].getsockname()[1]
+        async with started_server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(b"nonsense\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            await writer.wait_closed()
+        return response
+
+    assert asyncio.run(_request()).startswith(b"HTTP/1.1 400 Bad Request")
+
+
+def test_serve_closes_idle_connection(directory: Path) -> None:
+    """Test to close a connection that sends no request in time."""
+    server = ReleaseServer(directory, read_timeout=0.1)
+
+    async def _request() -> bytes:
+        """Open a connection without sending anything."""
+        started_server = await server.start("127.0.0.1", 0)
+        port = started_server.sockets[0].getsockname()[1]
+        async with started_server:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            response = await asyncio.wait_for(reader.read(), timeout=5)
+            writer.close()
+            await writer.wait_closed()
+        return response
+
+    assert asyncio.run(_request()) == b""